@@ -0,0 +1,62 @@
+"""
+Content-addressed blob store
+
+Payloads are stored once under their SHA-256, so the same resume logged by
+several endpoints (or uploaded many times) costs one file. Payloads above
+compress_threshold bytes are zlib-compressed on disk.
+"""
+
+import os
+import zlib
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+
+def content_hash(data: Union[str, bytes]) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    """Deduplicating, optionally compressed blob storage keyed by content hash"""
+
+    def __init__(self, root, compress_threshold: int = 1024):
+        self.root = Path(root)
+        self.compress_threshold = compress_threshold
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, ref: str, compressed: bool) -> Path:
+        # Fan out by hash prefix so no single directory grows too large
+        return self.root / ref[:2] / (ref + (".z" if compressed else ""))
+
+    def put(self, data: Union[str, bytes]) -> str:
+        """Store data if not already present and return its content hash"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        ref = content_hash(data)
+        if self._path(ref, True).exists() or self._path(ref, False).exists():
+            return ref
+
+        compressed = len(data) > self.compress_threshold
+        path = self._path(ref, compressed)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(zlib.compress(data, 6) if compressed else data)
+        os.replace(tmp_path, path)
+        return ref
+
+    def get(self, ref: str) -> Optional[bytes]:
+        for compressed in (True, False):
+            path = self._path(ref, compressed)
+            if path.exists():
+                data = path.read_bytes()
+                return zlib.decompress(data) if compressed else data
+        return None
+
+    def get_text(self, ref: str) -> Optional[str]:
+        data = self.get(ref)
+        return data.decode("utf-8") if data is not None else None
@@ -0,0 +1,196 @@
+"""
+Cache primitives shared by the agents
+
+A small thread-safe LRU with optional per-entry TTL, and a response cache on
+top of it that coalesces concurrent misses and serves stale entries while
+refreshing them. Under the gevent worker the locks (and refresh threads) are
+monkey-patched into greenlet-aware ones.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded LRU mapping with optional time-to-live and hit/miss counters"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value, refreshing its recency, or default"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        """Store a value, evicting the least recently used entry when full"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0
+        }
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    LRU/TTL cache for expensive, deterministic responses.
+
+    Entries are fresh for `ttl` seconds, then served stale for up to
+    `stale_ttl` more while a single background refresh recomputes them. On a
+    miss only the first caller computes; concurrent callers for the same key
+    wait for its result (or its exception) instead of stampeding the backend.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 3600, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = LRUCache(maxsize=maxsize, ttl=ttl + stale_ttl)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+
+    def get(self, key, refresh=None, cacheable=bool):
+        """
+        Return (value, 'hit' | 'stale') for a cached key, or (None, None). A
+        stale entry is refreshed in the background when `refresh` is given.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, None
+        value, fresh_until = entry
+        if fresh_until > time.monotonic():
+            self.hits += 1
+            return value, 'hit'
+        self.stale_hits += 1
+        if refresh is not None:
+            self._refresh_in_background(key, refresh, cacheable)
+        return value, 'stale'
+
+    def set(self, key, value):
+        self._entries.set(key, (value, time.monotonic() + self.ttl))
+
+    def _run_flight(self, key, flight: _Flight, compute, cacheable):
+        try:
+            flight.value = compute()
+            if cacheable(flight.value):
+                self.set(key, flight.value)
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh_in_background(self, key, compute, cacheable):
+        with self._lock:
+            if key in self._flights:
+                return
+            flight = self._flights[key] = _Flight()
+            self.refreshes += 1
+        thread = threading.Thread(target=self._run_flight, args=(key, flight, compute, cacheable), daemon=True)
+        thread.start()
+
+    def get_or_compute(self, key, compute, cacheable=bool):
+        """
+        Return (value, status) where status is 'hit', 'stale', 'miss' or
+        'coalesced'. `compute` takes no arguments; results failing `cacheable`
+        are returned but not stored.
+        """
+        value, status = self.get(key, refresh=compute, cacheable=cacheable)
+        if status is not None:
+            return value, status
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if leader:
+            self._run_flight(key, flight, compute, cacheable)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value, 'miss' if leader else 'coalesced'
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self._entries.maxsize,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'refreshes': self.refreshes,
+            'hit_ratio': round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0
+        }
@@ -1,33 +1,134 @@
+import os
 import json
+import atexit
 import datetime
+import time
+import threading
 from pathlib import Path
 
+from agents.log_store import JsonLinesLogStore, SQLiteLogStore
+from agents.blob_store import BlobStore, content_hash
+
+LOG_BACKENDS = {
+    "sqlite": (SQLiteLogStore, "career_pathfinder_logs.db"),
+    "jsonl": (JsonLinesLogStore, "career_pathfinder_logs.jsonl"),
+}
+
+# full: inline resume text and full result (legacy format)
+# standard: content hashes, payloads kept once in the blob store
+# minimal: content hashes only
+LOG_VERBOSITY_LEVELS = ("full", "standard", "minimal")
+
+
+def _blob_refs(log_entry: dict) -> list:
+    refs = [log_entry["input"].get("text_sha256")]
+    full_result = log_entry.get("full_result")
+    if isinstance(full_result, dict):
+        refs.append(full_result.get("ref"))
+    return [ref for ref in refs if ref]
+
 
 class CareerPathfinderLogger:
-    """Logger for career pathfinder pipeline executions"""
+    """
+    Logger for career pathfinder pipeline executions.
+
+    log_execution only serializes and buffers the entry; a background thread
+    hands the buffer to the storage backend in one batch every flush_interval
+    seconds (or sooner once max_buffer entries are waiting). The default
+    backend is an indexed SQLite store (see agents/log_store.py); set
+    LOG_BACKEND=jsonl for the rotating JSON-lines file instead. Large payloads
+    are kept out of entries according to LOG_VERBOSITY.
+
+    A batch the backend fails to write is kept for the next flush; when more
+    than max_pending entries are waiting, the oldest are dropped and counted
+    in dropped_entries.
+    """
     
-    def __init__(self, log_file="career_pathfinder_logs.json"):
-        self.log_file = Path(log_file)
-        self.logs = self._load_existing_logs()
+    def __init__(self, log_file=None, backend: str = None, verbosity: str = None,
+                 flush_interval: float = 1.0, max_buffer: int = 100, compress_threshold: int = 1024,
+                 max_pending: int = 10000, **store_options):
+        backend = backend or os.getenv("LOG_BACKEND", "sqlite")
+        if backend not in LOG_BACKENDS:
+            raise ValueError(f"Unknown log backend: {backend}")
+        verbosity = verbosity or os.getenv("LOG_VERBOSITY", "standard")
+        if verbosity not in LOG_VERBOSITY_LEVELS:
+            raise ValueError(f"Unknown log verbosity: {verbosity}")
+        store_class, default_file = LOG_BACKENDS[backend]
+
+        self.log_file = Path(log_file or os.getenv("LOG_FILE") or default_file)
+        self.store = store_class(self.log_file, **store_options)
+        self.verbosity = verbosity
+        self.blob_store = BlobStore(self.log_file.with_name(self.log_file.stem + "_blobs"),
+                                    compress_threshold=compress_threshold)
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_pending = max_pending
+        self.dropped_entries = 0
+
+        self._buffer = []
+        self._pending_blobs = {}
+        self._buffer_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+        self._migrate_legacy_log()
+        self._flusher = threading.Thread(target=self._flush_loop, name="career-log-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
     
-    def _load_existing_logs(self):
-        """Load existing logs from file if it exists"""
-        if self.log_file.exists():
-            try:
-                with open(self.log_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return []
-        return []
+    def _migrate_legacy_log(self):
+        """One-time import of the old indent=2 JSON array file into an empty store"""
+        legacy_file = self.log_file.with_suffix(".json")
+        if legacy_file == self.log_file or not legacy_file.exists() or not self.store.is_empty():
+            return
+        # Claim the file with an atomic rename so only one worker process imports it
+        claimed_file = legacy_file.with_name(f"{legacy_file.name}.migrating-{os.getpid()}")
+        try:
+            os.replace(legacy_file, claimed_file)
+        except OSError:
+            return
+        try:
+            with open(claimed_file, 'r', encoding='utf-8') as f:
+                legacy_logs = json.load(f)
+            if legacy_logs:
+                self.store.append_many([(entry, json.dumps(entry, ensure_ascii=False)) for entry in legacy_logs])
+        except (json.JSONDecodeError, OSError):
+            os.replace(claimed_file, legacy_file)
+            return
+        except Exception:
+            # Put the file back so a later start can retry the import
+            os.replace(claimed_file, legacy_file)
+            raise
+        # Keep the old file as a backup; it is never imported again
+        os.replace(claimed_file, legacy_file.with_name(legacy_file.name + ".migrated"))
     
     def log_execution(self, input_text: str, target_role: str, result: dict, execution_time: float = None):
-        """Log a pipeline execution"""
+        """
+        Log a pipeline execution.
+
+        With verbosity "full" the resume text and full result are stored inline
+        as before. "standard" (default) replaces them with content hashes that
+        refer to the deduplicated blob store, and "minimal" keeps only the hashes.
+        """
+        pending_blobs = {}
+        if self.verbosity == "full":
+            input_record = {"text": input_text, "target_role": target_role}
+            full_result = result
+        else:
+            text_ref = content_hash(input_text)
+            input_record = {"text_sha256": text_ref, "text_chars": len(input_text), "target_role": target_role}
+            full_result = None
+            if self.verbosity == "standard":
+                pending_blobs[text_ref] = input_text
+                # The resume is already referenced by text_sha256; don't store it twice
+                result_payload = json.dumps({k: v for k, v in result.items() if k != "input"},
+                                            ensure_ascii=False, default=str)
+                full_result = {"ref": content_hash(result_payload)}
+                pending_blobs[full_result["ref"]] = result_payload
+
         log_entry = {
             "timestamp": datetime.datetime.now().isoformat(),
-            "input": {
-                "text": input_text,
-                "target_role": target_role
-            },
+            "input": input_record,
             "output": {
                 "extracted_skills": result.get("extracted_skills", []),
                 "missing_skills": result.get("missing_skills", []),
@@ -35,50 +136,126 @@ class CareerPathfinderLogger:
                 "roadmap_phases": len(result.get("roadmap", [])),
                 "total_recommended_skills": len(result.get("missing_skills", [])) + len(result.get("nice_to_have", []))
             },
-            "full_result": result,
+            "full_result": full_result,
             "execution_time_seconds": execution_time,
             "session_id": f"session_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
         }
+        if full_result is None:
+            del log_entry["full_result"]
         
-        self.logs.append(log_entry)
-        self._save_logs()
+        line = json.dumps(log_entry, ensure_ascii=False, default=str)
+        with self._buffer_lock:
+            self._buffer.append((log_entry, line))
+            self._pending_blobs.update(pending_blobs)
+            buffered = len(self._buffer)
+        if buffered >= self.max_buffer:
+            self._wakeup.set()
         return log_entry
     
-    def _save_logs(self):
-        """Save logs to file"""
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            json.dump(self.logs, f, indent=2)
+    def load_input_text(self, log_entry: dict):
+        """Resolve the resume text of an entry, whether inline or in the blob store"""
+        record = log_entry["input"]
+        if "text" in record:
+            return record["text"]
+        self.flush()
+        return self.blob_store.get_text(record["text_sha256"])
+    
+    def load_full_result(self, log_entry: dict):
+        """Resolve the full pipeline result of an entry (None when not recorded)"""
+        full_result = log_entry.get("full_result")
+        if not isinstance(full_result, dict) or "ref" not in full_result:
+            return full_result
+        self.flush()
+        payload = self.blob_store.get_text(full_result["ref"])
+        return json.loads(payload) if payload is not None else None
+    
+    def _flush_loop(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                flushed = self.flush()
+            except Exception as e:  # the thread must survive anything the backend raises
+                print(f"Log flusher error: {e}")
+                flushed = False
+            if not flushed:
+                # Don't let max_buffer wakeups turn a failing backend into a busy loop
+                time.sleep(self.flush_interval)
+    
+    def flush(self) -> bool:
+        """Write any buffered entries to the store; False if the batch was requeued after an error"""
+        with self._buffer_lock:
+            records, self._buffer = self._buffer, []
+            blobs, self._pending_blobs = self._pending_blobs, {}
+        try:
+            # Blobs first, so a stored entry never points at a missing payload
+            for data in blobs.values():
+                self.blob_store.put(data)
+            if records:
+                self.store.append_many(records)
+        except Exception as e:
+            print(f"Log flush failed, keeping {len(records)} entries for the next attempt: {e}")
+            self._requeue(records, blobs)
+            return False
+        return True
+    
+    def _requeue(self, records: list, blobs: dict):
+        """Put a failed batch back in front of newer entries, dropping the oldest beyond max_pending"""
+        with self._buffer_lock:
+            self._buffer = records + self._buffer
+            self._pending_blobs = {**blobs, **self._pending_blobs}
+            overflow = len(self._buffer) - self.max_pending
+            if overflow <= 0:
+                return
+            self._buffer = self._buffer[overflow:]
+            self.dropped_entries += overflow
+            # Blob puts are idempotent; keep only payloads still referenced by a waiting entry
+            referenced = {ref for entry, _ in self._buffer for ref in _blob_refs(entry)}
+            self._pending_blobs = {ref: data for ref, data in self._pending_blobs.items() if ref in referenced}
+        print(f"Log buffer full, dropped {overflow} oldest entries ({self.dropped_entries} in total)")
+    
+    def close(self):
+        """Stop the background flusher and write whatever is still buffered"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wakeup.set()
+        self.flush()
     
     def get_recent_logs(self, count: int = 5):
         """Get the most recent log entries"""
-        return self.logs[-count:] if len(self.logs) >= count else self.logs
+        self.flush()
+        return self.store.get_recent(count)
     
     def get_logs_by_target_role(self, target_role: str):
         """Get logs filtered by target role"""
-        return [log for log in self.logs if log["input"]["target_role"].lower() == target_role.lower()]
+        self.flush()
+        return list(self.iter_logs_by_target_role(target_role))
+    
+    def iter_logs_by_target_role(self, target_role: str, page_size: int = 500):
+        cursor = None
+        while True:
+            page = self.store.query(target_role=target_role, limit=page_size, cursor=cursor)
+            yield from page["logs"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return
+    
+    def query_logs(self, target_role: str = None, since: str = None, until: str = None,
+                   limit: int = 50, cursor: int = None):
+        """
+        Paged query over the log history.
+
+        Returns {"logs": [...], "next_cursor": ...}; pass next_cursor back in to
+        get the following page (None once exhausted). since/until are ISO timestamps.
+        """
+        self.flush()
+        return self.store.query(target_role=target_role, since=since, until=until, limit=limit, cursor=cursor)
     
     def get_summary_stats(self):
         """Get summary statistics from all logs"""
-        if not self.logs:
-            return {"total_executions": 0}
-        
-        total_executions = len(self.logs)
-        target_roles = [log["input"]["target_role"] for log in self.logs]
-        most_common_role = max(set(target_roles), key=target_roles.count) if target_roles else None
-        
-        avg_extracted_skills = sum(len(log["output"]["extracted_skills"]) for log in self.logs) / total_executions
-        avg_missing_skills = sum(len(log["output"]["missing_skills"]) for log in self.logs) / total_executions
-        
-        return {
-            "total_executions": total_executions,
-            "most_common_target_role": most_common_role,
-            "average_extracted_skills": round(avg_extracted_skills, 2),
-            "average_missing_skills": round(avg_missing_skills, 2),
-            "date_range": {
-                "first_execution": self.logs[0]["timestamp"],
-                "last_execution": self.logs[-1]["timestamp"]
-            }
-        }
+        self.flush()
+        return self.store.get_summary_stats()
 
 
 # Example usage function
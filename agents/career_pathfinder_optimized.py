@@ -1,10 +1,13 @@
 import os
 import json
-import time
-from typing import TypedDict, List
-from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI # <-- CHANGE 1: Import Gemini
+import hashlib
+import threading
+import operator
+from typing import TypedDict, Annotated
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
 from dotenv import load_dotenv
 
 # --- CHANGE 2: Load .env from the project root ---
@@ -12,43 +15,18 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 load_dotenv(os.path.join(project_root, '.env'))
 # ----------------------------------------------------
 
-# Performance monitoring class remains the same
-class PerformanceProfiler:
-    def __init__(self):
-        self.timings = {}
-        self.cache = {}
-        self.cache_hits = 0
-        self.cache_misses = 0
-    # ... (rest of the class is unchanged) ...
-    def start_timer(self, step_name: str):
-        self.timings[step_name] = {'start': time.time()}
-        
-    def end_timer(self, step_name: str):
-        if step_name in self.timings:
-            self.timings[step_name]['end'] = time.time()
-            self.timings[step_name]['duration'] = self.timings[step_name]['end'] - self.timings[step_name]['start']
-            
-    def get_performance_report(self) -> dict:
-        report = {
-            'step_timings': {},
-            'total_time': 0,
-            'cache_stats': {
-                'hits': self.cache_hits,
-                'misses': self.cache_misses,
-                'hit_ratio': self.cache_hits / (self.cache_hits + self.cache_misses) if (self.cache_hits + self.cache_misses) > 0 else 0
-            }
-        }
-        
-        total_time = 0
-        for step, timing in self.timings.items():
-            if 'duration' in timing:
-                report['step_timings'][step] = round(timing['duration'], 3)
-                total_time += timing['duration']
-                
-        report['total_time'] = round(total_time, 3)
-        return report
+from agents.llm_client import llm_pool, DEFAULT_MODEL
+from agents.skill_cache import skill_cache
+from agents.gap_engine import GapEngine, canonical_skill_set
+from agents.skill_normalizer import skill_normalizer
+from agents.local_skill_extractor import local_skill_extractor
+from agents.resume_compactor import resume_compactor
+from agents.course_index import CourseIndex
+from agents.role_readiness_agent import get_readiness_agent
+from agents.cache_utils import ResponseCache
+from agents.stream_parser import RoadmapStreamParser
+from agents.profiling import profiler, profiling_scope, span, traced
 
-profiler = PerformanceProfiler()
 
 # --- CHANGE 3: Updated data loading logic ---
 def load_data_files():
@@ -81,8 +59,32 @@ PERFORMANCE_CONFIG = {
     'max_courses_per_skill': 6,
     'max_generation_time': 30.0,
     'llm_timeout': 30.0,
+    'enrich_nice_to_have': True,  # one LLM call for nice_to_have; missing_skills is always local
+    'parallel_mode': os.getenv("PIPELINE_PARALLEL", "false").lower() == "true",
+    # llm: Gemini only; local: vocabulary matcher only; hybrid: local first, Gemini when it finds too few skills
+    'skill_extractor': os.getenv("SKILL_EXTRACTOR", "llm"),
+    'hybrid_min_skills': int(os.getenv("SKILL_EXTRACTOR_MIN_SKILLS", "6")),
+    # Send Gemini only the cleaned, skill-dense sections of the resume, capped at a token budget
+    'prompt_compaction': os.getenv("SKILL_PROMPT_COMPACTION", "true").lower() == "true",
+    'skill_prompt_token_budget': int(os.getenv("SKILL_PROMPT_TOKEN_BUDGET", "1500")),
+    # llm: Gemini writes the roadmap; catalog: always assemble it from data/courses.json;
+    # auto: assemble from the catalog when every skill has a course there, else Gemini
+    'roadmap_source': os.getenv("ROADMAP_SOURCE", "auto"),
 }
 
+skill_normalizer.add_vocabulary(COURSES_DATA)
+gap_engine = GapEngine(JOB_ROLES_DATA)
+get_readiness_agent()  # registers the readiness role catalog's skills with the normalizer
+course_index = CourseIndex(COURSES_DATA)
+
+# Roadmaps are generated at temperature 0, so the same gaps for the same role
+# give the same roadmap: cache them in front of agent3.
+roadmap_cache = ResponseCache(
+    maxsize=int(os.getenv("ROADMAP_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("ROADMAP_CACHE_TTL", str(6 * 3600))),
+    stale_ttl=float(os.getenv("ROADMAP_CACHE_STALE_TTL", str(24 * 3600)))
+)
+
 class MyState(TypedDict, total=False):
     input: str
     target_role: str
@@ -92,27 +94,50 @@ class MyState(TypedDict, total=False):
     roadmap: list[dict]
     time_estimates: dict
     performance_data: dict
+    roadmap_cache_status: str
+    skill_cache_checked: bool  # the extraction cache already missed while seeding the run
+    roadmap_phases: Annotated[list, operator.add]  # (phase index, phase, cache status) from parallel branches
 
-def agent1_skill_extractor(state):
-    """Extract skills using Gemini."""
-   
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") 
+# Bump when the extraction prompt changes so cached results are not reused
+SKILL_EXTRACTION_PROMPT_VERSION = "v2"
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash-latest",
-        google_api_key=GEMINI_API_KEY, # Add this line
-        temperature=0,
-        convert_system_message_to_human=True
-    )
-    # ---------------------------------------------
-    
-    prompt = f"""Extract technical skills from this resume text. Return a JSON object with a single key "extracted_skills" containing a list of lowercase strings.
-    
-    USER INPUT: {state.get('input', '')}"""
-    
-    message = HumanMessage(content=prompt)
-    response = llm.invoke([message])
-    
+def _skill_prompt_version() -> str:
+    # The extractor mode and compaction settings change which skills come back,
+    # so they are part of the prompt version
+    version = f"{SKILL_EXTRACTION_PROMPT_VERSION}-{PERFORMANCE_CONFIG['skill_extractor']}"
+    if PERFORMANCE_CONFIG['prompt_compaction']:
+        version += f"-compact{PERFORMANCE_CONFIG['skill_prompt_token_budget']}"
+    return version
+
+def skill_extraction_version() -> str:
+    """Prompt version, extractor mode, compaction settings and model that extracted skills depend on."""
+    return f"{_skill_prompt_version()}-{DEFAULT_MODEL}"
+
+def _skill_cache_key(input_text: str) -> str:
+    return skill_cache.make_key(input_text, _skill_prompt_version(), DEFAULT_MODEL)
+
+def get_cached_skills(input_text: str):
+    """Look up previously extracted skills for this resume text (None on miss)."""
+    skills = skill_cache.get(_skill_cache_key(input_text))
+    profiler.record_cache_lookup(skills is not None)
+    return skills
+
+def compact_resume_text(input_text: str) -> str:
+    """The part of the resume that goes into the extraction prompt (all of it when compaction is off)."""
+    if not PERFORMANCE_CONFIG['prompt_compaction']:
+        return input_text
+    profiler.start_timer('prompt_compaction')
+    text = resume_compactor.compact(input_text, PERFORMANCE_CONFIG['skill_prompt_token_budget'])
+    profiler.end_timer('prompt_compaction')
+    return text
+
+def _skill_extraction_prompt(input_text: str) -> str:
+    return f"""Extract technical skills from this resume text. Return a JSON object with a single key "extracted_skills" containing a list of lowercase strings.
+
+USER INPUT: {compact_resume_text(input_text)}"""
+
+@traced('parse_skills', kind='parse')
+def _apply_skill_extraction(state, input_text: str, response):
     try:
         content = response.content
         # Gemini sometimes wraps the JSON in markdown
@@ -121,24 +146,98 @@ def agent1_skill_extractor(state):
         
         result = json.loads(content)
         state['extracted_skills'] = result.get('extracted_skills', [])
+        skill_cache.set(_skill_cache_key(input_text), state['extracted_skills'])
     except (json.JSONDecodeError, KeyError) as e:
         print(f"Agent1 JSON parsing error: {e}")
         state['extracted_skills'] = []
     
     return state
 
-def agent2_gap_analyzer(state):
-    """Analyze skill gaps using Gemini."""
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") 
+def extract_skills_locally(input_text: str):
+    """
+    Vocabulary-matcher result for the configured extractor mode, or None when
+    Gemini should be asked instead (llm mode, or too few skills in hybrid mode).
+    """
+    mode = PERFORMANCE_CONFIG['skill_extractor']
+    if mode == 'llm':
+        return None
+    profiler.start_timer('local_skill_extraction')
+    skills = local_skill_extractor.extract(input_text)
+    profiler.end_timer('local_skill_extraction')
+    if mode == 'local' or len(skills) >= PERFORMANCE_CONFIG['hybrid_min_skills']:
+        return skills
+    return None
+
+def _cached_skills_for_state(state):
+    """Extraction cache hit for the run's input, without a second lookup after a seeding miss."""
+    if state.get('skill_cache_checked'):
+        return None
+    return get_cached_skills(state.get('input', ''))
+
+def agent1_skill_extractor(state):
+    """Extract skills locally and/or with Gemini, depending on SKILL_EXTRACTOR."""
+    input_text = state.get('input', '')
+    cached_skills = _cached_skills_for_state(state)
+    if cached_skills is not None:
+        state['extracted_skills'] = cached_skills
+        return state
+
+    local_skills = extract_skills_locally(input_text)
+    if local_skills is not None:
+        state['extracted_skills'] = local_skills
+        return state
+
+    message = HumanMessage(content=_skill_extraction_prompt(input_text))
+    response = llm_pool.invoke([message], purpose="skill_extraction")
+    return _apply_skill_extraction(state, input_text, response)
+
+async def agent1_skill_extractor_async(state):
+    """Async variant of agent1 used by graph.ainvoke."""
+    input_text = state.get('input', '')
+    cached_skills = _cached_skills_for_state(state)
+    if cached_skills is not None:
+        state['extracted_skills'] = cached_skills
+        return state
+
+    local_skills = extract_skills_locally(input_text)
+    if local_skills is not None:
+        state['extracted_skills'] = local_skills
+        return state
+
+    message = HumanMessage(content=_skill_extraction_prompt(input_text))
+    response = await llm_pool.ainvoke([message], purpose="skill_extraction")
+    return _apply_skill_extraction(state, input_text, response)
+
+def _nice_to_have_prompt(user_skills: list, missing_skills: list, target_role: str) -> str:
+    return f"""Suggest other relevant skills to learn for the target role '{target_role}'.
+    User skills: {user_skills}
+    Already planned (missing required skills): {missing_skills}
+    
+    Return a JSON object with a single key "nice_to_have" containing a short list of skills not already in either list."""
+
+@traced('parse_nice_to_have', kind='parse')
+def _parse_nice_to_have(response) -> list:
+    try:
+        content = response.content
+        if content.startswith('```json'):
+            content = content[7:-4]
+        
+        return json.loads(content).get('nice_to_have', [])
+    except (json.JSONDecodeError, KeyError, AttributeError) as e:
+        print(f"Agent2 nice-to-have parsing error: {e}")
+        return []
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash-latest",
-        google_api_key=GEMINI_API_KEY, 
-        temperature=0,
-        convert_system_message_to_human=True
-    )
-    # ---------------------------------------------
+def suggest_nice_to_have(user_skills: list, missing_skills: list, target_role: str) -> list:
+    """Ask Gemini for other relevant skills beyond the role's required list."""
+    message = HumanMessage(content=_nice_to_have_prompt(user_skills, missing_skills, target_role))
+    return _parse_nice_to_have(llm_pool.invoke([message], purpose="nice_to_have"))
 
+async def asuggest_nice_to_have(user_skills: list, missing_skills: list, target_role: str) -> list:
+    message = HumanMessage(content=_nice_to_have_prompt(user_skills, missing_skills, target_role))
+    return _parse_nice_to_have(await llm_pool.ainvoke([message], purpose="nice_to_have"))
+
+def agent2_llm_gap_analyzer(state):
+    """Analyze skill gaps using Gemini (used for roles outside the curated catalog)."""
     user_skills = state.get('extracted_skills', [])
     target_role = state.get('target_role', '')
     required_skills = JOB_ROLES_DATA.get(target_role, [])
@@ -150,104 +249,475 @@ def agent2_gap_analyzer(state):
     Return a JSON object with two keys: "missing_skills" (skills from required list that user doesn't have) and "nice_to_have" (other relevant skills to learn)."""
     
     message = HumanMessage(content=prompt)
-    response = llm.invoke([message])
+    response = llm_pool.invoke([message], purpose="gap_analysis")
     
-    try:
-        content = response.content
-        if content.startswith('```json'):
-            content = content[7:-4]
-        
-        result = json.loads(content)
-        state['missing_skills'] = result.get('missing_skills', [])
-        state['nice_to_have'] = result.get('nice_to_have', [])
-    except (json.JSONDecodeError, KeyError) as e:
-        print(f"Agent2 JSON parsing error: {e}")
-        state['missing_skills'] = []
-        state['nice_to_have'] = []
+    with span('parse_llm_gap_analysis', 'parse'):
+        try:
+            content = response.content
+            if content.startswith('```json'):
+                content = content[7:-4]
+            
+            result = json.loads(content)
+            state['missing_skills'] = result.get('missing_skills', [])
+            state['nice_to_have'] = result.get('nice_to_have', [])
+        except (json.JSONDecodeError, KeyError) as e:
+            print(f"Agent2 JSON parsing error: {e}")
+            state['missing_skills'] = []
+            state['nice_to_have'] = []
         
     return state
 
-def agent3_roadmap_mentor_optimized(state):
-    """Generate roadmap using Gemini."""
-    profiler.start_timer('roadmap_generation_total')
+def agent2_gap_analyzer(state):
+    """Compute missing skills locally; only nice_to_have enrichment uses Gemini."""
+    user_skills = state.get('extracted_skills', [])
+    target_role = state.get('target_role', '')
+    enrich = suggest_nice_to_have if PERFORMANCE_CONFIG['enrich_nice_to_have'] else None
     
-    missing_skills = state.get('missing_skills', [])
-    nice_to_have = state.get('nice_to_have', [])
+    result, from_cache = gap_engine.analyze(user_skills, target_role, enrich=enrich)
+    if result is None:
+        return agent2_llm_gap_analyzer(state)
+    profiler.record_cache_lookup(from_cache)
     
-  
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") 
+    state['missing_skills'] = list(result['missing_skills'])
+    state['nice_to_have'] = list(result['nice_to_have'])
+    return state
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash-latest",
-        google_api_key=GEMINI_API_KEY, # Add this line
-        temperature=0,
-        convert_system_message_to_human=True
-    )
-    # ---------------------------------------------
-    
-    prompt = f"""Create a 3-phase JSON learning roadmap for a person wanting to learn these skills:
+def _roadmap_prompt(missing_skills: list, nice_to_have: list) -> str:
+    return f"""Create a 3-phase JSON learning roadmap for a person wanting to learn these skills:
     Missing Skills (High Priority): {missing_skills}
     Nice-to-have Skills (Lower Priority): {nice_to_have}
     
     The JSON output must follow this structure: {{"roadmap": [{{"phase": "Phase 1: Foundation", "skills": [{{"skill": "Python", "course": "Python for Everybody - Coursera", "reason": "Good for beginners", "est_hours": 15}}]}}]}}"""
 
-    message = HumanMessage(content=prompt)
-    response = llm.invoke([message])
-    
+# Bump when the roadmap prompt changes; the template hash also catches edits
+ROADMAP_PROMPT_VERSION = "v1"
+_ROADMAP_TEMPLATE_HASH = hashlib.sha256(_roadmap_prompt(['{missing}'], ['{nice}']).encode('utf-8')).hexdigest()[:16]
+
+def roadmap_version() -> str:
+    """Prompt version, template, model and ROADMAP_SOURCE that a roadmap was produced under."""
+    return f"{ROADMAP_PROMPT_VERSION}-{_ROADMAP_TEMPLATE_HASH}-{DEFAULT_MODEL}-{PERFORMANCE_CONFIG['roadmap_source']}"
+
+def roadmap_cache_key(target_role: str, missing_skills: list, nice_to_have: list) -> str:
+    """Versioned key over model, prompt template, role and the canonical skill gaps."""
+    role = gap_engine.resolve_role(target_role) or target_role.strip().lower()
+    payload = json.dumps([
+        ROADMAP_PROMPT_VERSION, _ROADMAP_TEMPLATE_HASH, DEFAULT_MODEL, role,
+        sorted(canonical_skill_set(missing_skills)), sorted(canonical_skill_set(nice_to_have))
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+@traced('parse_roadmap', kind='parse')
+def _parse_roadmap(content: str) -> list:
+    if content.startswith('```json'):
+        content = content[7:-4]
+    return json.loads(content).get('roadmap', [])
+
+def generate_roadmap(missing_skills: list, nice_to_have: list) -> list:
+    """One roadmap LLM call; returns [] if the response can't be parsed."""
+    message = HumanMessage(content=_roadmap_prompt(missing_skills, nice_to_have))
+    response = llm_pool.invoke([message], purpose="roadmap")
     try:
-        content = response.content
-        if content.startswith('```json'):
-            content = content[7:-4]
-        
-        roadmap_result = json.loads(content)
-        state['roadmap'] = roadmap_result.get('roadmap', [])
-    except (json.JSONDecodeError, KeyError) as e:
+        return _parse_roadmap(response.content)
+    except (json.JSONDecodeError, KeyError, AttributeError) as e:
         print(f"Agent3 JSON parsing error: {e}")
-        state['roadmap'] = []
+        return []
+
+def catalog_roadmap(missing_skills: list, nice_to_have: list):
+    """Roadmap assembled from the course index per ROADMAP_SOURCE, or None to use Gemini."""
+    source = PERFORMANCE_CONFIG['roadmap_source']
+    if source == 'llm' or not (missing_skills or nice_to_have):
+        return None
+    return course_index.build_roadmap(plan_roadmap_phases(missing_skills, nice_to_have),
+                                      require_coverage=source != 'catalog')
+
+def agent3_roadmap_mentor_optimized(state):
+    """Assemble the roadmap from the course catalog, or generate it with Gemini via the roadmap cache."""
+    profiler.start_timer('roadmap_generation_total')
+    
+    missing_skills = state.get('missing_skills', [])
+    nice_to_have = state.get('nice_to_have', [])
+    
+    roadmap = catalog_roadmap(missing_skills, nice_to_have)
+    if roadmap is not None:
+        state['roadmap'] = roadmap
+        state['roadmap_cache_status'] = 'catalog'
+        profiler.end_timer('roadmap_generation_total')
+        state['performance_data'] = profiler.get_performance_report()
+        return state
+    
+    key = roadmap_cache_key(state.get('target_role', ''), missing_skills, nice_to_have)
+    roadmap, status = roadmap_cache.get_or_compute(key, lambda: generate_roadmap(missing_skills, nice_to_have))
+    profiler.record_cache_lookup(status != 'miss')
+    state['roadmap'] = list(roadmap)
+    state['roadmap_cache_status'] = status
         
     profiler.end_timer('roadmap_generation_total')
     state['performance_data'] = profiler.get_performance_report()
     
     return state
 
-# The rest of the functions (run_pipeline_optimized, extract_skills_only, etc.) remain the same.
-# They will now use the updated agents with Gemini.
-def run_pipeline_optimized(input_text: str, target_role: str, log_execution: bool = False) -> dict:
-    global profiler
-    profiler = PerformanceProfiler()
-    profiler.start_timer('pipeline_total')
+# --- Parallel pipeline stages ---
+# missing_skills (local) and nice_to_have (LLM) run as sibling branches, then
+# each roadmap phase is generated by its own LLM call fanned out with Send.
+# Wall-clock time is bounded by the slowest branch of each stage rather than
+# the sum of every call. Sync invoke runs branches on LangGraph's thread pool
+# (greenlets under the gevent worker); ainvoke runs them as asyncio tasks.
+ROADMAP_PHASE_NAMES = ["Phase 1: Foundation", "Phase 2: Core Skills", "Phase 3: Advanced & Nice-to-have"]
+
+def plan_roadmap_phases(missing_skills: list, nice_to_have: list) -> list:
+    """Split skills into per-phase work items: missing skills across phases 1-2, nice_to_have in phase 3."""
+    split = (len(missing_skills) + 1) // 2
+    groups = [
+        (missing_skills[:split], 'high'),
+        (missing_skills[split:], 'high'),
+        (nice_to_have, 'low'),
+    ]
+    return [
+        {'index': i, 'phase': ROADMAP_PHASE_NAMES[i], 'skills': skills, 'priority': priority}
+        for i, (skills, priority) in enumerate(groups) if skills
+    ]
+
+def _roadmap_phase_prompt(plan: dict) -> str:
+    return f"""Create one phase of a JSON learning roadmap named "{plan['phase']}" for a person wanting to learn these skills ({plan['priority']} priority): {plan['skills']}
     
+    The JSON output must follow this structure: {{"phase": "{plan['phase']}", "skills": [{{"skill": "Python", "course": "Python for Everybody - Coursera", "reason": "Good for beginners", "est_hours": 15}}]}}"""
+
+_ROADMAP_PHASE_TEMPLATE_HASH = hashlib.sha256(_roadmap_phase_prompt(
+    {'phase': '{phase}', 'priority': '{priority}', 'skills': ['{skills}']}).encode('utf-8')).hexdigest()[:16]
+
+def roadmap_phase_cache_key(target_role: str, plan: dict) -> str:
+    """roadmap_cache key for one phase of the parallel topology; never collides with whole-roadmap keys."""
+    role = gap_engine.resolve_role(target_role) or target_role.strip().lower()
+    payload = json.dumps([
+        ROADMAP_PROMPT_VERSION, _ROADMAP_PHASE_TEMPLATE_HASH, DEFAULT_MODEL, role,
+        plan['phase'], plan['priority'], sorted(canonical_skill_set(plan['skills']))
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _phase_cacheable(phase: dict) -> bool:
+    return bool(phase.get('skills'))
+
+@traced('parse_roadmap_phase', kind='parse')
+def _parse_roadmap_phase(plan: dict, response) -> dict:
+    try:
+        content = response.content
+        if content.startswith('```json'):
+            content = content[7:-4]
+        
+        phase = json.loads(content)
+        phase['phase'] = phase.get('phase', plan['phase'])
+        return phase
+    except (json.JSONDecodeError, KeyError, AttributeError) as e:
+        print(f"Agent3 phase JSON parsing error: {e}")
+        return {'phase': plan['phase'], 'skills': []}
+
+def generate_roadmap_phase(plan: dict) -> dict:
+    """One roadmap-phase LLM call; a phase without skills if the response can't be parsed."""
+    message = HumanMessage(content=_roadmap_phase_prompt(plan))
+    return _parse_roadmap_phase(plan, llm_pool.invoke([message], purpose="roadmap_phase"))
+
+def gap_missing_node(state):
+    """Parallel branch: deterministic missing_skills (LLM fallback for unknown roles)."""
+    user_skills = state.get('extracted_skills', [])
+    role = gap_engine.resolve_role(state.get('target_role', ''))
+    if role is None:
+        result = agent2_llm_gap_analyzer({'extracted_skills': user_skills, 'target_role': state.get('target_role', '')})
+        return {'missing_skills': result['missing_skills'], 'nice_to_have': result['nice_to_have']}
+    return {'missing_skills': gap_engine.compute_missing_skills(user_skills, JOB_ROLES_DATA[role])}
+
+def _nice_to_have_branch_setup(state):
+    user_skills = state.get('extracted_skills', [])
+    role = gap_engine.resolve_role(state.get('target_role', ''))
+    if role is None or not PERFORMANCE_CONFIG['enrich_nice_to_have']:
+        return user_skills, role, None, []
+    key = gap_engine.cache_key(user_skills, role, 'nice_to_have')
+    cached = gap_engine.cache.get(key)
+    profiler.record_cache_lookup(cached is not None)
+    return user_skills, role, key, cached
+
+def gap_nice_to_have_node(state):
+    """Parallel branch: LLM nice_to_have enrichment, memoized per (skill set, role)."""
+    user_skills, role, key, cached = _nice_to_have_branch_setup(state)
+    if key is None or cached is not None:
+        return {'nice_to_have': list(cached)} if role is not None else {}
+    missing_skills = gap_engine.compute_missing_skills(user_skills, JOB_ROLES_DATA[role])
+    nice_to_have = suggest_nice_to_have(user_skills, missing_skills, role)
+    gap_engine.cache.set(key, nice_to_have)
+    return {'nice_to_have': list(nice_to_have)}
+
+async def gap_nice_to_have_node_async(state):
+    user_skills, role, key, cached = _nice_to_have_branch_setup(state)
+    if key is None or cached is not None:
+        return {'nice_to_have': list(cached)} if role is not None else {}
+    missing_skills = gap_engine.compute_missing_skills(user_skills, JOB_ROLES_DATA[role])
+    nice_to_have = await asuggest_nice_to_have(user_skills, missing_skills, role)
+    gap_engine.cache.set(key, nice_to_have)
+    return {'nice_to_have': list(nice_to_have)}
+
+def gap_join_node(state):
+    """Join point for the gap branches; starts the roadmap stage and tries the course catalog."""
+    profiler.start_timer('roadmap_generation_total')
+    roadmap = catalog_roadmap(state.get('missing_skills', []), state.get('nice_to_have', []))
+    return {'roadmap': roadmap, 'roadmap_cache_status': 'catalog'} if roadmap is not None else {}
+
+def dispatch_roadmap_phases(state):
+    """Fan out one roadmap_phase task per non-empty phase (none if the catalog built the roadmap)."""
+    plans = plan_roadmap_phases(state.get('missing_skills', []), state.get('nice_to_have', []))
+    if not plans or state.get('roadmap') is not None:
+        return 'roadmap_join'
+    target_role = state.get('target_role', '')
+    return [Send('roadmap_phase', dict(plan, target_role=target_role)) for plan in plans]
+
+def roadmap_phase_node(plan):
+    """One phase through roadmap_cache (single-flight on a miss, background refresh when stale)."""
+    key = roadmap_phase_cache_key(plan['target_role'], plan)
+    phase, status = roadmap_cache.get_or_compute(key, lambda: generate_roadmap_phase(plan), cacheable=_phase_cacheable)
+    profiler.record_cache_lookup(status != 'miss')
+    return {'roadmap_phases': [(plan['index'], dict(phase), status)]}
+
+async def roadmap_phase_node_async(plan):
+    key = roadmap_phase_cache_key(plan['target_role'], plan)
+    phase, status = roadmap_cache.get(key, refresh=lambda: generate_roadmap_phase(plan), cacheable=_phase_cacheable)
+    profiler.record_cache_lookup(status is not None)
+    if status is None:
+        message = HumanMessage(content=_roadmap_phase_prompt(plan))
+        phase, status = _parse_roadmap_phase(plan, await llm_pool.ainvoke([message], purpose="roadmap_phase")), 'miss'
+        if _phase_cacheable(phase):
+            roadmap_cache.set(key, phase)
+    return {'roadmap_phases': [(plan['index'], dict(phase), status)]}
+
+# Status reported for a roadmap assembled from phases: the least cached one wins
+_PHASE_STATUS_ORDER = ('miss', 'coalesced', 'stale', 'hit')
+
+def roadmap_join_node(state):
+    """Merge phases back into roadmap order."""
+    phases = sorted(state.get('roadmap_phases', []), key=lambda item: item[0])
+    profiler.end_timer('roadmap_generation_total')
+    update = {
+        'roadmap': [phase for _, phase, _ in phases] if phases else state.get('roadmap') or [],
+        'performance_data': profiler.get_performance_report()
+    }
+    if phases:
+        update['roadmap_cache_status'] = min((status for _, _, status in phases), key=_PHASE_STATUS_ORDER.index)
+    return update
+
+# --- Compiled graph registry ---
+# Each topology is compiled once and shared; compiled graphs hold no per-run
+# state, so concurrent requests can invoke the same instance safely.
+def _node(name: str, func, afunc=None):
+    """Graph node that records a 'node' span per execution"""
+    func = traced(name, kind='node')(func)
+    if afunc is None:
+        return RunnableLambda(func)
+    return RunnableLambda(func, afunc=traced(name, kind='node')(afunc))
+
+PIPELINE_NODES = {
+    'agent1': _node('agent1', agent1_skill_extractor, agent1_skill_extractor_async),
+    'agent2': _node('agent2', agent2_gap_analyzer),
+    'agent3': _node('agent3', agent3_roadmap_mentor_optimized),
+}
+
+def _build_sequential_graph(nodes: list):
     workflow = StateGraph(MyState)
-    workflow.add_node("agent1", agent1_skill_extractor)
-    workflow.add_node("agent2", agent2_gap_analyzer)
-    workflow.add_node("agent3", agent3_roadmap_mentor_optimized)
-    workflow.set_entry_point("agent1")
-    workflow.add_edge("agent1", "agent2")
-    workflow.add_edge("agent2", "agent3")
-    workflow.add_edge("agent3", END)
-    
-    app = workflow.compile()
+    for name in nodes:
+        workflow.add_node(name, PIPELINE_NODES[name])
+    workflow.set_entry_point(nodes[0])
+    for current, following in zip(nodes, nodes[1:]):
+        workflow.add_edge(current, following)
+    workflow.add_edge(nodes[-1], END)
+    return workflow
+
+def _build_parallel_graph(with_extractor: bool):
+    workflow = StateGraph(MyState)
+    workflow.add_node('gap_missing', _node('gap_missing', gap_missing_node))
+    workflow.add_node('gap_nice_to_have', _node('gap_nice_to_have', gap_nice_to_have_node, gap_nice_to_have_node_async))
+    workflow.add_node('gap_join', _node('gap_join', gap_join_node))
+    workflow.add_node('roadmap_phase', _node('roadmap_phase', roadmap_phase_node, roadmap_phase_node_async))
+    workflow.add_node('roadmap_join', _node('roadmap_join', roadmap_join_node))
+
+    if with_extractor:
+        workflow.add_node('agent1', PIPELINE_NODES['agent1'])
+        workflow.set_entry_point('agent1')
+        workflow.add_edge('agent1', 'gap_missing')
+        workflow.add_edge('agent1', 'gap_nice_to_have')
+    else:
+        workflow.add_edge(START, 'gap_missing')
+        workflow.add_edge(START, 'gap_nice_to_have')
+
+    workflow.add_edge(['gap_missing', 'gap_nice_to_have'], 'gap_join')
+    workflow.add_conditional_edges('gap_join', dispatch_roadmap_phases, ['roadmap_phase', 'roadmap_join'])
+    workflow.add_edge('roadmap_phase', 'roadmap_join')
+    workflow.add_edge('roadmap_join', END)
+    return workflow
+
+GRAPH_TOPOLOGIES = {
+    'full': lambda: _build_sequential_graph(['agent1', 'agent2', 'agent3']),
+    'skip_extractor': lambda: _build_sequential_graph(['agent2', 'agent3']),  # extracted_skills supplied by the caller
+    'parallel': lambda: _build_parallel_graph(with_extractor=True),
+    'parallel_skip_extractor': lambda: _build_parallel_graph(with_extractor=False),
+}
+
+_compiled_graphs = {}
+_graph_lock = threading.Lock()
+
+def build_graph(topology: str = 'full'):
+    """Build and compile the StateGraph for a named topology."""
+    if topology not in GRAPH_TOPOLOGIES:
+        raise ValueError(f"Unknown pipeline topology: {topology}")
+    return GRAPH_TOPOLOGIES[topology]().compile()
+
+def get_compiled_graph(topology: str = 'full'):
+    """Return the shared compiled graph for a topology, compiling it on first use."""
+    graph = _compiled_graphs.get(topology)
+    if graph is None:
+        with _graph_lock:
+            graph = _compiled_graphs.get(topology)
+            if graph is None:
+                graph = build_graph(topology)
+                _compiled_graphs[topology] = graph
+    return graph
+
+def _select_topology(seeded: bool, parallel: bool) -> str:
+    if parallel:
+        return 'parallel_skip_extractor' if seeded else 'parallel'
+    return 'skip_extractor' if seeded else 'full'
+
+def _prepare_pipeline_run(input_text: str, target_role: str, topology: str,
+                          extracted_skills: list, parallel: bool):
+    profiler.start_timer('pipeline_total')
     
     initial_state = MyState({'input': input_text, 'target_role': target_role})
-    result = app.invoke(initial_state)
-    
+    if extracted_skills is None and topology is None:
+        # Seed from the extraction cache so agent1 can be skipped entirely; on a miss
+        # agent1 is told not to look again, so each run counts one lookup
+        extracted_skills = get_cached_skills(input_text)
+        initial_state['skill_cache_checked'] = extracted_skills is None
+    if extracted_skills is not None:
+        initial_state['extracted_skills'] = extracted_skills
+    if topology is None:
+        if parallel is None:
+            parallel = PERFORMANCE_CONFIG['parallel_mode']
+        topology = _select_topology(extracted_skills is not None, parallel)
+
+    return get_compiled_graph(topology), initial_state
+
+def _finish_pipeline_run(result: dict) -> dict:
+    result.pop('roadmap_phases', None)
+    result.pop('skill_cache_checked', None)
     profiler.end_timer('pipeline_total')
     result['performance_summary'] = profiler.get_performance_report()
+    result['performance_summary']['llm_pool'] = llm_pool.get_stats()
+    result['performance_summary']['skill_cache'] = skill_cache.get_stats()
+    result['performance_summary']['gap_cache'] = gap_engine.cache.get_stats()
+    result['performance_summary']['roadmap_cache'] = dict(roadmap_cache.get_stats(),
+                                                          status=result.pop('roadmap_cache_status', None))
     
     return result
 
+def run_pipeline_optimized(input_text: str, target_role: str, log_execution: bool = False,
+                           topology: str = None, extracted_skills: list = None, parallel: bool = None) -> dict:
+    with profiling_scope():
+        app, initial_state = _prepare_pipeline_run(input_text, target_role, topology, extracted_skills, parallel)
+        result = app.invoke(initial_state)
+        return _finish_pipeline_run(result)
+
+async def arun_pipeline_optimized(input_text: str, target_role: str, topology: str = None,
+                                  extracted_skills: list = None, parallel: bool = None) -> dict:
+    """Async entry point (graph.ainvoke); LLM calls in parallel branches run as concurrent tasks."""
+    with profiling_scope():
+        app, initial_state = _prepare_pipeline_run(input_text, target_role, topology, extracted_skills, parallel)
+        result = await app.ainvoke(initial_state)
+        return _finish_pipeline_run(result)
+
 def extract_skills_only(input_text: str) -> dict:
-    global profiler
-    profiler = PerformanceProfiler()
-    profiler.start_timer('skill_extraction_only')
-    
-    state = {'input': input_text}
-    result_state = agent1_skill_extractor(state)
-    
-    profiler.end_timer('skill_extraction_only')
-    performance_data = profiler.get_performance_report()
+    with profiling_scope() as run_profiler:
+        with span('skill_extraction_only', 'stage'):
+            result_state = agent1_skill_extractor({'input': input_text})
+        performance_data = run_profiler.get_performance_report()
+    performance_data['llm_pool'] = llm_pool.get_stats()
+    performance_data['skill_cache'] = skill_cache.get_stats()
     
     return {
         'extracted_skills': result_state.get('extracted_skills', []),
         'performance_summary': performance_data
-    }
\ No newline at end of file
+    }
+
+def stream_pipeline_optimized(input_text: str, target_role: str, extracted_skills: list = None):
+    """
+    Run the pipeline as a generator of (event, payload) pairs.
+
+    Emits 'extracted_skills', then 'missing_skills' (with nice_to_have), then one
+    'phase' per roadmap phase as soon as its JSON object has streamed in from
+    Gemini (or straight from the roadmap cache), and finally 'performance'.
+    """
+    with profiling_scope():
+        yield from _stream_pipeline_events(input_text, target_role, extracted_skills)
+
+def _stream_pipeline_events(input_text: str, target_role: str, extracted_skills: list):
+    profiler.start_timer('pipeline_total')
+
+    state = MyState({'input': input_text, 'target_role': target_role})
+    if extracted_skills is not None:
+        state['extracted_skills'] = extracted_skills
+    else:
+        with span('agent1', 'node'):
+            state = agent1_skill_extractor(state)
+    yield 'extracted_skills', {'extracted_skills': state.get('extracted_skills', [])}
+
+    with span('agent2', 'node'):
+        state = agent2_gap_analyzer(state)
+    yield 'missing_skills', {
+        'missing_skills': state.get('missing_skills', []),
+        'nice_to_have': state.get('nice_to_have', [])
+    }
+
+    missing_skills, nice_to_have = state.get('missing_skills', []), state.get('nice_to_have', [])
+    profiler.start_timer('roadmap_generation_total')
+    profiler.start_timer('roadmap_first_phase')
+    roadmap = catalog_roadmap(missing_skills, nice_to_have)
+    if roadmap is not None:
+        cached, status = roadmap, 'catalog'
+    else:
+        key = roadmap_cache_key(target_role, missing_skills, nice_to_have)
+        cached, status = roadmap_cache.get(key, refresh=lambda: generate_roadmap(missing_skills, nice_to_have))
+        profiler.record_cache_lookup(cached is not None)
+    if cached is not None:
+        profiler.end_timer('roadmap_first_phase')
+        for i, phase in enumerate(cached):
+            yield 'phase', {'index': i, 'phase': phase}
+    else:
+        status = 'miss'
+        message = HumanMessage(content=_roadmap_prompt(missing_skills, nice_to_have))
+        parser = RoadmapStreamParser('roadmap')
+        chunks = []
+        emitted = 0
+        for chunk in llm_pool.stream([message], purpose="roadmap"):
+            chunks.append(chunk)
+            for phase in parser.feed(chunk):
+                if emitted == 0:
+                    profiler.end_timer('roadmap_first_phase')
+                yield 'phase', {'index': emitted, 'phase': phase}
+                emitted += 1
+
+        # Only a fully closed array is cached; a truncated stream is served but not stored
+        roadmap = parser.items if parser.done else []
+        if not emitted:
+            # Model didn't produce a parsable "roadmap" array incrementally; fall back to a full parse
+            try:
+                roadmap = _parse_roadmap("".join(chunks))
+                for i, phase in enumerate(roadmap):
+                    yield 'phase', {'index': i, 'phase': phase}
+            except (json.JSONDecodeError, AttributeError) as e:
+                print(f"Agent3 JSON parsing error: {e}")
+        if roadmap:
+            roadmap_cache.set(key, list(roadmap))
+    profiler.end_timer('roadmap_generation_total')
+
+    profiler.end_timer('pipeline_total')
+    performance = profiler.get_performance_report()
+    performance['llm_pool'] = llm_pool.get_stats()
+    performance['roadmap_cache'] = dict(roadmap_cache.get_stats(), status=status)
+    yield 'performance', performance
+
+# Compile the default topology at import so the first request doesn't pay for it
+get_compiled_graph('full')
@@ -0,0 +1,141 @@
+"""
+Course index
+
+data/courses.json parsed once at startup: every course string becomes a
+structured record (title, platform, duration, est_hours, url) and the records
+are indexed by canonical skill name, so finding courses for a skill is a dict
+lookup. Roadmaps for skills that all have catalog courses can be assembled
+from the index without an LLM call.
+"""
+
+import re
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from agents.skill_normalizer import SkillNormalizer, skill_normalizer
+
+# Platform keyword -> typical duration, checked in order
+PLATFORM_DURATIONS = (
+    ('coursera', '4-6 weeks'), ('edx', '4-8 weeks'), ('udemy', '10-15 hours'),
+    ('youtube', '2-5 hours'), ('freecodecamp', '5-10 hours'), ('w3schools', '1-3 hours'),
+    ('khan academy', '2-4 weeks'), ('ibm skillsbuild', '3-5 hours'), ('official documentation', '1-2 hours'),
+    ('datacamp', '2-4 hours'), ('official', '1-2 hours'), ('microsoft learn', '2-4 hours'),
+    ('google', '3-6 hours'), ('free book', '2-3 weeks'), ('tutorial', '1-3 hours'),
+)
+
+# Course-type keywords override the platform estimate, first match wins
+COURSE_TYPE_DURATIONS = (
+    (('certification', 'certificate'), '6-8 weeks'),
+    (('bootcamp',), '12-24 weeks'),
+    (('crash course',), '1-2 days'),
+    (('full course',), '8-12 hours'),
+    (('tutorial',), '1-3 hours'),
+)
+
+# Study hours per unit when converting a duration range to an estimate. A
+# week is WEEKLY_STUDY_HOURS both here and when phase hours are turned back
+# into a time frame, so est_hours and phase_time_frame agree.
+WEEKLY_STUDY_HOURS = 10
+HOURS_PER_UNIT = {'hour': 1, 'day': 4, 'week': WEEKLY_STUDY_HOURS}
+
+_DURATION_RE = re.compile(r"(\d+)(?:-(\d+))?\s*(hour|day|week)")
+
+
+def course_url(title: str, platform: str) -> str:
+    return f'https://www.google.com/search?q="{title}"+"online+course"'
+
+
+def duration_hours(duration: str) -> int:
+    """Midpoint of a duration range in study hours: '4-6 weeks' -> 50"""
+    match = _DURATION_RE.search(duration)
+    if not match:
+        return 0
+    low = int(match.group(1))
+    high = int(match.group(2) or low)
+    return round((low + high) / 2 * HOURS_PER_UNIT[match.group(3)])
+
+
+@lru_cache(maxsize=4096)
+def _parse_course_string(course_string: str) -> tuple:
+    title, platform, duration = course_string, 'Online', '2-4 hours'
+
+    if ' - ' in course_string:
+        title, platform_part = (part.strip() for part in course_string.split(' - ', 1))
+        platform = platform_part.split(' (')[0].strip() if ' (' in platform_part else platform_part
+
+    platform_lower = platform.lower()
+    duration = next((dur for key, dur in PLATFORM_DURATIONS if key in platform_lower), duration)
+
+    course_lower = course_string.lower()
+    duration = next((dur for keys, dur in COURSE_TYPE_DURATIONS if any(key in course_lower for key in keys)),
+                    duration)
+    return title, platform, duration
+
+
+def parse_course_string(course_string: str) -> Dict:
+    """'Title - Platform (Provider)' -> {title, platform, duration, url}; memoized"""
+    if not course_string or course_string == 'N/A':
+        return {'title': 'N/A', 'platform': 'N/A', 'duration': 'N/A', 'url': ''}
+    title, platform, duration = _parse_course_string(course_string)
+    return {'title': title, 'platform': platform, 'duration': duration, 'url': course_url(title, platform)}
+
+
+class CourseIndex:
+    """Pre-parsed course records keyed by canonical skill name"""
+
+    def __init__(self, courses_data: Dict[str, List[str]], normalizer: SkillNormalizer = skill_normalizer):
+        self.normalizer = normalizer
+        self.by_skill = {}
+        for skill, courses in courses_data.items():
+            records = []
+            for course_string in courses:
+                record = parse_course_string(course_string)
+                record['est_hours'] = duration_hours(record['duration'])
+                records.append(record)
+            self.by_skill.setdefault(normalizer.normalize(skill), []).extend(records)
+
+    def lookup(self, skill: str) -> List[Dict]:
+        """Courses for any spelling of a skill, best first ([] if none)"""
+        return self.by_skill.get(self.normalizer.normalize(skill), [])
+
+    def covers(self, skills: List[str]) -> bool:
+        return all(self.lookup(skill) for skill in skills)
+
+    @staticmethod
+    def _generic_course(skill: str) -> Dict:
+        title = f"{skill} Fundamentals"
+        duration = '2-4 hours'
+        return {'title': title, 'platform': 'Online', 'duration': duration,
+                'url': course_url(title, 'Online'), 'est_hours': duration_hours(duration)}
+
+    def build_phase(self, name: str, skills: List[str], reason: str) -> Dict:
+        """One roadmap phase using the first catalog course for each skill"""
+        items = []
+        for skill in skills:
+            courses = self.lookup(skill)
+            course = courses[0] if courses else self._generic_course(skill)
+            items.append({
+                'skill': skill,
+                'course': {key: course[key] for key in ('title', 'platform', 'duration', 'url')},
+                'reason': reason,
+                'est_hours': course['est_hours']
+            })
+        total_hours = sum(item['est_hours'] for item in items)
+        return {
+            'phase': name,
+            'skills': items,
+            'phase_total_hours': total_hours,
+            'phase_time_frame': f"{max(math.ceil(total_hours / WEEKLY_STUDY_HOURS), 1)} weeks"
+        }
+
+    def build_roadmap(self, phase_plans: List[Dict], require_coverage: bool = True) -> Optional[List[Dict]]:
+        """
+        Roadmap from plan_roadmap_phases-style plans. With require_coverage,
+        returns None if any skill has no catalog course (the caller then asks
+        the LLM); otherwise such skills get a generic online-course entry.
+        """
+        if require_coverage and not self.covers([skill for plan in phase_plans for skill in plan['skills']]):
+            return None
+        reasons = {'high': 'Required for the target role', 'low': 'Recommended for the target role'}
+        return [self.build_phase(plan['phase'], plan['skills'], reasons[plan['priority']]) for plan in phase_plans]
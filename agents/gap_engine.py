@@ -0,0 +1,76 @@
+"""
+Deterministic skill gap engine
+
+Computes missing skills for a role as a set difference over canonical skill
+names, so the common case needs no LLM round-trip. Results are memoized on the
+canonical user skill set plus the role.
+"""
+
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from agents.cache_utils import LRUCache
+from agents.skill_normalizer import skill_normalizer
+
+
+def canonical_skill(name: str) -> str:
+    """Canonical name for a single skill (see skill_normalizer)"""
+    return skill_normalizer.normalize(name)
+
+
+def canonical_skill_set(skills: Iterable[str]) -> frozenset:
+    return frozenset(canonical_skill(s) for s in skills if isinstance(s, str) and s.strip())
+
+
+def _role_slug(role: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", role.lower()).strip("-")
+
+
+class GapEngine:
+    """Set-based gap analysis against the curated job role catalog"""
+
+    def __init__(self, job_roles: Dict[str, List[str]], cache_size: int = 1024):
+        self.job_roles = job_roles
+        skill_normalizer.add_vocabulary(skill for skills in job_roles.values() for skill in skills)
+        self.role_index = {_role_slug(role): role for role in job_roles}
+        self.cache = LRUCache(maxsize=cache_size)
+
+    def resolve_role(self, target_role: str) -> Optional[str]:
+        """Map a role as sent by the UI ('data-scientist') to its catalog key"""
+        if target_role in self.job_roles:
+            return target_role
+        return self.role_index.get(_role_slug(target_role or ""))
+
+    def cache_key(self, user_skills: Iterable[str], role: str, kind: str) -> tuple:
+        """Memo key for a result of the given kind on the canonical skill set plus role"""
+        return (canonical_skill_set(user_skills), role, kind)
+
+    def compute_missing_skills(self, user_skills: Iterable[str], required_skills: List[str]) -> List[str]:
+        """Required skills (original spelling, catalog order) the user doesn't have"""
+        have = canonical_skill_set(user_skills)
+        return [skill for skill in required_skills if canonical_skill(skill) not in have]
+
+    def analyze(self, user_skills: List[str], target_role: str,
+                enrich: Optional[Callable[[List[str], List[str], str], List[str]]] = None) -> Tuple[Optional[Dict], bool]:
+        """
+        Compute missing skills locally and optionally enrich with nice-to-have skills.
+
+        Returns (result, from_cache). result is None when the role isn't in the
+        catalog so callers can fall back to a full LLM analysis. The result
+        (including enrichment) is memoized.
+        """
+        role = self.resolve_role(target_role)
+        if role is None:
+            return None, False
+
+        cache_key = self.cache_key(user_skills, role, 'enriched' if enrich else 'missing')
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+        missing_skills = self.compute_missing_skills(user_skills, self.job_roles[role])
+        nice_to_have = enrich(user_skills, missing_skills, role) if enrich else []
+
+        result = {'missing_skills': missing_skills, 'nice_to_have': nice_to_have}
+        self.cache.set(cache_key, result)
+        return result, False
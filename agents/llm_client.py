@@ -0,0 +1,258 @@
+"""
+Shared Gemini client layer
+
+Builds each ChatGoogleGenerativeAI client once per process and hands the same
+instance to every agent, so the underlying HTTP client and its keep-alive
+connections are reused across requests. In-flight calls are bounded by a
+semaphore; under the gunicorn gevent worker `threading` is monkey-patched, so
+the lock and semaphore below yield to other greenlets instead of blocking.
+
+Clients come from a factory (Gemini by default); the offline benchmarks swap
+in a fake chat model with set_client_factory.
+
+Retries of transient errors (429, 5xx, timeouts) happen here rather than in
+the Google SDK, so they can be counted. Every call is recorded by
+agents.llm_metrics (queue time, generation time, TTFT, tokens, retries, cost).
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages.ai import add_usage
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from agents.profiling import span
+from agents.llm_metrics import LLMCall
+
+DEFAULT_MODEL = "gemini-1.5-flash-latest"
+
+LLM_POOL_CONFIG = {
+    'max_connections': int(os.getenv("LLM_MAX_CONNECTIONS", "8")),
+    'acquire_timeout': float(os.getenv("LLM_ACQUIRE_TIMEOUT", "30")),
+    'max_retries': int(os.getenv("LLM_MAX_RETRIES", "3")),
+    'retry_backoff': float(os.getenv("LLM_RETRY_BACKOFF", "0.5")),
+}
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors and timeouts are worth another attempt"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    return isinstance(status, int) and status in RETRYABLE_STATUS_CODES
+
+
+def gemini_client(model: str = DEFAULT_MODEL, temperature: float = 0) -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model=model,
+        google_api_key=os.getenv("GEMINI_API_KEY"),
+        temperature=temperature,
+        convert_system_message_to_human=True,
+        max_retries=1  # a single SDK attempt; LLMClientPool retries and counts them
+    )
+
+
+class LLMClientPool:
+    """Process-wide registry of chat clients with a bounded number of in-flight calls"""
+
+    def __init__(self, max_connections: int = LLM_POOL_CONFIG['max_connections'],
+                 acquire_timeout: float = LLM_POOL_CONFIG['acquire_timeout'],
+                 max_retries: int = LLM_POOL_CONFIG['max_retries'],
+                 retry_backoff: float = LLM_POOL_CONFIG['retry_backoff']):
+        self.max_connections = max_connections
+        self.acquire_timeout = acquire_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._clients = {}
+        self._client_factory = gemini_client
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        # Async callers queue here for a slot: one thread, so they are served in arrival order
+        self._slot_waiters = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-slot-wait")
+        self._active_connections = 0
+        self._peak_connections = 0
+        self._total_calls = 0
+        self._totals = {'input_tokens': 0, 'output_tokens': 0, 'retries': 0, 'errors': 0, 'estimated_cost_usd': 0.0}
+
+    def get_client(self, model: str = DEFAULT_MODEL, temperature: float = 0) -> ChatGoogleGenerativeAI:
+        """Return the shared client for this model configuration, creating it on first use"""
+        key = (model, temperature)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._client_factory(model, temperature)
+                self._clients[key] = client
+        return client
+
+    def set_client_factory(self, factory):
+        """Build clients with factory(model, temperature) from now on; drops existing clients"""
+        with self._lock:
+            self._client_factory = factory
+            self._clients = {}
+
+    def _on_acquired(self):
+        with self._lock:
+            self._active_connections += 1
+            self._total_calls += 1
+            self._peak_connections = max(self._peak_connections, self._active_connections)
+
+    def _release(self):
+        with self._lock:
+            self._active_connections -= 1
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Hold one of the bounded connection slots for the duration of a call"""
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f"No LLM connection available after {self.acquire_timeout}s")
+        self._on_acquired()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire_async(self):
+        """Wait for a slot in a helper thread, in turn with sync callers, without blocking the event loop"""
+        deadline = time.monotonic() + self.acquire_timeout
+        waiter = self._slot_waiters.submit(lambda: self._slots.acquire(timeout=max(deadline - time.monotonic(), 0)))
+        try:
+            acquired = await asyncio.wrap_future(waiter)
+        except asyncio.CancelledError:
+            # The thread may still get a slot after the caller gave up; hand it straight back
+            waiter.add_done_callback(lambda f: not f.cancelled() and f.result() and self._slots.release())
+            raise
+        if not acquired:
+            raise TimeoutError(f"No LLM connection available after {self.acquire_timeout}s")
+        self._on_acquired()
+
+    def _retry_delay(self, call: LLMCall, error: Exception) -> float:
+        """Backoff before the next attempt, or None if the error should be raised"""
+        if call.retries >= self.max_retries or not is_retryable(error):
+            return None
+        call.retries += 1
+        return self.retry_backoff * 2 ** (call.retries - 1) * random.uniform(0.5, 1.5)
+
+    def _finish_call(self, call: LLMCall, usage=None, response_chars: int = 0, error: Exception = None):
+        record = call.finish(usage, response_chars, error)
+        if not record:
+            return
+        with self._lock:
+            self._totals['retries'] += record['retries']
+            if error:
+                self._totals['errors'] += 1
+            else:
+                self._totals['input_tokens'] += record['input_tokens']
+                self._totals['output_tokens'] += record['output_tokens']
+                self._totals['estimated_cost_usd'] += record['estimated_cost_usd']
+
+    def invoke(self, messages, model: str = DEFAULT_MODEL, temperature: float = 0, purpose: str = None):
+        """Run a chat completion on the shared client inside a connection slot"""
+        client = self.get_client(model, temperature)
+        call = LLMCall(model, 'invoke', purpose, messages)
+        with span('llm_invoke', 'llm'):
+            try:
+                with self.connection():
+                    call.slot_acquired()
+                    while True:
+                        try:
+                            response = client.invoke(messages)
+                            break
+                        except Exception as e:
+                            delay = self._retry_delay(call, e)
+                            if delay is None:
+                                raise
+                            time.sleep(delay)
+            except Exception as e:
+                self._finish_call(call, error=e)
+                raise
+        self._finish_call(call, getattr(response, 'usage_metadata', None), len(str(response.content)))
+        return response
+
+    def stream(self, messages, model: str = DEFAULT_MODEL, temperature: float = 0, purpose: str = None):
+        """Yield response text chunks as they arrive, holding a slot until the stream ends"""
+        client = self.get_client(model, temperature)
+        call = LLMCall(model, 'stream', purpose, messages)
+        usage, response_chars = None, 0
+        with span('llm_stream', 'llm'):
+            try:
+                with self.connection():
+                    call.slot_acquired()
+                    while True:
+                        try:
+                            for chunk in client.stream(messages):
+                                if getattr(chunk, 'usage_metadata', None):
+                                    usage = add_usage(usage, chunk.usage_metadata)
+                                if chunk.content:
+                                    call.first_chunk()
+                                    response_chars += len(chunk.content)
+                                    yield chunk.content
+                            break
+                        except Exception as e:
+                            # Only a stream that produced nothing yet can be retried transparently
+                            delay = self._retry_delay(call, e) if call.first_token is None else None
+                            if delay is None:
+                                raise
+                            time.sleep(delay)
+            except Exception as e:
+                self._finish_call(call, usage, response_chars, error=e)
+                raise
+            finally:
+                # Normal end, or the consumer stopped reading (GeneratorExit)
+                self._finish_call(call, usage, response_chars)
+
+    async def ainvoke(self, messages, model: str = DEFAULT_MODEL, temperature: float = 0, purpose: str = None):
+        """Async variant of invoke; the slot is awaited without blocking the event loop"""
+        client = self.get_client(model, temperature)
+        call = LLMCall(model, 'ainvoke', purpose, messages)
+        with span('llm_ainvoke', 'llm'):
+            try:
+                await self._acquire_async()
+                call.slot_acquired()
+                try:
+                    while True:
+                        try:
+                            response = await client.ainvoke(messages)
+                            break
+                        except Exception as e:
+                            delay = self._retry_delay(call, e)
+                            if delay is None:
+                                raise
+                            await asyncio.sleep(delay)
+                finally:
+                    self._release()
+            except Exception as e:
+                self._finish_call(call, error=e)
+                raise
+        self._finish_call(call, getattr(response, 'usage_metadata', None), len(str(response.content)))
+        return response
+
+    def get_stats(self) -> dict:
+        """Report live clients and connection usage"""
+        with self._lock:
+            return {
+                'clients': len(self._clients),
+                'active_connections': self._active_connections,
+                'peak_connections': self._peak_connections,
+                'max_connections': self.max_connections,
+                'total_calls': self._total_calls,
+                **{key: round(value, 6) if isinstance(value, float) else value for key, value in self._totals.items()}
+            }
+
+
+llm_pool = LLMClientPool()
+
+
+def get_llm(model: str = DEFAULT_MODEL, temperature: float = 0) -> ChatGoogleGenerativeAI:
+    """Convenience accessor for the shared client"""
+    return llm_pool.get_client(model, temperature)
@@ -0,0 +1,135 @@
+"""
+Per-call LLM instrumentation
+
+LLMCall follows one chat-model call through llm_pool and records the
+following:
+- queue time (waiting for a connection slot)
+- generation time
+- time to first token (streams only)
+- retries
+- prompt and response size
+- input/output tokens (from the response's usage metadata, otherwise estimated at
+  4 characters per token)
+- estimated cost
+
+Each finished call goes into the current run's PerformanceProfiler (surfacing
+as performance_summary['llm']) and into the process-wide Prometheus metrics.
+
+Prices are USD per million tokens per model; LLM_INPUT_COST_PER_MTOK and
+LLM_OUTPUT_COST_PER_MTOK override them for every model.
+"""
+
+import os
+import time
+from typing import Optional
+
+from agents.profiling import metrics, current_profiler
+
+# USD per 1M tokens (input, output), prompts up to 128k tokens
+MODEL_PRICING = {
+    "gemini-1.5-flash-latest": (0.075, 0.30),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro-latest": (1.25, 5.00),
+    "gemini-1.5-pro": (1.25, 5.00),
+}
+CHARS_PER_TOKEN = 4
+
+LLM_QUEUE_SECONDS = metrics.histogram('pathfinder_llm_queue_seconds', 'Time LLM calls waited for a connection slot',
+                                      ('model', 'purpose'))
+LLM_GENERATION_SECONDS = metrics.histogram('pathfinder_llm_generation_seconds',
+                                           'LLM call time after acquiring a slot, retries included',
+                                           ('model', 'purpose'))
+LLM_TTFT_SECONDS = metrics.histogram('pathfinder_llm_time_to_first_token_seconds',
+                                     'Time from acquiring a slot to the first streamed chunk', ('model', 'purpose'))
+LLM_CALLS = metrics.counter('pathfinder_llm_calls_total', 'LLM calls by outcome', ('model', 'purpose', 'outcome'))
+LLM_TOKENS = metrics.counter('pathfinder_llm_tokens_total', 'LLM tokens by direction (input/output)',
+                             ('model', 'purpose', 'direction'))
+LLM_RETRIES = metrics.counter('pathfinder_llm_retries_total', 'LLM call retries after transient errors',
+                              ('model', 'purpose'))
+LLM_COST = metrics.counter('pathfinder_llm_cost_usd_total', 'Estimated LLM spend in USD', ('model', 'purpose'))
+
+
+def model_pricing(model: str) -> tuple:
+    input_price, output_price = MODEL_PRICING.get(model, MODEL_PRICING["gemini-1.5-flash-latest"])
+    return (float(os.getenv("LLM_INPUT_COST_PER_MTOK", input_price)),
+            float(os.getenv("LLM_OUTPUT_COST_PER_MTOK", output_price)))
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = model_pricing(model)
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def message_chars(messages) -> int:
+    return sum(len(str(message.content)) for message in messages)
+
+
+class LLMCall:
+    """Timing, size and token figures of one chat-model call (all of its attempts)"""
+
+    def __init__(self, model: str, operation: str, purpose: str, messages):
+        self.model = model
+        self.operation = operation
+        self.purpose = purpose or 'unspecified'
+        self.prompt_chars = message_chars(messages)
+        self.started = time.perf_counter()
+        self.acquired = None
+        self.first_token = None
+        self.retries = 0
+        self.finished = False
+
+    def slot_acquired(self):
+        self.acquired = time.perf_counter()
+
+    def first_chunk(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    def finish(self, usage: Optional[dict] = None, response_chars: int = 0, error: Exception = None) -> dict:
+        """Record the call (once) in the current run and the process metrics"""
+        if self.finished:
+            return {}
+        self.finished = True
+        now = time.perf_counter()
+        acquired = self.acquired or now
+        input_tokens = (usage or {}).get('input_tokens')
+        output_tokens = (usage or {}).get('output_tokens')
+        estimated = input_tokens is None or output_tokens is None
+        if estimated:
+            input_tokens = self.prompt_chars // CHARS_PER_TOKEN
+            output_tokens = response_chars // CHARS_PER_TOKEN
+        cost = estimate_cost(self.model, input_tokens, output_tokens) if not error else 0.0
+
+        record = {
+            'purpose': self.purpose,
+            'operation': self.operation,
+            'model': self.model,
+            'queue_time': round(acquired - self.started, 4),
+            'generation_time': round(now - acquired, 4),
+            'ttft': round(self.first_token - acquired, 4) if self.first_token is not None else None,
+            'retries': self.retries,
+            'prompt_chars': self.prompt_chars,
+            'response_chars': response_chars,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'tokens_estimated': estimated,
+            'estimated_cost_usd': round(cost, 8),
+            'error': type(error).__name__ if error else None,
+        }
+
+        labels = {'model': self.model, 'purpose': self.purpose}
+        LLM_QUEUE_SECONDS.observe(acquired - self.started, **labels)
+        LLM_CALLS.inc(outcome='error' if error else 'ok', **labels)
+        if self.retries:
+            LLM_RETRIES.inc(self.retries, **labels)
+        if self.acquired is not None:
+            LLM_GENERATION_SECONDS.observe(now - acquired, **labels)
+        if self.first_token is not None:
+            LLM_TTFT_SECONDS.observe(self.first_token - acquired, **labels)
+        if not error:
+            LLM_TOKENS.inc(input_tokens, direction='input', **labels)
+            LLM_TOKENS.inc(output_tokens, direction='output', **labels)
+            LLM_COST.inc(cost, **labels)
+
+        current_profiler().record_llm_call(record)
+        return record
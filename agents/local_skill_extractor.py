@@ -0,0 +1,67 @@
+"""
+Local skill extractor
+
+Finds known skills in resume text without an LLM call. The text is tokenized
+once and every run of up to MAX_NGRAM tokens is looked up in the skill
+normalizer's alias/hash index (longest match wins), so extraction is linear in
+the resume length and takes milliseconds. Only the closed vocabulary the
+catalogs register with the normalizer can be found; see agent1 for the
+hybrid mode that falls back to Gemini when few skills are found.
+"""
+
+import re
+from typing import List
+
+from agents.skill_normalizer import SkillNormalizer, skill_normalizer
+
+MAX_NGRAM = 4
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#.]*")
+
+# Aliases that are ordinary words or abbreviations in prose ("CV", "TS", "Node")
+AMBIGUOUS_FORMS = {"cv", "ts", "tf", "dl", "shell", "node", "vue", "scikit", "mongo", "postgres"}
+
+# Skills that are also common words; only matched when written exactly like this
+CASE_SENSITIVE_FORMS = {"r": "R", "go": "Go", "c": "C", "excel": "Excel", "swift": "Swift", "dart": "Dart"}
+
+
+class LocalSkillExtractor:
+    """Longest-match n-gram scan of resume text against the normalizer's vocabulary"""
+
+    def __init__(self, normalizer: SkillNormalizer = skill_normalizer, max_ngram: int = MAX_NGRAM):
+        self.normalizer = normalizer
+        self.max_ngram = max_ngram
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return [match.group().rstrip(".") for match in _TOKEN_RE.finditer(text)]
+
+    def _match(self, tokens: List[str]):
+        phrase = " ".join(tokens)
+        key = phrase.lower()
+        if key in AMBIGUOUS_FORMS:
+            return None
+        if key in CASE_SENSITIVE_FORMS and phrase != CASE_SENSITIVE_FORMS[key]:
+            return None
+        return self.normalizer.resolve_exact(phrase)
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skill names in order of first mention"""
+        tokens = self.tokenize(text)
+        found, seen = [], set()
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self.max_ngram, len(tokens) - i), 0, -1):
+                canonical = self._match(tokens[i:i + n])
+                if canonical:
+                    if canonical not in seen:
+                        seen.add(canonical)
+                        found.append(canonical)
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+
+local_skill_extractor = LocalSkillExtractor()
@@ -0,0 +1,331 @@
+"""
+Storage backends for CareerPathfinderLogger
+
+JsonLinesLogStore: append-only, size-rotated JSON-lines files.
+SQLiteLogStore: WAL-mode SQLite with indexes on timestamp and target role and
+running aggregates maintained in the same transaction as each insert, so
+summary stats and filtered/paged queries don't scan history.
+
+Both take batches of (entry, serialized_json) records from the logger's
+background flusher.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: rely on O_APPEND atomicity only
+    fcntl = None
+
+LogRecord = Tuple[Dict, str]
+
+
+class JsonLinesLogStore:
+    """
+    One compact JSON object per line. The file is rotated once it exceeds
+    max_bytes, keeping backup_count old files (logs.jsonl.1 is the most
+    recent). Writes and rotation are serialized across worker processes with a
+    lock file.
+    """
+
+    def __init__(self, log_file, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.log_file = Path(log_file)
+        self.lock_file = self.log_file.with_name(self.log_file.name + ".lock")
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._write_lock = threading.Lock()
+
+    def is_empty(self) -> bool:
+        return not self._log_files_newest_first()
+
+    def append_many(self, records: List[LogRecord]):
+        payload = ("\n".join(line for _, line in records) + "\n").encode("utf-8")
+        with self._write_lock, open(self.lock_file, 'a') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if self.log_file.exists() and self.log_file.stat().st_size + len(payload) > self.max_bytes:
+                    self._rotate()
+                with open(self.log_file, 'ab') as f:
+                    f.write(payload)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _rotate(self):
+        """Shift logs.jsonl -> logs.jsonl.1 -> ... dropping the oldest backup"""
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self._backup_path(i)
+            if src.exists():
+                os.replace(src, self._backup_path(i + 1))
+        if self.backup_count > 0:
+            os.replace(self.log_file, self._backup_path(1))
+        else:
+            self.log_file.unlink()
+
+    def _backup_path(self, index: int) -> Path:
+        return self.log_file.with_name(f"{self.log_file.name}.{index}")
+
+    def _log_files_newest_first(self):
+        files = [self.log_file] + [self._backup_path(i) for i in range(1, self.backup_count + 1)]
+        return [path for path in files if path.exists()]
+
+    @staticmethod
+    def _tail_lines(path: Path, count: int, block_size: int = 8192):
+        """Read the last `count` lines of a file by seeking backwards from the end"""
+        if count <= 0:
+            return []
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            data = b""
+            while end > 0 and data.count(b"\n") <= count:
+                step = min(block_size, end)
+                end -= step
+                f.seek(end)
+                data = f.read(step) + data
+        return [line for line in data.splitlines() if line.strip()][-count:]
+
+    def iter_logs(self) -> Iterator[Dict]:
+        """Stream every entry, oldest first, without holding the history in memory"""
+        for path in reversed(self._log_files_newest_first()):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+
+    @staticmethod
+    def _decode_lines(lines: List[bytes]) -> List[Dict]:
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # half-written or corrupt line, skipped as in iter_logs
+        return entries
+
+    def get_recent(self, count: int) -> List[Dict]:
+        entries = []
+        for path in self._log_files_newest_first():
+            wanted = count - len(entries)
+            if wanted <= 0:
+                break
+            lines_to_read = wanted
+            while True:
+                lines = self._tail_lines(path, lines_to_read)
+                decoded = self._decode_lines(lines)
+                # Read further back until enough lines decode or the file is exhausted
+                if len(decoded) >= wanted or len(lines) < lines_to_read:
+                    break
+                lines_to_read += wanted - len(decoded)
+            entries = decoded[-wanted:] + entries
+        return entries
+
+    def query(self, target_role: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None, limit: int = 50, cursor: Optional[int] = None) -> Dict:
+        """Linear-scan equivalent of SQLiteLogStore.query; cursor is the entry offset"""
+        role_key = target_role.lower() if target_role else None
+        offset = cursor or 0
+        logs, position = [], 0
+        for log in self.iter_logs():
+            if role_key and log["input"]["target_role"].lower() != role_key:
+                continue
+            if since and log["timestamp"] < since or until and log["timestamp"] > until:
+                continue
+            if position >= offset:
+                if len(logs) == limit:
+                    return {"logs": logs, "next_cursor": position}
+                logs.append(log)
+            position += 1
+        return {"logs": logs, "next_cursor": None}
+
+    def get_summary_stats(self) -> Dict:
+        total_executions = 0
+        role_counts = Counter()
+        total_extracted = total_missing = 0
+        first_timestamp = last_timestamp = None
+
+        for log in self.iter_logs():
+            total_executions += 1
+            role_counts[log["input"]["target_role"]] += 1
+            total_extracted += len(log["output"]["extracted_skills"])
+            total_missing += len(log["output"]["missing_skills"])
+            first_timestamp = first_timestamp or log["timestamp"]
+            last_timestamp = log["timestamp"]
+
+        if not total_executions:
+            return {"total_executions": 0}
+
+        return {
+            "total_executions": total_executions,
+            "most_common_target_role": role_counts.most_common(1)[0][0],
+            "average_extracted_skills": round(total_extracted / total_executions, 2),
+            "average_missing_skills": round(total_missing / total_executions, 2),
+            "date_range": {
+                "first_execution": first_timestamp,
+                "last_execution": last_timestamp
+            }
+        }
+
+
+class SQLiteLogStore:
+    """
+    Indexed log store. Every insert also bumps the per-role counter and the
+    single-row totals table inside the same transaction, so stats are O(1)
+    and role/time filtered pages are index range scans (keyset pagination on id).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            target_role TEXT NOT NULL,
+            target_role_key TEXT NOT NULL,
+            session_id TEXT,
+            extracted_count INTEGER NOT NULL,
+            missing_count INTEGER NOT NULL,
+            execution_time REAL,
+            entry TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_logs_role ON logs (target_role_key, id);
+
+        CREATE TABLE IF NOT EXISTS role_stats (
+            target_role_key TEXT PRIMARY KEY,
+            target_role TEXT NOT NULL,
+            executions INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_role_stats_executions ON role_stats (executions);
+
+        CREATE TABLE IF NOT EXISTS log_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_executions INTEGER NOT NULL,
+            sum_extracted INTEGER NOT NULL,
+            sum_missing INTEGER NOT NULL,
+            first_timestamp TEXT,
+            last_timestamp TEXT
+        );
+        INSERT OR IGNORE INTO log_totals VALUES (1, 0, 0, 0, NULL, NULL);
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        # One shared connection serialized by a lock; WAL lets other worker
+        # processes read while this one writes.
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT total_executions FROM log_totals WHERE id = 1").fetchone()[0] == 0
+
+    def append_many(self, records: List[LogRecord]):
+        rows = []
+        role_deltas = {}
+        sum_extracted = sum_missing = 0
+        for entry, line in records:
+            role = entry["input"]["target_role"]
+            extracted = len(entry["output"]["extracted_skills"])
+            missing = len(entry["output"]["missing_skills"])
+            rows.append((entry["timestamp"], role, role.lower(), entry.get("session_id"),
+                         extracted, missing, entry.get("execution_time_seconds"), line))
+            key = role.lower()
+            role_deltas[key] = (role, role_deltas.get(key, (role, 0))[1] + 1)
+            sum_extracted += extracted
+            sum_missing += missing
+
+        timestamps = [row[0] for row in rows]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO logs (timestamp, target_role, target_role_key, session_id, extracted_count,"
+                " missing_count, execution_time, entry) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.executemany(
+                "INSERT INTO role_stats (target_role_key, target_role, executions) VALUES (?, ?, ?)"
+                " ON CONFLICT(target_role_key) DO UPDATE SET executions = executions + excluded.executions",
+                [(key, role, count) for key, (role, count) in role_deltas.items()])
+            self._conn.execute(
+                "UPDATE log_totals SET total_executions = total_executions + ?, sum_extracted = sum_extracted + ?,"
+                " sum_missing = sum_missing + ?,"
+                " first_timestamp = COALESCE(MIN(first_timestamp, ?), ?),"
+                " last_timestamp = COALESCE(MAX(last_timestamp, ?), ?) WHERE id = 1",
+                (len(rows), sum_extracted, sum_missing, min(timestamps), min(timestamps),
+                 max(timestamps), max(timestamps)))
+
+    def get_recent(self, count: int) -> List[Dict]:
+        if count <= 0:
+            return []  # SQLite treats a negative LIMIT as no limit
+        with self._lock:
+            rows = self._conn.execute("SELECT entry FROM logs ORDER BY id DESC LIMIT ?", (count,)).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def query(self, target_role: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None, limit: int = 50, cursor: Optional[int] = None) -> Dict:
+        """
+        Page through logs oldest-first. Pass the returned next_cursor to fetch the
+        following page; it is None once there are no more matches.
+        """
+        clauses, params = ["id > ?"], [cursor or 0]
+        if target_role:
+            clauses.append("target_role_key = ?")
+            params.append(target_role.lower())
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp <= ?")
+            params.append(until)
+        params.append(limit + 1)
+
+        sql = f"SELECT id, entry FROM logs WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return {"logs": [json.loads(entry) for _, entry in rows[:limit]], "next_cursor": next_cursor}
+
+    def iter_logs(self) -> Iterator[Dict]:
+        cursor = 0
+        while cursor is not None:
+            page = self.query(limit=500, cursor=cursor)
+            yield from page["logs"]
+            cursor = page["next_cursor"]
+
+    def get_summary_stats(self) -> Dict:
+        with self._lock:
+            totals = self._conn.execute(
+                "SELECT total_executions, sum_extracted, sum_missing, first_timestamp, last_timestamp"
+                " FROM log_totals WHERE id = 1").fetchone()
+            top_role = self._conn.execute(
+                "SELECT target_role FROM role_stats ORDER BY executions DESC LIMIT 1").fetchone()
+
+        total_executions, sum_extracted, sum_missing, first_timestamp, last_timestamp = totals
+        if not total_executions:
+            return {"total_executions": 0}
+
+        return {
+            "total_executions": total_executions,
+            "most_common_target_role": top_role[0] if top_role else None,
+            "average_extracted_skills": round(sum_extracted / total_executions, 2),
+            "average_missing_skills": round(sum_missing / total_executions, 2),
+            "date_range": {
+                "first_execution": first_timestamp,
+                "last_execution": last_timestamp
+            }
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
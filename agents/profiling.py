@@ -0,0 +1,310 @@
+"""
+Request-scoped profiling and process-wide latency metrics
+
+Each pipeline run (and each Flask request) gets its own PerformanceProfiler,
+held in a context variable, so concurrent greenlets, threads and asyncio tasks
+never see each other's timings. LangGraph copies the context into the
+threads and tasks it runs nodes on. Agents use the module-level `profiler`
+handle, which forwards to the profiler of the current run.
+
+`span(name, kind)` / `@traced` time a block with perf_counter_ns. The duration
+goes into the current run's report and into the process-wide
+pathfinder_span_duration_seconds histogram. `metrics.render()` exports all
+histograms and counters in the Prometheus text format (served at /metrics).
+Metrics are per process: with several gunicorn workers each one reports its own.
+"""
+
+import time
+import inspect
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional, Sequence, Tuple
+
+# Seconds; covers local steps (ms) up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination (Prometheus semantics)"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count], sum
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(round(total, 9))}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label combination"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] += amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named histograms and counters, rendered together in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {type(metric).__name__}")
+            return metric
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets)
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+metrics = MetricsRegistry()
+
+SPAN_SECONDS = metrics.histogram('pathfinder_span_duration_seconds',
+                                 'Duration of profiled spans (pipeline nodes, LLM calls, JSON parsing, stages)',
+                                 ('kind', 'name'))
+CACHE_LOOKUPS = metrics.counter('pathfinder_cache_lookups_total', 'Pipeline cache lookups by result', ('result',))
+
+
+class PerformanceProfiler:
+    """Spans, named timers, cache lookups and LLM calls of one pipeline run or request"""
+
+    def __init__(self, keep_llm_calls: bool = True):
+        self.started_ns = time.perf_counter_ns()
+        self.durations_ns = defaultdict(int)
+        self.counts = defaultdict(int)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Per-call records only for bounded runs; totals are always kept
+        self.keep_llm_calls = keep_llm_calls
+        self.llm_calls = []
+        self.llm_totals = defaultdict(float)
+        self.llm_by_purpose = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def record_span(self, name: str, duration_ns: int):
+        with self._lock:
+            self.durations_ns[name] += duration_ns
+            self.counts[name] += 1
+
+    def record_cache_lookup(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        CACHE_LOOKUPS.inc(result='hit' if hit else 'miss')
+
+    def record_llm_call(self, record: dict):
+        """Add one finished call from agents.llm_metrics.LLMCall to the totals (and the call log)"""
+        with self._lock:
+            totals = self.llm_totals
+            totals['calls'] += 1
+            totals['errors'] += 1 if record['error'] else 0
+            for key in ('retries', 'input_tokens', 'output_tokens', 'estimated_cost_usd', 'queue_time',
+                        'generation_time'):
+                totals[key] += record[key]
+            purpose = self.llm_by_purpose.setdefault(record['purpose'], defaultdict(float))
+            purpose['calls'] += 1
+            for key in ('input_tokens', 'output_tokens', 'estimated_cost_usd'):
+                purpose[key] += record[key]
+            if self.keep_llm_calls:
+                self.llm_calls.append(record)
+
+    def _llm_summary(self) -> dict:
+        totals = self.llm_totals
+        return {
+            'calls': int(totals['calls']),
+            'errors': int(totals['errors']),
+            'retries': int(totals['retries']),
+            'input_tokens': int(totals['input_tokens']),
+            'output_tokens': int(totals['output_tokens']),
+            'estimated_cost_usd': round(totals['estimated_cost_usd'], 8),
+            'queue_time': round(totals['queue_time'], 3),
+            'generation_time': round(totals['generation_time'], 3),
+            'by_purpose': {name: {'calls': int(purpose['calls']), 'input_tokens': int(purpose['input_tokens']),
+                                  'output_tokens': int(purpose['output_tokens']),
+                                  'estimated_cost_usd': round(purpose['estimated_cost_usd'], 8)}
+                           for name, purpose in self.llm_by_purpose.items()},
+            'call_log': list(self.llm_calls),
+        }
+
+    def start_timer(self, step_name: str):
+        self._timers[step_name] = time.perf_counter_ns()
+
+    def end_timer(self, step_name: str):
+        """Stop a timer started with start_timer; timers may span nodes and stream yields"""
+        start = self._timers.pop(step_name, None)
+        if start is not None:
+            duration = time.perf_counter_ns() - start
+            SPAN_SECONDS.observe(duration / 1e9, kind='stage', name=step_name)
+            self.record_span(step_name, duration)
+
+    def get_performance_report(self) -> dict:
+        with self._lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'step_timings': {name: round(ns / 1e9, 3) for name, ns in self.durations_ns.items()},
+                'step_counts': {name: count for name, count in self.counts.items() if count > 1},
+                'total_time': round((time.perf_counter_ns() - self.started_ns) / 1e9, 3),
+                'cache_stats': {
+                    'hits': self.cache_hits,
+                    'misses': self.cache_misses,
+                    'hit_ratio': self.cache_hits / lookups if lookups > 0 else 0
+                },
+                'llm': self._llm_summary()
+            }
+
+
+_current_profiler: ContextVar[Optional[PerformanceProfiler]] = ContextVar('pathfinder_profiler', default=None)
+# Work outside any run (background cache refreshes, startup) reports here for the
+# life of the process, so it keeps LLM totals only, not a record per call
+_detached_profiler = PerformanceProfiler(keep_llm_calls=False)
+
+
+def current_profiler() -> PerformanceProfiler:
+    return _current_profiler.get() or _detached_profiler
+
+
+@contextmanager
+def profiling_scope():
+    """Give the enclosed run its own profiler; the previous one is restored afterwards"""
+    run_profiler = PerformanceProfiler()
+    token = _current_profiler.set(run_profiler)
+    try:
+        yield run_profiler
+    finally:
+        try:
+            _current_profiler.reset(token)
+        except ValueError:
+            # A generator finalized from another context; that context never saw the set
+            pass
+
+
+def start_profiling():
+    """profiling_scope for callers that start and finish in different hooks (Flask before/teardown); returns the token for stop_profiling"""
+    return _current_profiler.set(PerformanceProfiler())
+
+
+def stop_profiling(token):
+    try:
+        _current_profiler.reset(token)
+    except ValueError:
+        pass
+
+
+class _CurrentProfiler:
+    """`profiler.start_timer(...)` etc. act on the profiler of the current run"""
+
+    def __getattr__(self, name):
+        return getattr(current_profiler(), name)
+
+
+profiler = _CurrentProfiler()
+
+
+@contextmanager
+def span(name: str, kind: str = 'span'):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter_ns() - start
+        SPAN_SECONDS.observe(duration / 1e9, kind=kind, name=name)
+        current_profiler().record_span(name, duration)
+
+
+def traced(name: str = None, kind: str = 'span'):
+    """Decorator form of span for plain and async functions; defaults to the function name"""
+    def decorator(func):
+        span_name = name or func.__name__
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
@@ -0,0 +1,87 @@
+"""
+Role requirement matrix
+
+The role catalog compiled into dense roles x skill-vocabulary arrays so a
+user's skills can be scored against every role in one vectorized pass, and a
+batch of users in a few matrix products.
+
+Per role, readiness is sum(weight * min(level / target, 1)) / sum(weight) over
+its required skills. Targets take only a handful of distinct values, so the
+credit term is computed once per target level and reduced with a matmul
+against that level's weight matrix.
+"""
+
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+IMPORTANCE_WEIGHTS = {"must": 1.2, "nice": 1.0}
+
+
+class RoleRequirementMatrix:
+    """Compiled role catalog: target levels and importance weights per (role, skill)"""
+
+    def __init__(self, role_catalog: Dict[str, Sequence]):
+        self.role_names = list(role_catalog)
+        self.role_index = {name: i for i, name in enumerate(self.role_names)}
+        self.vocabulary = {}
+        for requirements in role_catalog.values():
+            for req in requirements:
+                self.vocabulary.setdefault(req.skill, len(self.vocabulary))
+
+        shape = (len(self.role_names), len(self.vocabulary))
+        self.targets = np.zeros(shape, dtype=np.float64)
+        self.weights = np.zeros(shape, dtype=np.float64)
+        for row, requirements in enumerate(role_catalog.values()):
+            for req in requirements:
+                col = self.vocabulary[req.skill]
+                self.targets[row, col] = req.target_level
+                self.weights[row, col] = IMPORTANCE_WEIGHTS[req.importance.value]
+
+        total_weight = self.weights.sum(axis=1)
+        self._inv_total_weight = np.divide(1.0, total_weight, out=np.zeros_like(total_weight),
+                                           where=total_weight > 0)
+        # (target level, weights of the cells requiring that level), transposed for levels @ W
+        self._weights_by_target = [
+            (level, np.where(self.targets == level, self.weights, 0.0).T.copy())
+            for level in np.unique(self.targets[self.targets > 0])
+        ]
+
+    def skill_vector(self, user_skills: Iterable) -> np.ndarray:
+        """Levels of a user's UserSkill list over the vocabulary; skills no role requires are dropped"""
+        levels = np.zeros(len(self.vocabulary), dtype=np.float64)
+        for skill in user_skills:
+            col = self.vocabulary.get(skill.skill)
+            if col is not None:
+                levels[col] = skill.level
+        return levels
+
+    def score_batch(self, levels: np.ndarray) -> np.ndarray:
+        """Readiness of each user (rows of an N x vocabulary level matrix) for every role: N x roles"""
+        levels = np.atleast_2d(levels)
+        contribution = np.zeros((levels.shape[0], len(self.role_names)), dtype=np.float64)
+        for target, weights in self._weights_by_target:
+            contribution += np.minimum(levels / target, 1.0) @ weights
+        return contribution * self._inv_total_weight
+
+    def score(self, user_skills: Iterable) -> np.ndarray:
+        """Readiness of one user for every role"""
+        return self.score_batch(self.skill_vector(user_skills))[0]
+
+    def top_k(self, scores: np.ndarray, k: int = 5) -> List[int]:
+        """
+        Role indices of the k best scores, best first. Scores are compared at the
+        3-decimal precision they are reported with, and ties keep catalog order.
+        """
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        rounded = np.round(scores, 3)
+        if k < len(rounded):
+            # Everything tied with the k-th best stays a candidate so catalog order decides ties
+            kth = rounded[np.argpartition(-rounded, k - 1)[:k]].min()
+            candidates = np.flatnonzero(rounded >= kth)
+        else:
+            candidates = np.arange(len(rounded))
+        order = np.lexsort((candidates, -rounded[candidates]))
+        return candidates[order][:k].tolist()
@@ -0,0 +1,179 @@
+"""
+Resume prompt compaction
+
+Shrinks resume text before it goes into the skill extraction prompt:
+
+1. whitespace is normalized (PDF text often has one word per line, CRLFs and
+   words hyphenated across lines)
+2. contact details (emails, phone numbers, URLs, profile-link labels) and
+   boilerplate (declarations, "references available", page numbers) are removed
+3. the text is split at known section headings: a heading starts a line and
+   ends it or is followed by a colon ("Skills:" also counts mid-line), so prose
+   like "Awards for ..." is never cut off as a section of its own
+4. every section is scored by how many vocabulary skills the local extractor
+   finds in it per token, with a bonus for the skill-dense headings (Skills,
+   Experience, Projects, ...); sections are taken best-first until the token
+   budget is spent and emitted in their original order. Only sections that
+   never carry skills (hobbies, references, declaration, personal details) are
+   dropped outright: prose without known skills is exactly what Gemini is for
+
+Tokens are estimated at CHARS_PER_TOKEN characters each, as in llm_metrics.
+Text with no recognizable headings is kept whole, cut to the budget.
+"""
+
+import re
+from typing import List, NamedTuple, Optional
+
+from agents.llm_metrics import CHARS_PER_TOKEN
+from agents.local_skill_extractor import LocalSkillExtractor, local_skill_extractor
+
+DEFAULT_TOKEN_BUDGET = 1500
+# Smallest leftover budget worth filling with the start of a section that does not fit
+MIN_PARTIAL_TOKENS = 16
+
+# Heading -> weight added to the section's skill density
+SECTION_WEIGHTS = {
+    "technical skills": 3.0, "skills": 3.0, "core skills": 3.0, "key skills": 3.0, "core competencies": 3.0,
+    "technologies": 3.0, "tech stack": 3.0, "tools": 2.0, "skills & tools": 3.0, "skills and tools": 3.0,
+    "experience": 2.0, "work experience": 2.0, "professional experience": 2.0, "employment": 2.0,
+    "internships": 2.0, "internship": 2.0,
+    "projects": 2.0, "personal projects": 2.0, "academic projects": 2.0, "key projects": 2.0,
+    "certifications": 1.0, "certificates": 1.0, "courses": 1.0, "coursework": 1.0, "publications": 1.0,
+    "summary": 1.0, "professional summary": 1.0, "profile": 1.0, "objective": 0.0, "about me": 0.0,
+    "education": 0.0, "achievements": 0.0, "achievements & competitions": 0.0, "awards": 0.0,
+    "leadership": 0.0, "leadership & volunteering": 0.0, "volunteering": 0.0, "extracurricular activities": 0.0,
+    "activities": 0.0, "hobbies": 0.0, "interests": 0.0, "references": 0.0, "declaration": 0.0,
+    "personal details": 0.0, "personal information": 0.0,
+}
+# Sections that are left out of the prompt whatever they contain
+DROPPED_SECTIONS = {"hobbies", "interests", "references", "declaration", "personal details", "personal information"}
+
+_HEADING_RE = re.compile(
+    r"(?<![\w&/])(" + "|".join(sorted((re.escape(h).replace(r"\ ", r"\s+") for h in SECTION_WEIGHTS),
+                                     key=len, reverse=True)) + r")(?![\w&])[ \t]*(:|\n|$)",
+    re.IGNORECASE)
+
+_EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+_URL_RE = re.compile(r"\b(?:https?://|www\.)\S+|\b(?:[\w-]+\.)+(?:com|io|in|org|net|dev|me|ai)/\S*", re.IGNORECASE)
+# Digits and separators on one line only, so a number never runs into a date on the next line
+_PHONE_RE = re.compile(r"(?<![\w+])\+?\(?\d[\d \t().-]{7,}\d(?!\w)")
+# "GitHub: Repository", "Live: Website" link placeholders left behind by PDF export
+_LINK_PLACEHOLDER_RE = re.compile(r"\b(?:github|live|demo|code)\s*:\s*(?:repository|website|link|demo)\b",
+                                  re.IGNORECASE)
+# Contact labels, profile-link labels and separators; only stripped from the header, elsewhere "GitHub" is a skill
+_HEADER_LINK_RE = re.compile(r"\b(?:linkedin|github|portfolio|website|twitter|phone|mobile|e-?mail)\b:?|[|•·]",
+                             re.IGNORECASE)
+_BOILERPLATE_RE = re.compile(
+    r"\b(?:curriculum vitae|references (?:are )?available (?:up)?on request|page \d+ of \d+)\b"
+    r"|\bI hereby declare\b[^.]*\.?", re.IGNORECASE)
+_HYPHENATED_BREAK_RE = re.compile(r"(\w)-\s*\n\s*(\w)")
+
+
+class Section(NamedTuple):
+    heading: str
+    text: str
+
+
+def normalize_whitespace(text: str) -> str:
+    """Rejoin words hyphenated across lines and collapse all whitespace runs to single spaces"""
+    return " ".join(_join_hyphenated(text).split())
+
+
+def _join_hyphenated(text: str) -> str:
+    return _HYPHENATED_BREAK_RE.sub(r"\1\2", text.replace("\r", ""))
+
+
+def _strip_phone(match) -> str:
+    digits = sum(ch.isdigit() for ch in match.group())
+    # Date ranges ("2023 - 2027") have 8 digits; phone numbers have 10 to 15
+    return " " if 10 <= digits <= 15 else match.group()
+
+
+def strip_contact_details(text: str) -> str:
+    """Remove emails, URLs, phone numbers, link placeholders and boilerplate sentences; line breaks are kept"""
+    for pattern in (_EMAIL_RE, _URL_RE, _BOILERPLATE_RE, _LINK_PLACEHOLDER_RE):
+        text = pattern.sub(" ", text)
+    return _PHONE_RE.sub(_strip_phone, text)
+
+
+def _is_heading(text: str, match) -> bool:
+    phrase = match.group(1)
+    if not (phrase.isupper() or phrase[0].isupper()):
+        return False  # "strong skills in ..." is prose
+    if match.group(2) == ":":
+        return True
+    # Otherwise the heading must fill its line: "Awards for ..." is a sentence, not a section
+    line_start = text.rfind("\n", 0, match.start()) + 1
+    return not text[line_start:match.start()].strip()
+
+
+def split_sections(text: str) -> List[Section]:
+    """
+    Cut line-structured text (before whitespace normalization) at headings in
+    capitals or Title Case; the text before the first one is the 'header'.
+    Section texts come back whitespace-normalized.
+    """
+    sections, heading, start = [], "header", 0
+    for match in _HEADING_RE.finditer(text):
+        if not _is_heading(text, match):
+            continue
+        sections.append(Section(heading, text[start:match.start()]))
+        heading, start = " ".join(match.group(1).lower().split()), match.end()
+    sections.append(Section(heading, text[start:]))
+    return [Section(name, " ".join(body.split())) for name, body in sections if body.strip()]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit + 1)
+    return text[:cut if cut > 0 else limit]
+
+
+class ResumeCompactor:
+    """Whitespace, contact and section-level compaction of resume text under a token budget"""
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, extractor: LocalSkillExtractor = local_skill_extractor):
+        self.token_budget = token_budget
+        self.extractor = extractor
+
+    def _score(self, section: Section) -> Optional[float]:
+        """Priority of a section for the budget; None if it is left out"""
+        if section.heading in DROPPED_SECTIONS:
+            return None
+        skills = len(self.extractor.extract(section.text))
+        return SECTION_WEIGHTS.get(section.heading, 0.0) + 100.0 * skills / max(estimate_tokens(section.text), 1)
+
+    def compact(self, text: str, token_budget: Optional[int] = None) -> str:
+        budget = token_budget if token_budget is not None else self.token_budget
+        cleaned = strip_contact_details(_join_hyphenated(text))
+        sections = split_sections(cleaned)
+        if len(sections) < 2:
+            return _truncate(" ".join(cleaned.split()), budget)
+        if sections[0].heading == "header":
+            header = " ".join(_HEADER_LINK_RE.sub(" ", sections[0].text).split())
+            sections = ([Section("header", header)] if header else []) + sections[1:]
+
+        scored = [(score, i) for i, section in enumerate(sections)
+                  if (score := self._score(section)) is not None]
+        chosen, remaining = {}, budget
+        for score, i in sorted(scored, key=lambda item: (-item[0], item[1])):
+            section = sections[i]
+            # Headings of kept sections stay, so the model still sees the resume's structure
+            rendered = section.text if section.heading == "header" else f"{section.heading.title()}: {section.text}"
+            tokens = estimate_tokens(rendered) + 1
+            if tokens > remaining:
+                if remaining >= MIN_PARTIAL_TOKENS:
+                    chosen[i] = _truncate(rendered, remaining)
+                break
+            chosen[i] = rendered
+            remaining -= tokens
+        return "\n".join(chosen[i] for i in sorted(chosen))
+
+
+resume_compactor = ResumeCompactor()
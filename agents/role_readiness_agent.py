@@ -5,12 +5,25 @@ Analyzes user skills against job role requirements and provides readiness scores
 missing skills analysis, and quick-win recommendations.
 """
 
+import os
 import json
 import hashlib
-from typing import List, Dict, Tuple, Optional
+import threading
+from typing import List, Dict, Iterator, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
+from agents.readiness_matrix import RoleRequirementMatrix
+from agents.cache_utils import LRUCache
+from agents.skill_normalizer import skill_normalizer
+
+READINESS_CACHE_CONFIG = {
+    'maxsize': int(os.getenv("READINESS_CACHE_SIZE", "1024")),
+    'ttl': float(os.getenv("READINESS_CACHE_TTL", "3600")),
+}
+
 class SkillImportance(Enum):
     MUST = "must"
     NICE = "nice"
@@ -48,10 +61,32 @@ class RoleMatch:
     quick_win_recommendations: List[str]
 
 class RoleReadinessAgent:
-    def __init__(self):
-        self.role_catalog = self._initialize_role_catalog()
-        self.cache = {}
-        self.course_catalog = self._initialize_course_catalog()
+    def __init__(self, cache_size: int = READINESS_CACHE_CONFIG['maxsize'],
+                 cache_ttl: float = READINESS_CACHE_CONFIG['ttl']):
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self.reload_catalogs()
+    
+    def reload_catalogs(self):
+        """(Re)build the catalogs; cached assessments from an older catalog version are dropped"""
+        role_catalog = self._initialize_role_catalog()
+        course_catalog = self._initialize_course_catalog()
+        # Scores every role in one vectorized pass; see readiness_matrix
+        requirement_matrix = RoleRequirementMatrix(role_catalog)
+        skill_normalizer.add_vocabulary(req.skill for requirements in role_catalog.values() for req in requirements)
+        skill_normalizer.add_vocabulary(course_catalog)
+        
+        self.role_catalog, self.course_catalog = role_catalog, course_catalog
+        self.requirement_matrix = requirement_matrix
+        self.catalog_version = self.compute_catalog_version(role_catalog, course_catalog)
+        self.cache.clear()
+    
+    @staticmethod
+    def compute_catalog_version(role_catalog: Dict, course_catalog: Dict) -> str:
+        """Content hash of both catalogs; part of every cache key"""
+        roles = {name: [(req.skill, req.target_level, req.importance.value) for req in requirements]
+                 for name, requirements in role_catalog.items()}
+        payload = json.dumps([roles, course_catalog], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
     
     def _initialize_role_catalog(self) -> Dict[str, List[RequiredSkill]]:
         """Initialize static role catalog with required skills"""
@@ -317,8 +352,8 @@ class RoleReadinessAgent:
         """
         normalized_skills = []
         for skill in raw_skills:
-            # Normalize skill name (lowercase, hyphenated)
-            canonical_name = skill.lower().replace(' ', '-').replace('_', '-')
+            # Resolve aliases and spelling variants onto the catalog's skill names
+            canonical_name = skill_normalizer.normalize(skill)
             # Default level assignment - in production this would come from assessment
             level = 2  # Assume intermediate level for existing skills
             normalized_skills.append(UserSkill(canonical_name, level))
@@ -431,32 +466,11 @@ class RoleReadinessAgent:
     def generate_cache_key(self, user_skills: List[UserSkill]) -> str:
         """Generate cache key based on user skills"""
         skill_str = "|".join([f"{skill.skill}:{skill.level}" for skill in sorted(user_skills, key=lambda x: x.skill)])
-        return hashlib.md5(skill_str.encode()).hexdigest()
+        return f"{self.catalog_version}_{hashlib.md5(skill_str.encode()).hexdigest()}"
     
-    def assess_single_role_readiness(self, user_skills: List[UserSkill], target_role: str, force_refresh: bool = False) -> Dict:
-        """
-        Assess user readiness for a specific target role only.
-        
-        Args:
-            user_skills: List of UserSkill objects with normalized skill names and levels
-            target_role: The specific role to assess (e.g., 'data-scientist')
-            force_refresh: If True, bypass cache
-            
-        Returns:
-            JSON structure with single role readiness assessment
-        """
-        # Check if role exists
-        if target_role not in self.role_catalog:
-            raise ValueError(f"Unknown role: {target_role}")
-        
-        # Check cache
-        cache_key = f"{self.generate_cache_key(user_skills)}_{target_role}"
-        if not force_refresh and cache_key in self.cache:
-            return self.cache[cache_key]
-        
-        # Assess readiness for the target role
-        requirements = self.role_catalog[target_role]
-        readiness_score, missing_skills = self.compute_readiness_score(user_skills, requirements)
+    def build_role_match(self, user_skills: List[UserSkill], role_name: str) -> Dict:
+        """Score, label, missing skills and quick wins for one role"""
+        readiness_score, missing_skills = self.compute_readiness_score(user_skills, self.role_catalog[role_name])
         readiness_label = self.get_readiness_label(readiness_score)
         quick_wins = self.generate_quick_win_recommendations(missing_skills)
         
@@ -472,21 +486,44 @@ class RoleReadinessAgent:
             for skill in missing_skills
         ]
         
-        role_assessment = {
-            "role_name": target_role,
+        return {
+            "role_name": role_name,
             "readiness_score": round(readiness_score, 3),
             "readiness_label": readiness_label,
             "missing_skills": missing_skills_dict,
             "quick_win_recommendations": quick_wins
         }
+    
+    def assess_single_role_readiness(self, user_skills: List[UserSkill], target_role: str, force_refresh: bool = False) -> Dict:
+        """
+        Assess user readiness for a specific target role only.
+        
+        Args:
+            user_skills: List of UserSkill objects with normalized skill names and levels
+            target_role: The specific role to assess (e.g., 'data-scientist')
+            force_refresh: If True, bypass cache
+            
+        Returns:
+            JSON structure with single role readiness assessment
+        """
+        # Check if role exists
+        if target_role not in self.role_catalog:
+            raise ValueError(f"Unknown role: {target_role}")
+        
+        # Check cache
+        cache_key = f"{self.generate_cache_key(user_skills)}_{target_role}"
+        if not force_refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         result = {
             "target_role": target_role,
-            "role_assessment": role_assessment
+            "role_assessment": self.build_role_match(user_skills, target_role)
         }
         
         # Cache the result
-        self.cache[cache_key] = result
+        self.cache.set(cache_key, result)
         
         return result
 
@@ -503,52 +540,87 @@ class RoleReadinessAgent:
         """
         # Check cache
         cache_key = self.generate_cache_key(user_skills)
-        if not force_refresh and cache_key in self.cache:
-            return self.cache[cache_key]
-        
-        matched_roles = []
-        
-        # Assess readiness for each role
-        for role_name, requirements in self.role_catalog.items():
-            readiness_score, missing_skills = self.compute_readiness_score(user_skills, requirements)
-            readiness_label = self.get_readiness_label(readiness_score)
-            quick_wins = self.generate_quick_win_recommendations(missing_skills)
-            
-            # Convert missing skills to dict format
-            missing_skills_dict = [
-                {
-                    "skill": skill.skill,
-                    "current_level": skill.current_level,
-                    "target_level": skill.target_level,
-                    "gap_degree": skill.gap_degree,
-                    "importance": skill.importance.value
-                }
-                for skill in missing_skills
-            ]
-            
-            role_match = {
-                "role_name": role_name,
-                "readiness_score": round(readiness_score, 3),
-                "readiness_label": readiness_label,
-                "missing_skills": missing_skills_dict,
-                "quick_win_recommendations": quick_wins
-            }
-            
-            matched_roles.append(role_match)
-        
-        # Sort by readiness score descending and take top 5
-        matched_roles.sort(key=lambda x: x["readiness_score"], reverse=True)
-        top_roles = matched_roles[:5]
+        if not force_refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Score every role at once, then build details only for the top 5
+        scores = self.requirement_matrix.score(user_skills)
+        top_roles = [
+            self.build_role_match(user_skills, self.requirement_matrix.role_names[index])
+            for index in self.requirement_matrix.top_k(scores, 5)
+        ]
         
         result = {
             "matched_roles": top_roles
         }
         
         # Cache the result
-        self.cache[cache_key] = result
+        self.cache.set(cache_key, result)
         
         return result
     
+    def assess_batch(self, skill_lists: List[List[str]], roles: Optional[List[str]] = None,
+                     include_details: bool = False, chunk_size: int = 2048) -> Iterator[Dict]:
+        """
+        Assess many candidates against many roles.
+        
+        Identical skill sets are scored once; unique sets are scored against all
+        roles in vectorized chunks of chunk_size.
+        
+        Args:
+            skill_lists: One raw skill list per candidate
+            roles: Roles to assess (default: every catalog role)
+            include_details: Also return missing skills and quick wins per role
+            chunk_size: Unique skill sets scored per matrix pass
+            
+        Returns:
+            Iterator of {"index", "assessments": [...]} per candidate, in input
+            order. Roles are validated and all scores computed before returning.
+        """
+        matrix = self.requirement_matrix
+        role_names = list(roles) if roles else list(matrix.role_names)
+        unknown = [role for role in role_names if role not in matrix.role_index]
+        if unknown:
+            raise ValueError(f"Unknown role: {unknown[0]}")
+        columns = [matrix.role_index[role] for role in role_names]
+        
+        # Deduplicate skill sets; candidate i is scored as unique set slots[i]
+        slot_of, unique_skills, slots = {}, [], []
+        for raw_skills in skill_lists:
+            user_skills = self.normalize_user_skills(raw_skills)
+            key = frozenset((skill.skill, skill.level) for skill in user_skills)
+            slot = slot_of.setdefault(key, len(unique_skills))
+            if slot == len(unique_skills):
+                unique_skills.append(user_skills)
+            slots.append(slot)
+        
+        scores = np.zeros((len(unique_skills), len(columns)))
+        for start in range(0, len(unique_skills), chunk_size):
+            chunk = unique_skills[start:start + chunk_size]
+            levels = np.stack([matrix.skill_vector(user_skills) for user_skills in chunk])
+            scores[start:start + len(chunk)] = matrix.score_batch(levels)[:, columns]
+        raw_scores, rounded = scores.tolist(), np.round(scores, 3).tolist()
+        return self._iter_batch_results(unique_skills, slots, role_names, raw_scores, rounded, include_details)
+    
+    def _iter_batch_results(self, unique_skills, slots, role_names, raw_scores, rounded, include_details):
+        details = {}
+        for index, slot in enumerate(slots):
+            assessments = []
+            for position, role_name in enumerate(role_names):
+                if include_details:
+                    if (slot, role_name) not in details:
+                        details[slot, role_name] = self.build_role_match(unique_skills[slot], role_name)
+                    assessments.append(details[slot, role_name])
+                else:
+                    assessments.append({
+                        "role_name": role_name,
+                        "readiness_score": rounded[slot][position],
+                        "readiness_label": self.get_readiness_label(raw_scores[slot][position])
+                    })
+            yield {"index": index, "assessments": assessments}
+    
     def generate_role_summary(self, role_match: Dict) -> str:
         """
         Generate a concise UI summary for a role readiness assessment.
@@ -623,6 +695,19 @@ class RoleReadinessAgent:
         return self.assess_single_role_readiness(normalized_skills, target_role, force_refresh)
 
 
+_shared_agent = None
+_shared_agent_lock = threading.Lock()
+
+def get_readiness_agent() -> RoleReadinessAgent:
+    """Process-wide agent: catalogs are built once and the assessment cache is shared"""
+    global _shared_agent
+    if _shared_agent is None:
+        with _shared_agent_lock:
+            if _shared_agent is None:
+                _shared_agent = RoleReadinessAgent()
+    return _shared_agent
+
+
 # Convenience function for integration with existing pipeline
 def assess_role_readiness(user_skills: List[str], force_refresh: bool = False) -> Dict:
     """
@@ -635,7 +720,7 @@ def assess_role_readiness(user_skills: List[str], force_refresh: bool = False) -
     Returns:
         JSON with role readiness assessment
     """
-    agent = RoleReadinessAgent()
+    agent = get_readiness_agent()
     return agent.assess_from_raw_skills(user_skills, force_refresh)
 
 
@@ -651,10 +736,27 @@ def assess_single_role_readiness(user_skills: List[str], target_role: str, force
     Returns:
         JSON with single role readiness assessment
     """
-    agent = RoleReadinessAgent()
+    agent = get_readiness_agent()
     return agent.assess_single_role_from_raw_skills(user_skills, target_role, force_refresh)
 
 
+def assess_batch_readiness(skill_lists: List[List[str]], roles: Optional[List[str]] = None,
+                           include_details: bool = False) -> Iterator[Dict]:
+    """
+    Standalone function to assess many candidates against many roles.
+    
+    Args:
+        skill_lists: One skill list per candidate
+        roles: Roles to assess (default: every catalog role)
+        include_details: Also return missing skills and quick wins per role
+        
+    Returns:
+        Iterator of per-candidate results in input order
+    """
+    agent = get_readiness_agent()
+    return agent.assess_batch(skill_lists, roles, include_details)
+
+
 if __name__ == "__main__":
     # Test the agent
     test_skills = [
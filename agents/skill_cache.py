@@ -0,0 +1,87 @@
+"""
+Skill extraction cache
+
+Content-addressed cache for agent1 results. Keys are a SHA-256 over the
+normalized resume text plus the prompt and model version, so a prompt or
+model change naturally invalidates old entries. Lookups hit an in-process LRU
+first and fall back to an optional on-disk tier (one JSON file per key) that
+survives restarts. Set SKILL_CACHE_DIR to enable the disk tier.
+"""
+
+import os
+import re
+import json
+import hashlib
+import tempfile
+from typing import List, Optional
+
+from agents.cache_utils import LRUCache
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_resume_text(text: str) -> str:
+    """Collapse whitespace and case so trivially different extractions share a key"""
+    return _WHITESPACE_RE.sub(" ", text or "").strip().casefold()
+
+
+class SkillExtractionCache:
+    """Two-tier (memory LRU + optional disk) cache of extracted skill lists"""
+
+    def __init__(self, maxsize: int = 512, cache_dir: Optional[str] = None):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.cache_dir = cache_dir
+        self.disk_hits = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, prompt_version: str, model: str) -> str:
+        payload = f"{prompt_version}\x00{model}\x00{normalize_resume_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[str]]:
+        skills = self.memory.get(key)
+        if skills is not None or not self.cache_dir:
+            return skills
+
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                skills = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        self.disk_hits += 1
+        self.memory.set(key, skills)
+        return skills
+
+    def set(self, key: str, skills: List[str]):
+        self.memory.set(key, skills)
+        if not self.cache_dir:
+            return
+
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(skills, f)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError as e:
+            print(f"Skill cache write error: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_stats(self) -> dict:
+        stats = self.memory.get_stats()
+        stats['disk_hits'] = self.disk_hits
+        stats['disk_tier'] = bool(self.cache_dir)
+        return stats
+
+
+skill_cache = SkillExtractionCache(
+    maxsize=int(os.getenv("SKILL_CACHE_SIZE", "512")),
+    cache_dir=os.getenv("SKILL_CACHE_DIR") or None
+)
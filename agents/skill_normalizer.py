@@ -0,0 +1,206 @@
+"""
+Skill name normalization
+
+Resumes, the LLM, data/job_roles.json, data/courses.json and the readiness
+role catalog all spell skills differently ("Scikit Learn", "sklearn",
+"Scikit-Learn"). SkillNormalizer maps any spelling onto one canonical,
+lowercase, hyphenated name:
+
+1. alias table (sklearn -> scikit-learn)
+2. hash index over a punctuation-insensitive key of every known skill
+   (scikit learn / scikit_learn / ScikitLearn -> scikit-learn)
+3. fuzzy fallback for typos against the known vocabulary: character-trigram
+   candidates, then a bounded Levenshtein distance
+4. otherwise the lowercased, hyphenated input
+
+Resolved names are memoized. Agents register their catalog skills as
+vocabulary; `skill_normalizer` is the process-wide instance.
+"""
+
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from agents.cache_utils import LRUCache
+
+# Common spellings mapped onto one canonical, hyphenated name
+SKILL_ALIASES = {
+    "js": "javascript",
+    "node": "nodejs",
+    "node.js": "nodejs",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vuejs",
+    "vue": "vuejs",
+    "express.js": "express",
+    "expressjs": "express",
+    "ts": "typescript",
+    "sklearn": "scikit-learn",
+    "scikit": "scikit-learn",
+    "ml": "machine-learning",
+    "dl": "deep-learning",
+    "tf": "tensorflow",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "rest-apis": "rest-api",
+    "restful-api": "rest-api",
+    "restful-apis": "rest-api",
+    "jupyter-notebooks": "jupyter",
+    "jupyter-notebook": "jupyter",
+    "r-programming": "r",
+    "natural-language-processing": "nlp",
+    "cv": "computer-vision",
+    "shell-scripting": "bash",
+    "shell": "bash",
+    "ci/cd": "ci-cd",
+    "cicd": "ci-cd",
+    "amazon-web-services": "aws",
+    "aws-basics": "aws",
+    "google-cloud": "gcp",
+    "google-cloud-platform": "gcp",
+    "microsoft-azure": "azure",
+    "golang": "go",
+    "html5": "html",
+    "css3": "css",
+    "huggingface": "hugging-face",
+    "large-language-models": "llm",
+    "llms": "llm",
+    "siem-tools": "siem",
+    "security-basics": "security",
+}
+
+_SEPARATOR_RE = re.compile(r"[\s_]+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def basic_key(name: str) -> str:
+    """Lowercase and hyphenate: 'Machine Learning' -> 'machine-learning'"""
+    return _SEPARATOR_RE.sub("-", name.strip().lower()).strip("-")
+
+
+def compact_key(name: str) -> str:
+    """Punctuation-insensitive key; keeps C++ and C# distinct from C"""
+    name = name.lower().replace("+", "plus").replace("#", "sharp")
+    return _NON_ALNUM_RE.sub("", name)
+
+
+def _trigrams(key: str) -> set:
+    padded = f"#{key}#"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _bounded_levenshtein(a: str, b: str, limit: int) -> int:
+    """Edit distance, or limit + 1 as soon as it must exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SkillNormalizer:
+    """Alias table + hash index + fuzzy fallback over a registered skill vocabulary"""
+
+    def __init__(self, aliases: Dict[str, str] = None, min_fuzzy_length: int = 5, memo_size: int = 8192):
+        self.aliases = {}
+        self.min_fuzzy_length = min_fuzzy_length
+        self._index = {}                       # compact key -> canonical name
+        self._trigram_index = defaultdict(set)  # trigram -> compact keys
+        self._lock = threading.Lock()
+        self.memo = LRUCache(maxsize=memo_size)
+        self.fuzzy_matches = 0
+        for alias, canonical in (aliases or SKILL_ALIASES).items():
+            self.add_alias(alias, canonical)
+
+    def _register(self, compact: str, canonical: str):
+        if compact:
+            self._index.setdefault(compact, canonical)
+            for gram in _trigrams(compact):
+                self._trigram_index[gram].add(compact)
+
+    def add_alias(self, alias: str, canonical: str):
+        canonical = basic_key(canonical)
+        with self._lock:
+            self.aliases[basic_key(alias)] = canonical
+            self._register(compact_key(alias), canonical)
+            self._register(compact_key(canonical), canonical)
+        self.memo.clear()
+
+    def add_vocabulary(self, names: Iterable[str]):
+        """Register catalog skill names; each resolves to its own canonical form"""
+        with self._lock:
+            for name in names:
+                if not isinstance(name, str) or not name.strip():
+                    continue
+                key = basic_key(name)
+                canonical = self.aliases.get(key, key)
+                self._register(compact_key(name), canonical)
+                self._register(compact_key(canonical), canonical)
+        self.memo.clear()
+
+    def _fuzzy_lookup(self, compact: str) -> Optional[str]:
+        if len(compact) < self.min_fuzzy_length:
+            return None
+        limit = 1 if len(compact) <= 8 else 2
+        grams = _trigrams(compact)
+        with self._lock:
+            candidates = {key for gram in grams for key in self._trigram_index.get(gram, ())}
+            best = None
+            for key in sorted(candidates):
+                if abs(len(key) - len(compact)) > limit:
+                    continue
+                distance = _bounded_levenshtein(compact, key, limit)
+                if distance <= limit and (best is None or distance < best[0]):
+                    best = (distance, key)
+            return self._index[best[1]] if best else None
+
+    def resolve_exact(self, name: str) -> Optional[str]:
+        """Canonical name via the alias table or hash index only; None if unknown"""
+        key = basic_key(name)
+        return self.aliases.get(key) or self._index.get(compact_key(key))
+
+    def normalize(self, name: str) -> str:
+        """Canonical name for one skill string"""
+        cached = self.memo.get(name)
+        if cached is not None:
+            return cached
+
+        key = basic_key(name)
+        canonical = self.aliases.get(key)
+        if canonical is None:
+            compact = compact_key(key)
+            canonical = self._index.get(compact)
+            if canonical is None:
+                canonical = self._fuzzy_lookup(compact)
+                if canonical is not None:
+                    self.fuzzy_matches += 1
+                else:
+                    canonical = key
+        self.memo.set(name, canonical)
+        return canonical
+
+    def normalize_many(self, names: Iterable[str]) -> List[str]:
+        """Canonical names in input order, dropping blanks and duplicates"""
+        seen, result = set(), []
+        for name in names:
+            if not isinstance(name, str) or not name.strip():
+                continue
+            canonical = self.normalize(name)
+            if canonical not in seen:
+                seen.add(canonical)
+                result.append(canonical)
+        return result
+
+    def get_stats(self) -> dict:
+        return dict(self.memo.get_stats(), vocabulary=len(self._index), fuzzy_matches=self.fuzzy_matches)
+
+
+skill_normalizer = SkillNormalizer()
@@ -0,0 +1,93 @@
+"""
+Incremental JSON parsing for streamed LLM output
+
+Pulls complete elements out of the "roadmap" array while the response is
+still arriving, so each phase can be sent to the client as soon as its
+closing brace has streamed in.
+"""
+
+import json
+from typing import List
+
+
+class RoadmapStreamParser:
+    """Feed text chunks; get back each fully-received object of the target array"""
+
+    def __init__(self, array_key: str = "roadmap"):
+        self.key_token = f'"{array_key}"'
+        self.buffer = ""
+        self.pos = 0
+        self.state = "seek_key"
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.item_start = None
+        self.items = []
+
+    @property
+    def done(self) -> bool:
+        return self.state == "done"
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Consume a chunk and return any array items completed by it"""
+        self.buffer += chunk
+        completed = []
+
+        while self.pos < len(self.buffer) and self.state != "done":
+            if self.state == "seek_key":
+                idx = self.buffer.find(self.key_token, self.pos)
+                if idx < 0:
+                    # Keep enough tail to match a key split across chunks
+                    self.pos = max(self.pos, len(self.buffer) - len(self.key_token))
+                    break
+                self.pos = idx + len(self.key_token)
+                self.state = "seek_array"
+
+            elif self.state == "seek_array":
+                idx = self.buffer.find("[", self.pos)
+                if idx < 0:
+                    self.pos = len(self.buffer)
+                    break
+                self.pos = idx + 1
+                self.state = "in_array"
+
+            elif self.state == "in_array":
+                ch = self.buffer[self.pos]
+                if ch == "{":
+                    self.item_start = self.pos
+                    self.depth = 1
+                    self.state = "in_item"
+                elif ch == "]":
+                    self.state = "done"
+                self.pos += 1
+
+            else:  # in_item
+                ch = self.buffer[self.pos]
+                if self.in_string:
+                    if self.escaped:
+                        self.escaped = False
+                    elif ch == "\\":
+                        self.escaped = True
+                    elif ch == '"':
+                        self.in_string = False
+                elif ch == '"':
+                    self.in_string = True
+                elif ch == "{":
+                    self.depth += 1
+                elif ch == "}":
+                    self.depth -= 1
+                    if self.depth == 0:
+                        raw = self.buffer[self.item_start:self.pos + 1]
+                        try:
+                            item = json.loads(raw)
+                            self.items.append(item)
+                            completed.append(item)
+                        except json.JSONDecodeError as e:
+                            print(f"Roadmap stream item parsing error: {e}")
+                        self.state = "in_array"
+                        # Drop consumed text so the buffer stays small
+                        self.buffer = self.buffer[self.pos + 1:]
+                        self.pos = -1
+                self.pos += 1
+
+        return completed
@@ -1,25 +1,34 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context, g
 import os
-from pathlib import Path
-import PyPDF2
-from docx import Document
+import json
 from dotenv import load_dotenv
 import sys
 import time
+import uuid
+import itertools
 
 # --- FIX 1: Add project root to Python path ---
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 # ---------------------------------------------
 
-from agents.career_pathfinder_optimized import run_pipeline_optimized, extract_skills_only
+from agents.career_pathfinder_optimized import (run_pipeline_optimized, extract_skills_only, stream_pipeline_optimized,
+                                                skill_extraction_version, roadmap_version, roadmap_cache)
 from agents.career_logger import CareerPathfinderLogger
-from agents.role_readiness_agent import assess_role_readiness, assess_single_role_readiness
+from agents.cache_utils import LRUCache
+from agents.course_index import parse_course_string
+from agents.profiling import metrics, start_profiling, stop_profiling
+from agents.role_readiness_agent import assess_single_role_readiness, assess_batch_readiness, get_readiness_agent
+from backend.session_store import create_session_store
+from backend.ingestion import INGESTION_LIMITS, SUPPORTED_EXTENSIONS, IngestionError, read_upload
+from backend.extraction_pool import extraction_executor
 
 # Configure Flask app with correct paths
 app = Flask(__name__,
             template_folder='../frontend/templates',
             static_folder='../frontend/static')
+# Reject oversized request bodies before they are read (multipart overhead on top of the file limit)
+app.config['MAX_CONTENT_LENGTH'] = INGESTION_LIMITS['max_upload_bytes'] + 64 * 1024
 
 # Load environment variables
 load_dotenv(os.path.join(project_root, '.env'))
@@ -34,72 +43,110 @@ if not GEMINI_API_KEY:
 logger = CareerPathfinderLogger()
 
 # Ensure uploads directory exists
-UPLOADS_DIR = os.path.join(os.path.dirname(__file__), "uploads")
+UPLOADS_DIR = os.getenv("UPLOADS_DIR") or os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(UPLOADS_DIR, exist_ok=True)
 
+# Resume text and derived results (extracted skills, roadmaps, assessments), shared
+# between sessions that uploaded the same resume
+sessions = create_session_store(UPLOADS_DIR)
+
+# Pipeline output kept per (document, role) so repeat uploads skip the LLM calls
+ROADMAP_ARTIFACT_FIELDS = ('extracted_skills', 'missing_skills', 'nice_to_have', 'roadmap', 'time_estimates')
+
+# Results per /assess-readiness/batch page, and how long a scored batch waits for its next page
+BATCH_READINESS_MAX_PAGE = int(os.getenv("BATCH_READINESS_MAX_PAGE", "10000"))
+batch_cursors = LRUCache(maxsize=64, ttl=float(os.getenv("BATCH_READINESS_CURSOR_TTL", "600")))
+
 
 def parse_course_info(course_string):
     """Parse course string to extract title, platform, and estimate duration"""
-    if not course_string or course_string == 'N/A':
-        return {
-            'title': 'N/A',
-            'platform': 'N/A',
-            'duration': 'N/A',
-            'url': ''
-        }
-    
-    duration_map = {
-        'coursera': '4-6 weeks', 'edx': '4-8 weeks', 'udemy': '10-15 hours',
-        'youtube': '2-5 hours', 'freecodecamp': '5-10 hours', 'w3schools': '1-3 hours',
-        'khan academy': '2-4 weeks', 'ibm skillsbuild': '3-5 hours', 'official documentation': '1-2 hours',
-        'datacamp': '2-4 hours', 'official': '1-2 hours', 'microsoft learn': '2-4 hours',
-        'google': '3-6 hours', 'free book': '2-3 weeks', 'tutorial': '1-3 hours'
+    return parse_course_string(course_string)
+
+def format_roadmap_phase(phase, index):
+    """Shape one roadmap phase from the pipeline into the structure the UI renders"""
+    phase_data = {
+        'phase': phase.get('phase', f'Phase {index+1}'), 'skills': [],
+        'phase_total_hours': phase.get('phase_total_hours', 0),
+        'phase_time_frame': phase.get('phase_time_frame', 'N/A')
     }
-    
-    title, platform, duration = course_string, 'Online', '2-4 hours'
-    
-    if ' - ' in course_string:
-        parts = course_string.split(' - ', 1)
-        title, platform_part = parts[0].strip(), parts[1].strip()
-        platform = platform_part.split(' (')[0].strip() if ' (' in platform_part else platform_part
-    
-    for key, dur in duration_map.items():
-        if key in platform.lower():
-            duration = dur
-            break
-            
-    course_lower = course_string.lower()
-    if 'certification' in course_lower or 'certificate' in course_lower: duration = '6-8 weeks'
-    elif 'bootcamp' in course_lower: duration = '12-24 weeks'
-    elif 'crash course' in course_lower: duration = '1-2 days'
-    elif 'full course' in course_lower: duration = '8-12 hours'
-    elif 'tutorial' in course_lower: duration = '1-3 hours'
-    
-    return {'title': title, 'platform': platform, 'duration': duration, 'url': generate_course_url(title, platform)}
-
-def generate_course_url(title, platform):
-    """Generate course URLs based on platform and title"""
-    return f'https://www.google.com/search?q="{title}"+"online+course"'
-
-
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF file"""
-    try:
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            return "".join(page.extract_text() or "" for page in reader.pages)
-    except Exception as e:
-        print(f"Error extracting PDF: {e}")
-        return ""
-
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX file"""
-    try:
-        doc = Document(file_path)
-        return "\n".join(para.text for para in doc.paragraphs)
-    except Exception as e:
-        print(f"Error extracting DOCX: {e}")
-        return ""
+    skills_data = phase.get('skills', phase.get('items', []))
+    for j, item in enumerate(skills_data):
+        if isinstance(item, dict):
+            course = item.get('course', 'N/A')
+            if isinstance(course, str):
+                parsed_course = parse_course_info(course)
+            elif 'platform' in course:
+                # Already structured (catalog roadmaps)
+                parsed_course = course
+            else:
+                parsed_course = parse_course_info(course.get('title', 'N/A'))
+            phase_data['skills'].append({
+                'skill': item.get('skill', f'Skill {j+1}'), 'course': parsed_course,
+                'est_hours': item.get('est_hours', 10)
+            })
+    return phase_data
+
+# Artifact names carry the versions and modes their results were produced under, so a
+# document's stored results are not served after a prompt, model, mode or catalog change
+def skills_artifact_name():
+    return f'extracted_skills:{skill_extraction_version()}'
+
+def roadmap_artifact_name(role):
+    return f'roadmap:{roadmap_version()}:{skill_extraction_version()}:{role.strip().lower()}'
+
+def readiness_artifact_name(role):
+    return f'readiness:{get_readiness_agent().catalog_version}:{skill_extraction_version()}:{role}'
+
+def get_roadmap_artifact(session_id, role):
+    """Stored pipeline output for the role, or None once it is older than the roadmap cache TTL"""
+    artifact = sessions.get_artifact(session_id, roadmap_artifact_name(role))
+    if artifact is None or artifact.get('created_at', 0) + roadmap_cache.ttl < time.time():
+        return None
+    return artifact
+
+def set_roadmap_artifact(session_id, role, artifact):
+    sessions.set_artifact(session_id, roadmap_artifact_name(role), dict(artifact, created_at=time.time()))
+
+
+HTTP_REQUEST_SECONDS = metrics.histogram('pathfinder_http_request_duration_seconds',
+                                         'Flask request duration by route, including streamed bodies',
+                                         ('method', 'route', 'status'))
+
+
+@app.before_request
+def start_request_profiling():
+    g.request_started_ns = time.perf_counter_ns()
+    g.profiling_token = start_profiling()
+
+
+@app.after_request
+def remember_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+
+@app.teardown_request
+def finish_request_profiling(error):
+    # Runs after a streamed body has been fully sent (stream_with_context keeps the request open)
+    started = g.pop('request_started_ns', None)
+    if started is None:
+        return
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    status = g.pop('response_status', 500 if error else 200)
+    HTTP_REQUEST_SECONDS.observe((time.perf_counter_ns() - started) / 1e9,
+                                 method=request.method, route=route, status=status)
+    stop_profiling(g.pop('profiling_token'))
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({'success': False, 'error': 'File too large'}), 413
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Span and request latency histograms of this worker process, Prometheus text format"""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/')
 def index():
@@ -114,21 +161,19 @@ def upload_resume():
     if file.filename == '':
         return jsonify({'success': False, 'error': 'No file selected'}), 400
 
-    if not file.filename.lower().endswith(('.pdf', '.docx')):
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
         return jsonify({'success': False, 'error': 'Unsupported file type'}), 400
 
-    file_path = os.path.join(UPLOADS_DIR, file.filename)
-    file.save(file_path)
-
-    resume_text = extract_text_from_pdf(file_path) if file.filename.lower().endswith('.pdf') else extract_text_from_docx(file_path)
+    # Parse straight from the upload stream in a worker process; only the extracted text is persisted
+    try:
+        resume_text = extraction_executor.extract(read_upload(file.stream), file.filename)
+    except IngestionError as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status_code
 
     if not resume_text.strip():
         return jsonify({'success': False, 'error': 'Could not extract text from resume'}), 500
 
-    session_id = f"session_{int(time.time())}"
-    session_file = os.path.join(UPLOADS_DIR, f"{session_id}.txt")
-    with open(session_file, 'w', encoding='utf-8') as f:
-        f.write(resume_text)
+    session_id = sessions.create(resume_text)
 
     return jsonify({'success': True, 'session_id': session_id})
 
@@ -139,17 +184,19 @@ def extract_skills():
     if not session_id:
         return jsonify({'success': False, 'error': 'No session ID provided'}), 400
 
-    session_file = os.path.join(UPLOADS_DIR, f"{session_id}.txt")
-    if not os.path.exists(session_file):
+    resume_text = sessions.get_text(session_id)
+    if resume_text is None:
         return jsonify({'success': False, 'error': 'Session file not found'}), 404
 
-    with open(session_file, 'r', encoding='utf-8') as f:
-        resume_text = f.read()
+    cached_skills = sessions.get_artifact(session_id, skills_artifact_name())
+    if cached_skills is not None:
+        return jsonify({'success': True, 'skills': cached_skills})
 
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = extract_skills_only(resume_text)
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
+        sessions.set_artifact(session_id, skills_artifact_name(), result.get('extracted_skills', []))
         logger.log_execution(resume_text, "Skill Extraction", result, execution_time)
         return jsonify({'success': True, 'skills': result.get('extracted_skills', [])})
     except Exception as e:
@@ -166,18 +213,23 @@ def generate_roadmap():
     if not role or not session_id:
         return jsonify({'success': False, 'error': 'Role and session ID are required'}), 400
 
-    session_file = os.path.join(UPLOADS_DIR, f"{session_id}.txt")
-    if not os.path.exists(session_file):
+    resume_text = sessions.get_text(session_id)
+    if resume_text is None:
         return jsonify({'success': False, 'error': 'Session file not found'}), 404
 
-    with open(session_file, 'r', encoding='utf-8') as f:
-        resume_text = f.read()
-        
     try:
-        result = run_pipeline_optimized(resume_text, role, log_execution=True)
-
-        if not isinstance(result, dict):
-            return jsonify({'success': False, 'error': f'Unexpected result type: {type(result)}'}), 500
+        result = get_roadmap_artifact(session_id, role)
+        if result is not None:
+            result = dict(result, performance_summary={'source': 'document_cache'})
+        else:
+            result = run_pipeline_optimized(resume_text, role, log_execution=True,
+                                            extracted_skills=sessions.get_artifact(session_id, skills_artifact_name()))
+            if not isinstance(result, dict):
+                return jsonify({'success': False, 'error': f'Unexpected result type: {type(result)}'}), 500
+            if result.get('extracted_skills'):
+                sessions.set_artifact(session_id, skills_artifact_name(), result['extracted_skills'])
+            if result.get('roadmap'):
+                set_roadmap_artifact(session_id, role, {field: result.get(field) for field in ROADMAP_ARTIFACT_FIELDS})
 
         roadmap = []
         roadmap_data = result.get('roadmap', [])
@@ -185,21 +237,7 @@ def generate_roadmap():
         if isinstance(roadmap_data, list):
             for i, phase in enumerate(roadmap_data):
                 if isinstance(phase, dict):
-                    phase_data = {
-                        'phase': phase.get('phase', f'Phase {i+1}'), 'skills': [],
-                        'phase_total_hours': phase.get('phase_total_hours', 0),
-                        'phase_time_frame': phase.get('phase_time_frame', 'N/A')
-                    }
-                    skills_data = phase.get('skills', phase.get('items', []))
-                    for j, item in enumerate(skills_data):
-                        if isinstance(item, dict):
-                            course = item.get('course', 'N/A')
-                            parsed_course = parse_course_info(course) if isinstance(course, str) else parse_course_info(course.get('title', 'N/A'))
-                            phase_data['skills'].append({
-                                'skill': item.get('skill', f'Skill {j+1}'), 'course': parsed_course,
-                                'est_hours': item.get('est_hours', 10)
-                            })
-                    roadmap.append(phase_data)
+                    roadmap.append(format_roadmap_phase(phase, i))
 
         response = {
             'success': True, 'roadmap': roadmap,
@@ -213,6 +251,70 @@ def generate_roadmap():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/generate-roadmap/stream', methods=['POST'])
+def generate_roadmap_stream():
+    """
+    Streaming variant of /generate-roadmap.
+
+    Sends extracted_skills, missing_skills, each roadmap phase and finally the
+    performance report as they become available. Server-sent events by default;
+    pass ?format=ndjson for JSON lines.
+    """
+    data = request.get_json(silent=True) or {}
+    role = data.get('role', '')
+    session_id = data.get('session_id', '')
+
+    if not role or not session_id:
+        return jsonify({'success': False, 'error': 'Role and session ID are required'}), 400
+
+    resume_text = sessions.get_text(session_id)
+    if resume_text is None:
+        return jsonify({'success': False, 'error': 'Session file not found'}), 404
+    extracted_skills = sessions.get_artifact(session_id, skills_artifact_name())
+    cached = get_roadmap_artifact(session_id, role)
+
+    use_ndjson = request.args.get('format') == 'ndjson'
+
+    def encode(event, payload):
+        if use_ndjson:
+            return json.dumps({'event': event, 'data': payload}) + "\n"
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    def replay_cached():
+        yield 'extracted_skills', {'extracted_skills': cached['extracted_skills']}
+        yield 'missing_skills', {'missing_skills': cached['missing_skills'], 'nice_to_have': cached['nice_to_have']}
+        for i, phase in enumerate(cached['roadmap']):
+            yield 'phase', {'index': i, 'phase': phase}
+        yield 'performance', {'source': 'document_cache'}
+
+    def events():
+        try:
+            if cached is not None:
+                pipeline_events = replay_cached()
+            else:
+                pipeline_events = stream_pipeline_optimized(resume_text, role, extracted_skills=extracted_skills)
+            artifact = {'roadmap': []}
+            for event, payload in pipeline_events:
+                if event == 'extracted_skills' and extracted_skills is None:
+                    sessions.set_artifact(session_id, skills_artifact_name(), payload['extracted_skills'])
+                if event in ('extracted_skills', 'missing_skills'):
+                    artifact.update(payload)
+                if event == 'phase':
+                    artifact['roadmap'].append(payload['phase'])
+                    payload = {'index': payload['index'], 'phase': format_roadmap_phase(payload['phase'], payload['index'])}
+                yield encode(event, payload)
+            if cached is None and artifact['roadmap']:
+                set_roadmap_artifact(session_id, role, artifact)
+            yield encode('done', {'success': True})
+        except Exception as e:
+            print(f"Roadmap streaming error: {e}")
+            yield encode('error', {'success': False, 'error': str(e)})
+
+    mimetype = 'application/x-ndjson' if use_ndjson else 'text/event-stream'
+    return Response(stream_with_context(events()), mimetype=mimetype,
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/assess-target-role-readiness', methods=['POST'])
 def assess_target_role_readiness():
     data = request.get_json()
@@ -225,22 +327,27 @@ def assess_target_role_readiness():
     if not all([session_id, target_role]):
         return jsonify({'success': False, 'error': 'session_id and target_role are required'}), 400
 
-    session_file = os.path.join(UPLOADS_DIR, f"{session_id}.txt")
-    if not os.path.exists(session_file):
+    resume_text = sessions.get_text(session_id)
+    if resume_text is None:
         return jsonify({'success': False, 'error': 'Session file not found'}), 404
 
-    with open(session_file, 'r', encoding='utf-8') as f:
-        resume_text = f.read()
+    artifact_name = readiness_artifact_name(target_role)
+    cached_assessment = sessions.get_artifact(session_id, artifact_name)
+    if cached_assessment is not None:
+        return jsonify({'success': True, 'assessment': cached_assessment})
 
     try:
-        start_time = time.time()
-        assessment = assess_single_role_readiness(resume_text, target_role)
-        execution_time = time.time() - start_time
+        start_time = time.perf_counter()
+        skills = sessions.get_artifact(session_id, skills_artifact_name())
+        if skills is None:
+            skills = extract_skills_only(resume_text).get('extracted_skills', [])
+            sessions.set_artifact(session_id, skills_artifact_name(), skills)
+        assessment = assess_single_role_readiness(skills, target_role)
+        execution_time = time.perf_counter() - start_time
+        sessions.set_artifact(session_id, artifact_name, assessment)
         
-        # --- THIS IS THE CORRECTED LINE ---
-        # The first argument should be the input text, not a keyword argument.
         logger.log_execution(
-            resume_text, # Changed from input_data=...
+            resume_text,
             "Single Role Readiness",
             assessment,
             execution_time
@@ -253,5 +360,68 @@ def assess_target_role_readiness():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/assess-readiness/batch', methods=['POST'])
+def assess_readiness_batch():
+    """
+    Score many candidates against many roles, streamed back as NDJSON in pages.
+
+    Body: {"candidates": [{"id": ..., "skills": [...]}, ...] (or bare skill lists),
+    "roles": [...] (default: all roles), "details": false}. All candidates are
+    scored once, in one vectorized pass; ?limit= (default 1000) results are
+    streamed per page as {"event": "result"} lines in input order, then a
+    {"event": "done"} line with the page's offset and count, the total and a
+    `next` cursor. While `next` is not null, POST ?cursor=<next> (no body) for
+    the following page of the same scored batch. Scored batches are held by this
+    worker for BATCH_READINESS_CURSOR_TTL seconds and each cursor is good once.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 1000)), 1), BATCH_READINESS_MAX_PAGE)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        batch = batch_cursors.get(cursor)
+        if batch is None:
+            return jsonify({'success': False, 'error': 'Unknown or expired cursor'}), 404
+        batch_cursors.pop(cursor)
+    else:
+        data = request.get_json(silent=True) or {}
+        candidates = data.get('candidates')
+        if not isinstance(candidates, list):
+            return jsonify({'success': False, 'error': 'candidates must be a list'}), 400
+
+        ids, skill_lists = [], []
+        for position, candidate in enumerate(candidates):
+            skills = candidate.get('skills') if isinstance(candidate, dict) else candidate
+            if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+                return jsonify({'success': False, 'error': f'Invalid skills for candidate {position}'}), 400
+            ids.append(candidate.get('id', position) if isinstance(candidate, dict) else position)
+            skill_lists.append(skills)
+
+        try:
+            results = assess_batch_readiness(skill_lists, data.get('roles') or None, bool(data.get('details')))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        batch = {'ids': ids, 'results': results, 'offset': 0}
+
+    def lines():
+        offset = batch['offset']
+        for result in itertools.islice(batch['results'], limit):
+            payload = {'id': batch['ids'][result['index']], 'index': result['index'],
+                       'assessments': result['assessments']}
+            yield json.dumps({'event': 'result', 'data': payload}) + "\n"
+            batch['offset'] += 1
+        next_cursor = None
+        if batch['offset'] < len(batch['ids']):
+            # Later pages continue the same results iterator instead of scoring again
+            next_cursor = uuid.uuid4().hex
+            batch_cursors.set(next_cursor, batch)
+        yield json.dumps({'event': 'done', 'data': {'offset': offset, 'count': batch['offset'] - offset,
+                                                    'total': len(batch['ids']), 'next': next_cursor}}) + "\n"
+
+    return Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
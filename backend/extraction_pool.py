@@ -0,0 +1,153 @@
+"""
+Process pool for resume text extraction
+
+PDF/DOCX parsing is CPU-bound pure Python; run inline under the gevent worker
+it blocks every other greenlet. Jobs are sent to a bounded pool of worker
+processes instead, with a per-job timeout. No more jobs are admitted than
+there are workers (later uploads wait for a slot, then get a 503), so a job
+starts as soon as it is submitted and its timeout measures extraction alone,
+never time spent queued behind other uploads. A job that overruns its timeout
+has its pool's processes terminated, and the pool is rebuilt on the next job,
+so a hostile document can't pin a core.
+Other jobs that were running on the terminated pool are resubmitted to the new
+one, so one bad document doesn't fail its neighbours; if a worker crashes on
+its own, every job that was on that pool gets one more try.
+Set EXTRACTION_WORKERS=0 to extract inline.
+"""
+
+import os
+import weakref
+import threading
+import multiprocessing
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.ingestion import IngestionError, extract_resume_text
+
+try:
+    from gevent import get_hub
+    from gevent.monkey import is_module_patched
+except ImportError:
+    get_hub = None
+
+EXTRACTION_CONFIG = {
+    'workers': int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1))),
+    'timeout': float(os.getenv("EXTRACTION_TIMEOUT", "20")),
+    'queue_timeout': float(os.getenv("EXTRACTION_QUEUE_TIMEOUT", "10")),
+}
+
+# Submissions per job: the first plus resubmits after its pool went down under it
+MAX_ATTEMPTS = 3
+
+
+class ExtractionExecutor:
+    """Bounded process pool that extracts resume text with timeouts"""
+
+    def __init__(self, workers: int = EXTRACTION_CONFIG['workers'], timeout: float = EXTRACTION_CONFIG['timeout'],
+                 queue_timeout: float = EXTRACTION_CONFIG['queue_timeout']):
+        self.workers = workers
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        # One admitted job per worker, so none waits inside the pool; excess callers wait here, then get a 503
+        self._slots = threading.BoundedSemaphore(max(workers, 1))
+        self._executor = None
+        # Pools terminated because one of their jobs overran; their other jobs were innocent
+        self._terminated_for_timeout = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.resubmitted = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs a gevent hub is not safe
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor, timed_out: bool = False):
+        """Terminate a pool whose workers may be stuck and let the next job start a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+            if timed_out:
+                self._terminated_for_timeout.add(executor)
+        # ProcessPoolExecutor has no public way to kill running jobs
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _wait(future, timeout: float):
+        # Under gevent, block in a native thread so the hub keeps serving other greenlets
+        if get_hub is not None and is_module_patched("threading"):
+            def wait_in_thread():
+                try:
+                    return future.result(timeout), None
+                except BaseException as e:  # re-raised in the greenlet; gevent would log it as a crash
+                    return None, e
+            result, error = get_hub().threadpool.apply(wait_in_thread)
+            if error is not None:
+                raise error
+            return result
+        return future.result(timeout)
+
+    def extract(self, data: bytes, filename: str, timeout: float = None) -> str:
+        """Extract text from an uploaded document in a worker process"""
+        if self.workers <= 0:
+            return extract_resume_text(data, filename)
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise IngestionError("Server is busy processing other uploads, please retry", 503)
+        try:
+            crashed = False
+            for _ in range(MAX_ATTEMPTS):
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(extract_resume_text, data, filename)
+                except (RuntimeError, BrokenProcessPool):
+                    continue  # the pool was reset between _get_executor and submit
+                try:
+                    text = self._wait(future, timeout or self.timeout)
+                except FuturesTimeoutError:
+                    if future.cancel():
+                        # Never started (the pool was still starting up): the server is busy, not the document bad
+                        raise IngestionError("Server is busy processing other uploads, please retry", 503)
+                    self.timeouts += 1
+                    self._reset(executor, timed_out=True)
+                    raise IngestionError("Timed out extracting text from the document", 422)
+                except (BrokenProcessPool, CancelledError):
+                    if executor not in self._terminated_for_timeout:
+                        # A worker died on its own; this document may be the cause, so only one more try
+                        self._reset(executor)
+                        if crashed:
+                            break
+                        crashed = True
+                    self.resubmitted += 1
+                    continue
+                self.completed += 1
+                return text
+            self.failures += 1
+            raise IngestionError("Could not process the document", 422)
+        finally:
+            self._slots.release()
+
+    def get_stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'failures': self.failures,
+            'resubmitted': self.resubmitted
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+extraction_executor = ExtractionExecutor()
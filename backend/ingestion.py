@@ -0,0 +1,100 @@
+"""
+Resume ingestion
+
+Extracts text straight from the uploaded stream: nothing but the extracted
+text is ever written to disk. Uploads are capped in size, PDFs are parsed one
+page at a time up to a page limit, and parsing stops as soon as enough text
+has been collected.
+"""
+
+import io
+import os
+import PyPDF2
+from docx import Document
+
+INGESTION_LIMITS = {
+    'max_upload_bytes': int(os.getenv("MAX_UPLOAD_BYTES", str(5 * 1024 * 1024))),
+    'max_pages': int(os.getenv("MAX_RESUME_PAGES", "10")),
+    'max_chars': int(os.getenv("MAX_RESUME_CHARS", "50000")),
+}
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+
+class IngestionError(ValueError):
+    """Upload rejected; the message is safe to show to the client"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+    def __reduce__(self):
+        # Keep status_code when raised inside an extraction worker process
+        return (IngestionError, (str(self), self.status_code))
+
+
+def read_upload(stream, max_bytes: int = INGESTION_LIMITS['max_upload_bytes'], chunk_size: int = 64 * 1024) -> bytes:
+    """Read an upload stream into memory, refusing anything over max_bytes"""
+    chunks, total = [], 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise IngestionError(f"File too large (limit {max_bytes // (1024 * 1024)} MB)", 413)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def extract_text_from_pdf(data: bytes, max_pages: int = INGESTION_LIMITS['max_pages'],
+                          max_chars: int = INGESTION_LIMITS['max_chars']) -> str:
+    """Extract text page by page, stopping at max_pages or once max_chars are collected"""
+    if not data.startswith(b"%PDF"):
+        raise IngestionError("File is not a valid PDF")
+    try:
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        if reader.is_encrypted:
+            raise IngestionError("Encrypted PDFs are not supported")
+
+        parts, collected = [], 0
+        for index, page in enumerate(reader.pages):
+            if index >= max_pages or collected >= max_chars:
+                break
+            text = page.extract_text() or ""
+            parts.append(text)
+            collected += len(text)
+        return "".join(parts)[:max_chars]
+    except IngestionError:
+        raise
+    except Exception as e:
+        print(f"Error extracting PDF: {e}")
+        return ""
+
+
+def extract_text_from_docx(data: bytes, max_chars: int = INGESTION_LIMITS['max_chars']) -> str:
+    """Extract paragraph text, stopping once max_chars are collected"""
+    if not data.startswith(b"PK"):
+        raise IngestionError("File is not a valid DOCX")
+    try:
+        doc = Document(io.BytesIO(data))
+        parts, collected = [], 0
+        for para in doc.paragraphs:
+            if collected >= max_chars:
+                break
+            parts.append(para.text)
+            collected += len(para.text) + 1
+        return "\n".join(parts)[:max_chars]
+    except Exception as e:
+        print(f"Error extracting DOCX: {e}")
+        return ""
+
+
+def extract_resume_text(data: bytes, filename: str) -> str:
+    """Dispatch on the file extension; raises IngestionError for unsupported input"""
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        return extract_text_from_pdf(data)
+    if name.endswith('.docx'):
+        return extract_text_from_docx(data)
+    raise IngestionError("Unsupported file type")
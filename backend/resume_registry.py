@@ -0,0 +1,196 @@
+"""
+Canonical resume registry
+
+Many uploads are the same resume submitted again. Each upload is fingerprinted
+(SHA-256 of the normalized text) and, optionally, SimHashed so near-identical
+re-exports of the same document land on the same canonical document. Derived
+results (extracted skills, roadmaps, readiness assessments) are stored against
+the canonical document, so a repeat upload reuses them instead of calling the
+LLM again.
+
+Near-duplicate lookup splits the 64-bit SimHash into bands; any two hashes
+within max_distance < bands bits of each other share at least one band exactly,
+so candidates come from an indexed equality lookup rather than a scan.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from agents.skill_cache import normalize_resume_text
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+DEDUPE_MODES = ('off', 'exact', 'near')
+
+
+def text_fingerprint(text: str) -> str:
+    """Exact fingerprint: whitespace- and case-insensitive"""
+    return hashlib.sha256(normalize_resume_text(text).encode("utf-8")).hexdigest()
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    """64-bit SimHash over word shingles of the normalized text"""
+    tokens = re.findall(r"\w+", normalize_resume_text(text))
+    grams = Counter(" ".join(tokens[i:i + shingle]) for i in range(max(len(tokens) - shingle + 1, 1)))
+    weights = [0] * SIMHASH_BITS
+    for gram, count in grams.items():
+        h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if h >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _bands(value: int):
+    mask = (1 << BAND_BITS) - 1
+    return [(band, value >> (band * BAND_BITS) & mask) for band in range(SIMHASH_BANDS)]
+
+
+class ResumeRegistry:
+    """Maps uploaded resume text to a canonical document and stores its derived artifacts"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            doc_id TEXT PRIMARY KEY,
+            simhash TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_seen REAL NOT NULL,
+            artifacts TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE INDEX IF NOT EXISTS idx_documents_last_seen ON documents (last_seen);
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            fingerprint TEXT PRIMARY KEY,
+            doc_id TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS simhash_bands (
+            band INTEGER NOT NULL,
+            value INTEGER NOT NULL,
+            doc_id TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_simhash_bands ON simhash_bands (band, value);
+    """
+
+    def __init__(self, db_path: str, mode: str = "exact", max_distance: int = 3,
+                 min_tokens: int = 50, ttl: float = 7 * 24 * 3600):
+        if mode not in DEDUPE_MODES:
+            raise ValueError(f"Unknown dedupe mode: {mode}")
+        if max_distance >= SIMHASH_BANDS:
+            raise ValueError(f"max_distance must be below {SIMHASH_BANDS}")
+        self.mode = mode
+        self.max_distance = max_distance
+        # Short texts share too many shingles by chance to trust a near match
+        self.min_tokens = min_tokens
+        self.ttl = ttl
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.new_documents = 0
+
+    def _find_near_duplicate(self, value: int) -> Optional[str]:
+        clauses = " OR ".join(["(band = ? AND value = ?)"] * SIMHASH_BANDS)
+        params = [item for pair in _bands(value) for item in pair]
+        rows = self._conn.execute(
+            f"SELECT DISTINCT d.doc_id, d.simhash FROM simhash_bands b JOIN documents d ON d.doc_id = b.doc_id"
+            f" WHERE {clauses}", params).fetchall()
+        best = None
+        for doc_id, other in rows:
+            distance = bin(value ^ int(other, 16)).count("1")
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, doc_id)
+        return best[1] if best else None
+
+    def resolve(self, text: str) -> Optional[str]:
+        """Return the canonical document ID for this text, registering it if new"""
+        if self.mode == "off":
+            return None
+        # Hash outside the lock so concurrent uploads only serialize on the database work.
+        # Exact mode never reads the SimHash, so its documents get no bands
+        fingerprint = text_fingerprint(text)
+        value = simhash(text) if self.mode == "near" else None
+        near_eligible = value is not None and len(normalize_resume_text(text).split()) >= self.min_tokens
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT doc_id FROM fingerprints WHERE fingerprint = ?",
+                                     (fingerprint,)).fetchone()
+            if row:
+                self.exact_hits += 1
+                self._conn.execute("UPDATE documents SET last_seen = ? WHERE doc_id = ?", (now, row[0]))
+                return row[0]
+
+            doc_id = self._find_near_duplicate(value) if near_eligible else None
+            if doc_id:
+                self.near_hits += 1
+                self._conn.execute("UPDATE documents SET last_seen = ? WHERE doc_id = ?", (now, doc_id))
+            else:
+                doc_id = fingerprint
+                self.new_documents += 1
+                self._conn.execute("INSERT OR IGNORE INTO documents (doc_id, simhash, created_at, last_seen)"
+                                   " VALUES (?, ?, ?, ?)",
+                                   (doc_id, format(value, "016x") if value is not None else "", now, now))
+                if value is not None:
+                    self._conn.executemany("INSERT INTO simhash_bands VALUES (?, ?, ?)",
+                                           [(band, band_value, doc_id) for band, band_value in _bands(value)])
+            # Later exact repeats of this variant skip the SimHash
+            self._conn.execute("INSERT OR IGNORE INTO fingerprints VALUES (?, ?)", (fingerprint, doc_id))
+            return doc_id
+
+    def get_artifacts(self, doc_id: str) -> Dict:
+        with self._lock:
+            row = self._conn.execute("SELECT artifacts FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def get_artifact(self, doc_id: str, name: str, default: Any = None) -> Any:
+        return self.get_artifacts(doc_id).get(name, default)
+
+    def set_artifact(self, doc_id: str, name: str, value: Any):
+        """Attach a derived result (must be JSON-serializable) to the canonical document"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT artifacts FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+            if row is None:
+                return
+            artifacts = json.loads(row[0])
+            artifacts[name] = value
+            self._conn.execute("UPDATE documents SET artifacts = ? WHERE doc_id = ?", (json.dumps(artifacts), doc_id))
+
+    def purge_older_than(self, cutoff: float) -> int:
+        with self._lock, self._conn:
+            stale = "SELECT doc_id FROM documents WHERE last_seen < ?"
+            self._conn.execute(f"DELETE FROM fingerprints WHERE doc_id IN ({stale})", (cutoff,))
+            self._conn.execute(f"DELETE FROM simhash_bands WHERE doc_id IN ({stale})", (cutoff,))
+            return self._conn.execute("DELETE FROM documents WHERE last_seen < ?", (cutoff,)).rowcount
+
+    def purge_expired(self) -> int:
+        return self.purge_older_than(time.time() - self.ttl)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return {
+            'mode': self.mode,
+            'documents': documents,
+            'exact_hits': self.exact_hits,
+            'near_hits': self.near_hits,
+            'new_documents': self.new_documents
+        }
+
+
+def create_resume_registry(uploads_dir: str) -> ResumeRegistry:
+    """Build the registry from RESUME_DEDUPE (off|exact|near), RESUME_NEAR_DUP_DISTANCE and DOCUMENT_TTL_SECONDS"""
+    return ResumeRegistry(
+        os.path.join(uploads_dir, "documents.db"),
+        mode=os.getenv("RESUME_DEDUPE", "exact"),
+        max_distance=int(os.getenv("RESUME_NEAR_DUP_DISTANCE", "3")),
+        ttl=float(os.getenv("DOCUMENT_TTL_SECONDS", str(7 * 24 * 3600)))
+    )
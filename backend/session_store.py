@@ -0,0 +1,295 @@
+"""
+Session store for uploaded resumes
+
+Sessions get collision-free IDs and expire after a TTL. Reads go through an
+in-memory LRU so the UI flow (extract -> assess -> roadmap) doesn't re-read
+the resume from disk on every step, and derived artifacts (extracted skills,
+assessments) are cached next to the text. The backing tier is either a
+directory of files (uploads/sessions/session_*.txt) or a SQLite database.
+Sessions written by older versions straight into uploads/ are still readable
+there, but only files in the store's own directory are ever deleted, so
+anything else in uploads/ (such as the benchmark resume corpus) is left alone.
+
+With a ResumeRegistry attached, each session is also linked to its canonical
+document, so artifacts computed for an earlier upload of the same resume are
+served to new sessions as well.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from agents.cache_utils import LRUCache
+from backend.resume_registry import create_resume_registry
+
+SESSION_ID_RE = re.compile(r"^session_[A-Za-z0-9_]{1,64}$")
+
+
+class DiskSessionBackend:
+    """
+    {sid}.txt holds the resume text, {sid}.artifacts.json the derived artifacts.
+    legacy_directory is searched read-only for sessions created before the
+    store had a directory of its own.
+    """
+
+    def __init__(self, directory: str, legacy_directory: str = None):
+        self.directory = directory
+        self.legacy_directory = legacy_directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str, suffix: str) -> str:
+        path = os.path.join(self.directory, f"{session_id}{suffix}")
+        if self.legacy_directory and not os.path.exists(path):
+            legacy_path = os.path.join(self.legacy_directory, f"{session_id}{suffix}")
+            if os.path.exists(legacy_path):
+                return legacy_path
+        return path
+
+    def _own_path(self, session_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{session_id}{suffix}")
+
+    @staticmethod
+    def _write_atomic(path: str, content: str):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def save(self, session_id: str, text: str, created_at: float):
+        self._write_atomic(self._own_path(session_id, ".txt"), text)
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        text_path = self._path(session_id, ".txt")
+        try:
+            created_at = os.path.getmtime(text_path)
+            with open(text_path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+
+        artifacts = {}
+        try:
+            with open(self._path(session_id, ".artifacts.json"), "r", encoding="utf-8") as f:
+                artifacts = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        return {"text": text, "created_at": created_at, "artifacts": artifacts}
+
+    def save_artifacts(self, session_id: str, artifacts: Dict):
+        self._write_atomic(self._own_path(session_id, ".artifacts.json"), json.dumps(artifacts))
+
+    def delete(self, session_id: str):
+        # Legacy files are never removed; an expired one is simply not served
+        for suffix in (".txt", ".artifacts.json"):
+            try:
+                os.remove(self._own_path(session_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def purge_older_than(self, cutoff: float) -> int:
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name.startswith("session_") and name.endswith(".txt"):
+                path = os.path.join(self.directory, name)
+                if os.path.getmtime(path) < cutoff:
+                    self.delete(name[:-len(".txt")])
+                    removed += 1
+        return removed
+
+
+class SQLiteSessionBackend:
+    """Sessions and artifacts in one WAL-mode SQLite file"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions (created_at);
+        CREATE TABLE IF NOT EXISTS session_artifacts (
+            session_id TEXT PRIMARY KEY,
+            artifacts TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: str):
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def save(self, session_id: str, text: str, created_at: float):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", (session_id, text, created_at))
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT s.text, s.created_at, a.artifacts FROM sessions s"
+                " LEFT JOIN session_artifacts a ON a.session_id = s.session_id WHERE s.session_id = ?",
+                (session_id,)).fetchone()
+        if row is None:
+            return None
+        return {"text": row[0], "created_at": row[1], "artifacts": json.loads(row[2]) if row[2] else {}}
+
+    def save_artifacts(self, session_id: str, artifacts: Dict):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO session_artifacts VALUES (?, ?)",
+                               (session_id, json.dumps(artifacts)))
+
+    def delete(self, session_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM session_artifacts WHERE session_id = ?", (session_id,))
+
+    def purge_older_than(self, cutoff: float) -> int:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM session_artifacts WHERE session_id IN"
+                " (SELECT session_id FROM sessions WHERE created_at < ?)", (cutoff,))
+            return self._conn.execute("DELETE FROM sessions WHERE created_at < ?", (cutoff,)).rowcount
+
+
+class SessionStore:
+    """LRU-fronted session store with TTL expiry over a pluggable backing tier"""
+
+    def __init__(self, backend, ttl: float = 24 * 3600, cache_size: int = 256, purge_every: int = 100,
+                 documents=None):
+        self.backend = backend
+        self.documents = documents
+        self.ttl = ttl
+        self.cache = LRUCache(maxsize=cache_size, ttl=ttl)
+        self.purge_every = purge_every
+        self._creates = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_valid_id(session_id) -> bool:
+        return isinstance(session_id, str) and bool(SESSION_ID_RE.match(session_id))
+
+    def create(self, text: str) -> str:
+        """Store resume text under a new random session ID"""
+        session_id = f"session_{uuid.uuid4().hex}"
+        created_at = time.time()
+        self.backend.save(session_id, text, created_at)
+        artifacts = {}
+        doc_id = self.documents.resolve(text) if self.documents else None
+        if doc_id:
+            artifacts["document_id"] = doc_id
+            self.backend.save_artifacts(session_id, artifacts)
+        self.cache.set(session_id, {"text": text, "created_at": created_at, "artifacts": artifacts})
+
+        with self._lock:
+            self._creates += 1
+            purge_due = self._creates % self.purge_every == 0
+        if purge_due:
+            self.purge_expired()
+        return session_id
+
+    def _load(self, session_id: str) -> Optional[Dict]:
+        if not self.is_valid_id(session_id):
+            return None
+        record = self.cache.get(session_id)
+        if record is not None:
+            return record
+
+        record = self.backend.load(session_id)
+        if record is None:
+            return None
+        if record["created_at"] + self.ttl < time.time():
+            self.backend.delete(session_id)
+            return None
+        self.cache.set(session_id, record, ttl=max(record["created_at"] + self.ttl - time.time(), 1))
+        return record
+
+    def exists(self, session_id: str) -> bool:
+        return self._load(session_id) is not None
+
+    def get_text(self, session_id: str) -> Optional[str]:
+        record = self._load(session_id)
+        return record["text"] if record else None
+
+    def _document_id(self, session_id: str, record: Dict) -> Optional[str]:
+        if self.documents is None:
+            return None
+        doc_id = record["artifacts"].get("document_id")
+        if doc_id is None:
+            # Session created before the registry existed
+            doc_id = self.documents.resolve(record["text"])
+            if doc_id:
+                self._save_artifact(session_id, record, "document_id", doc_id)
+        return doc_id
+
+    def get_document_id(self, session_id: str) -> Optional[str]:
+        record = self._load(session_id)
+        return self._document_id(session_id, record) if record else None
+
+    def get_artifact(self, session_id: str, name: str, default: Any = None) -> Any:
+        """Session artifact, falling back to one computed for the same canonical document"""
+        record = self._load(session_id)
+        if record is None:
+            return default
+        value = record["artifacts"].get(name)
+        if value is None:
+            doc_id = self._document_id(session_id, record)
+            value = self.documents.get_artifact(doc_id, name) if doc_id else None
+            if value is not None:
+                with self._lock:
+                    record["artifacts"][name] = value
+        return default if value is None else value
+
+    def _save_artifact(self, session_id: str, record: Dict, name: str, value: Any):
+        with self._lock:
+            record["artifacts"][name] = value
+            artifacts = dict(record["artifacts"])
+        self.backend.save_artifacts(session_id, artifacts)
+
+    def set_artifact(self, session_id: str, name: str, value: Any):
+        """Cache a derived result (must be JSON-serializable) alongside the session and its document"""
+        record = self._load(session_id)
+        if record is None:
+            return
+        self._save_artifact(session_id, record, name, value)
+        doc_id = self._document_id(session_id, record)
+        if doc_id:
+            self.documents.set_artifact(doc_id, name, value)
+
+    def delete(self, session_id: str):
+        self.cache.pop(session_id)
+        if self.is_valid_id(session_id):
+            self.backend.delete(session_id)
+
+    def purge_expired(self) -> int:
+        if self.documents:
+            self.documents.purge_expired()
+        return self.backend.purge_older_than(time.time() - self.ttl)
+
+
+def create_session_store(uploads_dir: str) -> SessionStore:
+    """
+    Build the store from SESSION_BACKEND (disk|sqlite), SESSION_TTL_SECONDS and
+    SESSION_CACHE_SIZE, linked to the resume registry unless RESUME_DEDUPE=off
+    """
+    backend_name = os.getenv("SESSION_BACKEND", "disk")
+    if backend_name == "sqlite":
+        backend = SQLiteSessionBackend(os.path.join(uploads_dir, "sessions.db"))
+    elif backend_name == "disk":
+        backend = DiskSessionBackend(os.path.join(uploads_dir, "sessions"), legacy_directory=uploads_dir)
+    else:
+        raise ValueError(f"Unknown session backend: {backend_name}")
+
+    return SessionStore(
+        backend,
+        ttl=float(os.getenv("SESSION_TTL_SECONDS", str(24 * 3600))),
+        cache_size=int(os.getenv("SESSION_CACHE_SIZE", "256")),
+        documents=create_resume_registry(uploads_dir) if os.getenv("RESUME_DEDUPE", "exact") != "off" else None
+    )
@@ -0,0 +1,214 @@
+"""
+Offline stand-in for the Gemini chat client
+
+FakeChatModel implements the invoke / ainvoke / stream surface the agents use
+through llm_pool and answers every prompt without network access:
+
+1. recorded responses (JSON object: sha256 of the prompt text -> response
+   text), e.g. captured once from Gemini with RecordingChatModel
+2. otherwise a templated response built from the prompt itself (skills found
+   with the local extractor, gaps computed from the listed skills, roadmaps
+   with one course per skill)
+
+Each call sleeps for a latency drawn uniformly from latency +/- jitter with a
+seeded RNG, so runs are repeatable. Streams wait ttft_fraction of that latency
+for the first chunk and spread the rest over the remaining chunks. With
+error_rate > 0 that share of calls fails with a 429 after its latency, to
+exercise llm_pool's retries.
+"""
+
+import ast
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Callable, Dict, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from agents.llm_client import llm_pool, gemini_client
+from agents.local_skill_extractor import local_skill_extractor
+
+
+class FakeRateLimitError(Exception):
+    """Shaped like the Google API's ResourceExhausted (code 429)"""
+    code = 429
+
+
+def prompt_text(messages) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _list_after(prompt: str, label: str) -> list:
+    """Python list literal following 'label' on its line ([] if absent)"""
+    start = prompt.find(label)
+    if start < 0:
+        return []
+    line = prompt[start + len(label):].split("\n", 1)[0]
+    try:
+        value = ast.literal_eval(line[line.index("["):line.rindex("]") + 1])
+    except (ValueError, SyntaxError):
+        return []
+    return value if isinstance(value, list) else []
+
+
+def _roadmap_items(skills: list, priority: str) -> list:
+    reason = "Required for the target role" if priority == "high" else "Useful for the target role"
+    return [{"skill": skill, "course": f"{skill} Fundamentals - Coursera", "reason": reason, "est_hours": 15}
+            for skill in skills]
+
+
+def template_response(prompt: str) -> str:
+    """Plausible JSON answer for each prompt the pipeline sends"""
+    if prompt.startswith("Extract technical skills"):
+        resume = prompt.split("USER INPUT:", 1)[-1]
+        skills = [skill.lower() for skill in local_skill_extractor.extract(resume)]
+        return json.dumps({"extracted_skills": skills})
+
+    if prompt.startswith("Suggest other relevant skills"):
+        known = {skill.lower() for skill in _list_after(prompt, "User skills:") + _list_after(prompt, "Already planned")}
+        return json.dumps({"nice_to_have": [skill for skill in ("docker", "git", "linux") if skill not in known]})
+
+    if prompt.startswith("Compare user skills"):
+        have = {skill.lower() for skill in _list_after(prompt, "User skills:")}
+        missing = [skill for skill in _list_after(prompt, "Required skills:") if skill.lower() not in have]
+        return json.dumps({"missing_skills": missing, "nice_to_have": ["docker", "git"]})
+
+    if prompt.startswith("Create one phase"):
+        name = prompt.split('named "', 1)[1].split('"', 1)[0]
+        priority = "high" if "(high priority)" in prompt else "low"
+        return json.dumps({"phase": name, "skills": _roadmap_items(_list_after(prompt, "priority):"), priority)})
+
+    if prompt.startswith("Create a 3-phase"):
+        missing = _list_after(prompt, "Missing Skills (High Priority):")
+        nice = _list_after(prompt, "Nice-to-have Skills (Lower Priority):")
+        half = (len(missing) + 1) // 2
+        phases = [("Phase 1: Foundation", missing[:half], "high"),
+                  ("Phase 2: Core Skills", missing[half:], "high"),
+                  ("Phase 3: Advanced & Nice-to-have", nice, "low")]
+        roadmap = [{"phase": name, "skills": _roadmap_items(skills, priority)} for name, skills, priority in phases if skills]
+        return "```json\n" + json.dumps({"roadmap": roadmap}) + "\n```"
+
+    return "{}"
+
+
+class FakeChatModel:
+    """Chat client stand-in with recorded/templated responses and simulated latency"""
+
+    def __init__(self, responder: Callable[[str], str] = template_response, recordings: Optional[Dict[str, str]] = None,
+                 latency: float = 0.5, jitter: float = 0.1, ttft_fraction: float = 0.3, chunk_size: int = 40,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.responder = responder
+        self.recordings = recordings or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.ttft_fraction = ttft_fraction
+        self.chunk_size = chunk_size
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.recorded_hits = 0
+        self.failures = 0
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def _maybe_fail(self):
+        with self._lock:
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if failed:
+                self.failures += 1
+        if failed:
+            raise FakeRateLimitError("429 Resource has been exhausted (fake)")
+
+    def _respond(self, messages) -> AIMessage:
+        prompt = prompt_text(messages)
+        content = self.recordings.get(prompt_key(prompt))
+        if content is not None:
+            self.recorded_hits += 1
+        else:
+            content = self.responder(prompt)
+        # Rough 4-characters-per-token estimate, shaped like Gemini's usage metadata
+        input_tokens, output_tokens = len(prompt) // 4, len(content) // 4
+        return AIMessage(content=content, usage_metadata={
+            'input_tokens': input_tokens, 'output_tokens': output_tokens,
+            'total_tokens': input_tokens + output_tokens
+        })
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        time.sleep(self._delay())
+        self._maybe_fail()
+        return self._respond(messages)
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return self._respond(messages)
+
+    def stream(self, messages, **kwargs):
+        delay = self._delay()
+        response = self._respond(messages)
+        content = response.content
+        pieces = [content[i:i + self.chunk_size] for i in range(0, len(content), self.chunk_size)] or [""]
+        time.sleep(delay * self.ttft_fraction)
+        self._maybe_fail()
+        step = delay * (1 - self.ttft_fraction) / len(pieces)
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(step)
+            # Like Gemini, usage arrives with the last chunk
+            usage = response.usage_metadata if i == len(pieces) - 1 else None
+            yield AIMessageChunk(content=piece, usage_metadata=usage)
+
+
+class RecordingChatModel:
+    """Wraps a real client and keeps every response, keyed like FakeChatModel recordings"""
+
+    def __init__(self, client, recordings: Dict[str, str]):
+        self.client = client
+        self.recordings = recordings
+
+    def invoke(self, messages, **kwargs):
+        response = self.client.invoke(messages, **kwargs)
+        self.recordings[prompt_key(prompt_text(messages))] = response.content
+        return response
+
+    async def ainvoke(self, messages, **kwargs):
+        response = await self.client.ainvoke(messages, **kwargs)
+        self.recordings[prompt_key(prompt_text(messages))] = response.content
+        return response
+
+    def stream(self, messages, **kwargs):
+        parts = []
+        for chunk in self.client.stream(messages, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        self.recordings[prompt_key(prompt_text(messages))] = "".join(parts)
+
+
+def load_recordings(path: Optional[str]) -> Dict[str, str]:
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def install_fake_llm(**options) -> FakeChatModel:
+    """Route every llm_pool client to one FakeChatModel (keyword args as FakeChatModel)"""
+    model = FakeChatModel(**options)
+    llm_pool.set_client_factory(lambda name, temperature: model)
+    return model
+
+
+def install_recorder(recordings: Dict[str, str]):
+    """Route llm_pool through live Gemini clients that record into recordings"""
+    llm_pool.set_client_factory(lambda name, temperature: RecordingChatModel(gemini_client(name, temperature), recordings))
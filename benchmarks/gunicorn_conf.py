@@ -0,0 +1,79 @@
+"""
+gunicorn config for load tests
+
+The deployment's gevent worker with Gemini replaced by the fake chat model
+(benchmarks/fake_llm.py), plus per-request timing for benchmarks/load_test.py:
+
+    gunicorn -c benchmarks/gunicorn_conf.py --workers 2 'backend.app:app'
+
+Every request that carries an X-Request-Start header (client send time, epoch
+seconds) is written as one JSON line to LOADTEST_STATS_DIR/worker-<pid>.jsonl
+with its queueing delay (send -> handler start) and service time. gevent's
+monitor thread reports greenlets that block the event loop for longer than
+GEVENT_MAX_BLOCKING_TIME seconds; those reports go to the same file.
+
+Env: FAKE_LLM_LATENCY (0.5), FAKE_LLM_JITTER (0.1), LOADTEST_STATS_DIR,
+GEVENT_MAX_BLOCKING_TIME (0.1), WEB_CONCURRENCY (workers, 1), PORT (8000).
+"""
+
+import os
+import json
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+# Read by gevent when the worker's hub starts
+os.environ.setdefault("GEVENT_MONITOR_THREAD_ENABLE", "true")
+os.environ.setdefault("GEVENT_MAX_BLOCKING_TIME", "0.1")
+
+worker_class = "gevent"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+timeout = 120
+
+_stats_file = None
+
+
+def _record(entry: dict):
+    if _stats_file is not None:
+        _stats_file.write(json.dumps(entry) + "\n")
+
+
+def _on_gevent_event(event):
+    from gevent.events import EventLoopBlocked
+    if isinstance(event, EventLoopBlocked):
+        # info is the monitor's report; the last frame lines show where the loop was stuck
+        frames = [line.strip() for line in event.info if line.strip().startswith('File ')]
+        _record({'event': 'blocked', 'time': time.time(), 'threshold_ms': round(event.blocking_time * 1000, 1),
+                 'where': frames[-3:]})
+
+
+def post_worker_init(worker):
+    global _stats_file
+    from gevent import events
+    from benchmarks.fake_llm import install_fake_llm
+
+    install_fake_llm(latency=float(os.getenv("FAKE_LLM_LATENCY", "0.5")),
+                     jitter=float(os.getenv("FAKE_LLM_JITTER", "0.1")), seed=worker.pid)
+
+    stats_dir = os.getenv("LOADTEST_STATS_DIR")
+    if stats_dir:
+        os.makedirs(stats_dir, exist_ok=True)
+        _stats_file = open(os.path.join(stats_dir, f"worker-{worker.pid}.jsonl"), "a", buffering=1, encoding="utf-8")
+        events.subscribers.append(_on_gevent_event)
+
+
+def pre_request(worker, req):
+    req.handler_start = time.time()
+
+
+def post_request(worker, req, environ, resp):
+    sent = environ.get('HTTP_X_REQUEST_START')
+    if not sent:
+        return
+    try:
+        queue_ms = (req.handler_start - float(sent)) * 1000
+    except (AttributeError, ValueError):
+        return
+    _record({'event': 'request', 'run': environ.get('HTTP_X_LOAD_TEST_RUN', ''), 'path': req.path,
+             'status': resp.status_code, 'queue_ms': round(queue_ms, 2),
+             'service_ms': round((time.time() - req.handler_start) * 1000, 2), 'worker': worker.pid})
@@ -0,0 +1,328 @@
+"""
+Load test for backend.app:app under gunicorn + gevent
+
+Starts gunicorn with benchmarks/gunicorn_conf.py (fake LLM, per-request
+timing hooks) for each worker count, then drives the UI flow
+
+    upload-resume -> extract-skills -> assess-target-role-readiness -> generate-roadmap
+
+from N closed-loop virtual users for a fixed duration per concurrency level.
+Resumes come from backend/uploads/session_*.txt as generated .docx files.
+Every upload gets a unique marker line so each flow takes the cold path,
+unless --reuse-uploads is given.
+
+    python -m benchmarks.load_test --workers 1,2 --concurrency 1,4,16,64 --duration 20
+
+Per level it reports throughput, per-step and flow latency percentiles, error
+rate, server-side queueing delay (client send -> handler start) and service
+time, and event-loop blocking reports from gevent's monitor. The saturation
+point for a worker count is the first level whose throughput gains less than
+half of the extra concurrency (or whose error rate exceeds --max-error-rate).
+Results are written as JSON like the offline benchmarks.
+"""
+
+import os
+import io
+import sys
+import json
+import glob
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from collections import defaultdict
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from docx import Document
+
+from benchmarks.run_benchmarks import DEFAULT_CORPUS, RESULTS_DIR, load_corpus, percentiles, git_commit
+
+GUNICORN_CONF = os.path.join(project_root, "benchmarks", "gunicorn_conf.py")
+# Role select values from the UI; the last three are outside data/job_roles.json (LLM gap analysis)
+ROLES = ["data-scientist", "devops-engineer", "cybersecurity-analyst", "full-stack-developer",
+         "ai-engineer", "ml-engineer", "cloud-architect", "product-manager"]
+FLOW_STEPS = ("upload", "extract_skills", "assess", "roadmap")
+
+
+def build_docx(text: str) -> bytes:
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def encode_multipart(field: str, filename: str, data: bytes):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: application/vnd.openxmlformats-officedocument.wordprocessingml.document\r\n\r\n"
+            ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+class GunicornServer:
+    """gunicorn subprocess with the load-test config, logging to its work directory"""
+
+    def __init__(self, workers: int, port: int, workdir: str, latency: float, jitter: float):
+        self.port = port
+        self.stats_dir = os.path.join(workdir, "stats")
+        self.log_path = os.path.join(workdir, f"gunicorn-{workers}w.log")
+        env = dict(os.environ, UPLOADS_DIR=os.path.join(workdir, "uploads"), LOADTEST_STATS_DIR=self.stats_dir,
+                   FAKE_LLM_LATENCY=str(latency), FAKE_LLM_JITTER=str(jitter), PYTHONUNBUFFERED="1")
+        env.setdefault("GEMINI_API_KEY", "offline-benchmark")
+        self._log = open(self.log_path, "w", encoding="utf-8")
+        # cwd is the work directory so the app's log store lands there too
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", GUNICORN_CONF, "--workers", str(workers),
+             "--bind", f"127.0.0.1:{port}", "--pythonpath", project_root, "backend.app:app"],
+            cwd=workdir, env=env, stdout=self._log, stderr=subprocess.STDOUT)
+
+    def wait_ready(self, timeout: float = 90):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+                connection.request("GET", "/")
+                if connection.getresponse().status == 200:
+                    return
+            except OSError:
+                time.sleep(0.5)
+        self.stop()
+        raise RuntimeError(f"gunicorn did not start; see {self.log_path}")
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._log.close()
+
+    def read_stats(self, run: str) -> tuple:
+        """(request entries for this run, event-loop blocking reports) from the worker stats files"""
+        requests, blocked = [], []
+        for path in glob.glob(os.path.join(self.stats_dir, "*.jsonl")):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get('event') == 'request' and entry.get('run') == run:
+                        requests.append(entry)
+                    elif entry.get('event') == 'blocked':
+                        blocked.append(entry)
+        return requests, blocked
+
+
+class VirtualUser(threading.Thread):
+    """Runs the upload -> extract -> assess -> roadmap flow in a loop until the deadline"""
+
+    def __init__(self, index: int, port: int, corpus: list, run: str, deadline: float, unique: bool, results: dict):
+        super().__init__(daemon=True)
+        self.index = index
+        self.port = port
+        self.corpus = corpus
+        self.run_id = run
+        self.deadline = deadline
+        self.unique = unique
+        self.results = results
+        self.connection = None
+
+    def _request(self, step: str, method: str, path: str, body: bytes, content_type: str):
+        headers = {'Content-Type': content_type, 'X-Request-Start': f"{time.time():.6f}",
+                   'X-Load-Test-Run': self.run_id}
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=120)
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as e:
+            self.connection = None
+            self.results['errors'][step].append(str(e))
+            return None
+        self.results['latency'][step].append((time.perf_counter() - start) * 1000)
+        if status != 200:
+            self.results['errors'][step].append(f"HTTP {status}")
+            return None
+        return json.loads(payload)
+
+    def _post_json(self, step: str, path: str, payload: dict):
+        return self._request(step, "POST", path, json.dumps(payload).encode(), "application/json")
+
+    def run_flow(self, iteration: int) -> bool:
+        name, text = self.corpus[(self.index + iteration) % len(self.corpus)]
+        role = ROLES[(self.index + iteration) % len(ROLES)]
+        if self.unique:
+            text = f"{text}\nLoad test upload {uuid.uuid4().hex}"
+        body, content_type = encode_multipart("resume", name.replace(".txt", ".docx"), build_docx(text))
+
+        uploaded = self._request("upload", "POST", "/upload-resume", body, content_type)
+        if not uploaded:
+            return False
+        session_id = uploaded['session_id']
+        return bool(self._post_json("extract_skills", "/extract-skills", {'session_id': session_id})
+                    and self._post_json("assess", "/assess-target-role-readiness",
+                                        {'session_id': session_id, 'target_role': role})
+                    and self._post_json("roadmap", "/generate-roadmap", {'session_id': session_id, 'role': role}))
+
+    def run(self):
+        iteration = 0
+        while time.monotonic() < self.deadline:
+            start = time.perf_counter()
+            completed = self.run_flow(iteration)
+            if completed:
+                self.results['flows'].append((time.perf_counter() - start) * 1000)
+            iteration += 1
+
+
+def summarize_blocking(blocked: list) -> dict:
+    where = defaultdict(int)
+    for entry in blocked:
+        where[" | ".join(entry['where'])] += 1
+    return {
+        'reports': len(blocked),
+        'threshold_ms': blocked[0]['threshold_ms'] if blocked else None,
+        'top_locations': sorted(where.items(), key=lambda item: -item[1])[:3],
+    }
+
+
+def run_level(server: GunicornServer, corpus: list, concurrency: int, duration: float, unique: bool) -> dict:
+    run = uuid.uuid4().hex[:12]
+    results = {'latency': defaultdict(list), 'errors': defaultdict(list), 'flows': []}
+    wall_start = time.time()
+    started = time.monotonic()
+    users = [VirtualUser(i, server.port, corpus, run, started + duration, unique, results) for i in range(concurrency)]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - started
+
+    server_requests, blocked = server.read_stats(run)
+    # Monitor reports aren't tagged with a run; keep the ones raised while this level ran
+    blocked = [entry for entry in blocked if wall_start <= entry['time'] <= wall_start + elapsed]
+    responses = sum(len(values) for values in results['latency'].values())
+    errors = sum(len(values) for values in results['errors'].values())
+    # Connection failures get no response, so they add to the attempts
+    attempts = responses + sum(1 for values in results['errors'].values() for e in values if not e.startswith("HTTP"))
+    return {
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'flows_completed': len(results['flows']),
+        'flows_per_s': round(len(results['flows']) / elapsed, 3),
+        'requests_per_s': round(responses / elapsed, 3),
+        'error_rate': round(errors / attempts, 4) if attempts else 0,
+        'errors_by_step': {step: len(values) for step, values in results['errors'].items() if values},
+        'sample_errors': sorted({e for values in results['errors'].values() for e in values})[:5],
+        'flow_latency_ms': percentiles(results['flows']),
+        'step_latency_ms': {step: percentiles(results['latency'][step]) for step in FLOW_STEPS},
+        'queue_delay_ms': percentiles([entry['queue_ms'] for entry in server_requests]),
+        'service_time_ms': percentiles([entry['service_ms'] for entry in server_requests]),
+        'event_loop_blocked': summarize_blocking(blocked),
+    }
+
+
+def find_saturation(levels: list, max_error_rate: float) -> dict:
+    """First level where throughput stops scaling or errors exceed the limit; the level before is sustainable"""
+    previous = None
+    for level in levels:
+        if level['error_rate'] > max_error_rate:
+            return {'saturated_at': level['concurrency'], 'reason': 'error_rate',
+                    'max_sustained_concurrency': previous['concurrency'] if previous else None}
+        if previous and previous['flows_per_s'] > 0:
+            ideal_gain = level['concurrency'] / previous['concurrency'] - 1
+            actual_gain = level['flows_per_s'] / previous['flows_per_s'] - 1
+            if actual_gain < ideal_gain / 2:
+                return {'saturated_at': level['concurrency'], 'reason': 'throughput',
+                        'max_sustained_concurrency': previous['concurrency']}
+        previous = level
+    return {'saturated_at': None, 'reason': None,
+            'max_sustained_concurrency': previous['concurrency'] if previous else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test backend.app:app under gunicorn + gevent with a fake LLM")
+    parser.add_argument('--workers', default="1", help="comma-separated gunicorn worker counts")
+    parser.add_argument('--concurrency', default="1,4,16,64", help="comma-separated virtual user counts")
+    parser.add_argument('--duration', type=float, default=20, help="seconds per concurrency level")
+    parser.add_argument('--latency', type=float, default=0.5, help="mean fake LLM latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="glob of resume text files")
+    parser.add_argument('--reuse-uploads', action='store_true',
+                        help="upload corpus files unchanged (repeat uploads hit the document cache)")
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--keep-workdir', action='store_true', help="keep gunicorn logs and stats files")
+    parser.add_argument('--output', help="results file (default benchmarks/results/load_<time>.json)")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error(f"no resumes match {args.corpus}")
+    worker_counts = [int(value) for value in args.workers.split(',')]
+    concurrency_levels = sorted(int(value) for value in args.concurrency.split(','))
+
+    workdir = tempfile.mkdtemp(prefix="pathfinder-load-")
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_commit': git_commit(),
+            'corpus': {'pattern': args.corpus, 'documents': len(corpus)},
+            'duration_per_level_s': args.duration,
+            'unique_uploads': not args.reuse_uploads,
+            'fake_llm': {'latency': args.latency, 'jitter': args.jitter},
+        },
+        'workers': {}
+    }
+
+    try:
+        for workers in worker_counts:
+            print(f"Starting gunicorn with {workers} gevent worker(s)...")
+            server = GunicornServer(workers, args.port, workdir, args.latency, args.jitter)
+            try:
+                server.wait_ready()
+                # One flow per worker so imports and first-call setup don't count against level 1
+                run_level(server, corpus, workers, 0.1, not args.reuse_uploads)
+                levels = []
+                for concurrency in concurrency_levels:
+                    level = run_level(server, corpus, concurrency, args.duration, not args.reuse_uploads)
+                    levels.append(level)
+                    print(f"  {concurrency:>4} users: {level['flows_per_s']} flows/s, "
+                          f"flow p95 {level['flow_latency_ms'].get('p95')} ms, "
+                          f"queue p95 {level['queue_delay_ms'].get('p95')} ms, "
+                          f"errors {level['error_rate']:.2%}, "
+                          f"loop blocked {level['event_loop_blocked']['reports']}x")
+            finally:
+                server.stop()
+            saturation = find_saturation(levels, args.max_error_rate)
+            results['workers'][str(workers)] = {'levels': levels, 'saturation': saturation}
+            print(f"  saturation: {saturation}")
+    finally:
+        if args.keep_workdir:
+            print(f"gunicorn logs and stats kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+Offline pipeline benchmarks
+
+Runs every stage below over the backend/uploads/session_*.txt resume corpus
+with the Gemini client replaced by benchmarks.fake_llm.FakeChatModel, then
+writes latency percentiles, throughput, LLM calls, tokens, retries, estimated
+cost and allocations per stage to a JSON file. No network access is needed.
+
+    python -m benchmarks.run_benchmarks --iterations 3 --latency 0.5 --jitter 0.1
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<earlier>.json
+
+Caches (skill extraction, gap analysis, roadmaps, per-document artifacts) are
+cleared before every operation so each run measures the cold path; pass --warm
+to keep them. Pipeline settings (SKILL_EXTRACTOR, ROADMAP_SOURCE, ...) come
+from the environment as usual and are recorded in the results.
+"""
+
+import os
+import sys
+import json
+import glob
+import shutil
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+from collections import defaultdict
+
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+
+from agents.llm_client import llm_pool
+from benchmarks.fake_llm import install_fake_llm, load_recordings
+
+DEFAULT_CORPUS = os.path.join(project_root, "backend", "uploads", "session_*.txt")
+RESULTS_DIR = os.path.join(project_root, "benchmarks", "results")
+
+
+def percentiles(values) -> dict:
+    if not values:
+        return {}
+    values = np.asarray(values, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50': round(float(p50), 3), 'p95': round(float(p95), 3), 'p99': round(float(p99), 3),
+            'mean': round(float(values.mean()), 3), 'max': round(float(values.max()), 3)}
+
+
+def load_corpus(pattern: str) -> list:
+    documents = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        if text.strip():
+            documents.append((os.path.basename(path), text))
+    return documents
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+class BenchmarkRunner:
+    """Pipeline stages and Flask routes as callables over (resume text, role)"""
+
+    def __init__(self, warm: bool = False):
+        self.workdir = tempfile.mkdtemp(prefix="pathfinder-bench-")
+        # Set before the app is imported, so its uploads, document registry and log store
+        # are created in the work directory instead of backend/uploads and the CWD
+        os.environ["UPLOADS_DIR"] = os.path.join(self.workdir, "uploads")
+        os.environ["LOG_FILE"] = os.path.join(self.workdir, "logs.db")
+
+        # Imported here so the fake client is installed before anything builds one
+        from agents import career_pathfinder_optimized as pipeline
+        from backend import app as web
+        from backend.session_store import SessionStore, DiskSessionBackend
+
+        self.pipeline = pipeline
+        self.warm = warm
+        # No document registry: repeat uploads of a corpus resume must not be served stored results
+        web.sessions = SessionStore(DiskSessionBackend(os.path.join(self.workdir, "sessions")))
+        self.web = web
+        self.client = web.app.test_client()
+        self.roles = sorted(pipeline.JOB_ROLES_DATA)
+
+        self.stages = {
+            'extract_skills': lambda text, role: pipeline.extract_skills_only(text),
+            'pipeline_sequential': lambda text, role: pipeline.run_pipeline_optimized(text, role, parallel=False),
+            'pipeline_parallel': lambda text, role: pipeline.run_pipeline_optimized(text, role, parallel=True),
+            'pipeline_stream': lambda text, role: list(pipeline.stream_pipeline_optimized(text, role)),
+            'route_extract_skills': self._route_extract_skills,
+            'route_generate_roadmap': self._route_generate_roadmap,
+            'route_generate_roadmap_stream': self._route_generate_roadmap_stream,
+        }
+
+    def reset_caches(self):
+        if self.warm:
+            return
+        self.pipeline.skill_cache.memory.clear()
+        self.pipeline.gap_engine.cache.clear()
+        self.pipeline.roadmap_cache.clear()
+
+    def _post(self, path: str, payload: dict):
+        response = self.client.post(path, json=payload)
+        response.get_data()
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+        return response
+
+    def _route_extract_skills(self, text, role):
+        return self._post('/extract-skills', {'session_id': self.web.sessions.create(text)})
+
+    def _route_generate_roadmap(self, text, role):
+        return self._post('/generate-roadmap', {'session_id': self.web.sessions.create(text), 'role': role})
+
+    def _route_generate_roadmap_stream(self, text, role):
+        return self._post('/generate-roadmap/stream?format=ndjson',
+                          {'session_id': self.web.sessions.create(text), 'role': role})
+
+    def _operations(self, corpus, iterations):
+        for _ in range(iterations):
+            for i, (name, text) in enumerate(corpus):
+                yield text, self.roles[i % len(self.roles)]
+
+    def run_stage(self, name: str, corpus: list, iterations: int, fake) -> dict:
+        stage = self.stages[name]
+        latencies, errors = [], 0
+        step_timings = defaultdict(list)
+        calls_before = fake.calls
+        pool_before = llm_pool.get_stats()
+
+        started = time.perf_counter()
+        for text, role in self._operations(corpus, iterations):
+            self.reset_caches()
+            op_start = time.perf_counter()
+            try:
+                result = stage(text, role)
+            except Exception as e:
+                print(f"Benchmark {name} error: {e}")
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - op_start) * 1000)
+            if isinstance(result, list):
+                # Streamed events; the last one is the performance report
+                summary = result[-1][1] if result and result[-1][0] == 'performance' else None
+            else:
+                summary = result.get('performance_summary') if isinstance(result, dict) else None
+            for step, seconds in ((summary or {}).get('step_timings') or {}).items():
+                step_timings[step].append(seconds * 1000)
+        elapsed = time.perf_counter() - started
+
+        operations = len(latencies) + errors
+        return {
+            'operations': operations,
+            'errors': errors,
+            'latency_ms': percentiles(latencies),
+            'throughput_per_s': round(len(latencies) / elapsed, 3) if elapsed else 0,
+            'llm_calls_per_op': round((fake.calls - calls_before) / operations, 3) if operations else 0,
+            'llm_usage_per_op': self._llm_usage_per_op(pool_before, llm_pool.get_stats(), operations),
+            'step_timings_ms': {step: percentiles(values) for step, values in sorted(step_timings.items())},
+        }
+
+    @staticmethod
+    def _llm_usage_per_op(before: dict, after: dict, operations: int) -> dict:
+        """Tokens, retries and estimated cost per operation from llm_pool's running totals"""
+        if not operations:
+            return {}
+        return {key: round((after[key] - before[key]) / operations, 8 if key == 'estimated_cost_usd' else 3)
+                for key in ('input_tokens', 'output_tokens', 'retries', 'errors', 'estimated_cost_usd')}
+
+    def measure_allocations(self, name: str, corpus: list, fake) -> dict:
+        """Peak and retained traced memory per operation, one pass over the corpus with zero LLM latency"""
+        stage = self.stages[name]
+        saved = fake.latency, fake.jitter, fake.error_rate
+        fake.latency, fake.jitter, fake.error_rate = 0.0, 0.0, 0.0
+        peaks, retained = [], []
+        tracemalloc.start()
+        try:
+            for text, role in self._operations(corpus, 1):
+                self.reset_caches()
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                try:
+                    stage(text, role)
+                except Exception as e:
+                    print(f"Benchmark {name} allocation pass error: {e}")
+                    continue
+                current, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+                retained.append(current - before)
+        finally:
+            tracemalloc.stop()
+            fake.latency, fake.jitter, fake.error_rate = saved
+        return {'peak_bytes': percentiles(peaks), 'retained_bytes': percentiles(retained)}
+
+
+def compare_results(baseline: dict, current: dict):
+    """Print p50/p95 latency and throughput change per stage against an earlier run"""
+    print(f"\n{'stage':32} {'p50 ms':>18} {'p95 ms':>18} {'ops/s':>16}")
+    for name, stats in current['stages'].items():
+        before = baseline.get('stages', {}).get(name)
+        if not before:
+            continue
+        cells = []
+        for old, new in ((before['latency_ms'].get('p50'), stats['latency_ms'].get('p50')),
+                         (before['latency_ms'].get('p95'), stats['latency_ms'].get('p95')),
+                         (before['throughput_per_s'], stats['throughput_per_s'])):
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            cells.append(f"{new} ({change})")
+        print(f"{name:32} {cells[0]:>18} {cells[1]:>18} {cells[2]:>16}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the career pathfinder pipeline")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="glob of resume text files")
+    parser.add_argument('--iterations', type=int, default=3, help="passes over the corpus per stage")
+    parser.add_argument('--stages', help="comma-separated subset of stages")
+    parser.add_argument('--latency', type=float, default=0.5, help="mean fake LLM latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.1, help="+/- seconds around --latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of fake LLM calls failing with a 429")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--recordings', help="JSON of recorded responses keyed by prompt sha256")
+    parser.add_argument('--warm', action='store_true', help="keep caches between operations")
+    parser.add_argument('--no-alloc', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--output', help="results file (default benchmarks/results/bench_<time>.json)")
+    parser.add_argument('--compare', help="earlier results file to diff against")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error(f"no resumes match {args.corpus}")
+
+    fake = install_fake_llm(recordings=load_recordings(args.recordings), latency=args.latency,
+                            jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+    runner = BenchmarkRunner(warm=args.warm)
+    stage_names = args.stages.split(',') if args.stages else list(runner.stages)
+    unknown = [name for name in stage_names if name not in runner.stages]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)} (choose from {', '.join(runner.stages)})")
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'corpus': {'pattern': args.corpus, 'documents': len(corpus),
+                       'characters': sum(len(text) for _, text in corpus)},
+            'iterations': args.iterations,
+            'warm': args.warm,
+            'fake_llm': {'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate, 'seed': args.seed,
+                         'recordings': args.recordings},
+            'performance_config': dict(runner.pipeline.PERFORMANCE_CONFIG),
+        },
+        'stages': {}
+    }
+
+    try:
+        for name in stage_names:
+            print(f"Benchmarking {name} ({len(corpus) * args.iterations} operations)...")
+            stats = runner.run_stage(name, corpus, args.iterations, fake)
+            if not args.no_alloc:
+                stats['allocations'] = runner.measure_allocations(name, corpus, fake)
+            results['stages'][name] = stats
+            latency = stats['latency_ms']
+            print(f"  p50 {latency.get('p50')} ms  p95 {latency.get('p95')} ms  p99 {latency.get('p99')} ms  "
+                  f"{stats['throughput_per_s']} ops/s  {stats['llm_calls_per_op']} LLM calls/op  {stats['errors']} errors")
+    finally:
+        # Flush the app's log store while its files still exist
+        runner.web.logger.close()
+        shutil.rmtree(runner.workdir, ignore_errors=True)
+    results['meta']['recorded_responses_used'] = fake.recorded_hits
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare_results(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
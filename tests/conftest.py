@@ -0,0 +1,7 @@
+"""Shared pytest setup: the tests import agents/ and backend/ from the project root"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test")
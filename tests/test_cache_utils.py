@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from agents.cache_utils import LRUCache, ResponseCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_lru_ttl_expiry_counts_a_miss():
+    cache = LRUCache(maxsize=4, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a", "gone") == "gone"
+    assert len(cache) == 0
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_lru_pop_and_clear():
+    cache = LRUCache()
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "missing") == "missing"
+    cache.set("b", 2)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_response_cache_miss_then_hit():
+    cache = ResponseCache(ttl=60)
+    assert cache.get_or_compute("k", lambda: "v") == ("v", "miss")
+    assert cache.get_or_compute("k", lambda: "other") == ("v", "hit")
+
+
+def test_response_cache_does_not_store_uncacheable_results():
+    cache = ResponseCache(ttl=60)
+    assert cache.get_or_compute("k", lambda: None, cacheable=lambda v: v is not None) == (None, "miss")
+    assert cache.get("k") == (None, None)
+
+
+def test_response_cache_propagates_compute_errors():
+    cache = ResponseCache(ttl=60)
+
+    def fail():
+        raise RuntimeError("backend down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", fail)
+    assert cache.get_or_compute("k", lambda: "v") == ("v", "miss")
+
+
+def test_response_cache_coalesces_concurrent_misses():
+    cache = ResponseCache(ttl=60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return "v"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+    leader.start()
+    started.wait(2)
+    follower = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+    follower.start()
+    while cache.coalesced == 0:
+        time.sleep(0.001)
+    release.set()
+    leader.join(2)
+    follower.join(2)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("v", "coalesced"), ("v", "miss")]
+
+
+def test_response_cache_serves_stale_and_refreshes_in_background():
+    cache = ResponseCache(ttl=0.05, stale_ttl=60)
+    cache.set("k", "old")
+    time.sleep(0.06)
+    refreshed = threading.Event()
+
+    def compute():
+        refreshed.set()
+        return "new"
+
+    assert cache.get_or_compute("k", compute) == ("old", "stale")
+    assert refreshed.wait(2)
+    deadline = time.monotonic() + 2
+    while cache.get("k")[0] != "new" and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert cache.get("k") == ("new", "hit")
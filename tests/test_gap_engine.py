@@ -0,0 +1,51 @@
+from agents.gap_engine import GapEngine, canonical_skill_set
+
+JOB_ROLES = {
+    "Data Scientist": ["Python", "Machine Learning", "Scikit-Learn", "SQL"],
+    "DevOps Engineer": ["Docker", "Kubernetes", "Linux"],
+}
+
+
+def test_canonical_skill_set_ignores_spelling_and_blanks():
+    assert canonical_skill_set(["Python", " python ", "", None]) == canonical_skill_set(["PYTHON"])
+
+
+def test_resolve_role_accepts_catalog_key_and_slug():
+    engine = GapEngine(JOB_ROLES)
+    assert engine.resolve_role("Data Scientist") == "Data Scientist"
+    assert engine.resolve_role("data-scientist") == "Data Scientist"
+    assert engine.resolve_role("astronaut") is None
+    assert engine.resolve_role(None) is None
+
+
+def test_missing_skills_keep_catalog_order_and_spelling():
+    engine = GapEngine(JOB_ROLES)
+    missing = engine.compute_missing_skills(["sklearn", "python"], JOB_ROLES["Data Scientist"])
+    assert missing == ["Machine Learning", "SQL"]
+
+
+def test_analyze_memoizes_on_canonical_skill_set():
+    engine = GapEngine(JOB_ROLES)
+    result, from_cache = engine.analyze(["Docker"], "devops-engineer")
+    assert result == {"missing_skills": ["Kubernetes", "Linux"], "nice_to_have": []}
+    assert not from_cache
+    assert engine.analyze(["docker"], "DevOps Engineer") == (result, True)
+
+
+def test_analyze_enrichment_is_cached_separately():
+    engine = GapEngine(JOB_ROLES)
+    calls = []
+
+    def enrich(user_skills, missing, role):
+        calls.append(role)
+        return ["Terraform"]
+
+    engine.analyze(["Docker"], "DevOps Engineer")
+    result, from_cache = engine.analyze(["Docker"], "DevOps Engineer", enrich=enrich)
+    assert result["nice_to_have"] == ["Terraform"] and not from_cache
+    assert engine.analyze(["Docker"], "DevOps Engineer", enrich=enrich)[1]
+    assert calls == ["DevOps Engineer"]
+
+
+def test_analyze_unknown_role_falls_back():
+    assert GapEngine(JOB_ROLES).analyze(["Python"], "Astronaut") == (None, False)
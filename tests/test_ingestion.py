@@ -0,0 +1,41 @@
+import io
+import pickle
+
+import pytest
+
+from backend.ingestion import IngestionError, extract_resume_text, read_upload
+
+
+def test_read_upload_joins_chunks():
+    assert read_upload(io.BytesIO(b"x" * 100), max_bytes=100, chunk_size=7) == b"x" * 100
+
+
+def test_read_upload_rejects_oversized_stream():
+    with pytest.raises(IngestionError) as excinfo:
+        read_upload(io.BytesIO(b"x" * 101), max_bytes=100, chunk_size=7)
+    assert excinfo.value.status_code == 413
+
+
+def test_ingestion_error_survives_pickling():
+    error = pickle.loads(pickle.dumps(IngestionError("too large", 413)))
+    assert (str(error), error.status_code) == ("too large", 413)
+
+
+@pytest.mark.parametrize("data, filename", [
+    (b"plain text", "resume.txt"),
+    (b"not a pdf", "resume.pdf"),
+    (b"not a docx", "Resume.DOCX"),
+])
+def test_extract_resume_text_rejects_bad_input(data, filename):
+    with pytest.raises(IngestionError) as excinfo:
+        extract_resume_text(data, filename)
+    assert excinfo.value.status_code == 400
+
+
+def test_extract_docx_text():
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph("Skills: Python, SQL")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    assert "Python, SQL" in extract_resume_text(buffer.getvalue(), "resume.docx")
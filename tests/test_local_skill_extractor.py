@@ -0,0 +1,18 @@
+from agents.local_skill_extractor import LocalSkillExtractor
+from agents.skill_normalizer import SkillNormalizer
+
+
+def make_extractor():
+    normalizer = SkillNormalizer(aliases={"node": "Node.js", "sklearn": "Scikit-Learn"})
+    normalizer.add_vocabulary(["Machine Learning", "Learning", "Python", "Go", "Node.js", "Scikit-Learn"])
+    return LocalSkillExtractor(normalizer)
+
+
+def test_longest_match_in_order_of_first_mention():
+    text = "Built Machine Learning models in Python with sklearn. More python later."
+    assert make_extractor().extract(text) == ["machine-learning", "python", "scikit-learn"]
+
+
+def test_common_words_and_ambiguous_aliases_are_not_skills():
+    assert make_extractor().extract("Ready to go, I node along") == []
+    assert make_extractor().extract("Backend in Go and Node.js") == ["go", "node.js"]
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from agents.log_store import JsonLinesLogStore, SQLiteLogStore
+
+
+def make_entry(i, role="Data Scientist"):
+    return {
+        "timestamp": f"2026-01-01T00:00:{i:02d}",
+        "input": {"target_role": role},
+        "output": {"extracted_skills": ["python"] * (i % 3), "missing_skills": ["sql"]},
+        "execution_time_seconds": 1.0,
+    }
+
+
+def records(entries):
+    return [(entry, json.dumps(entry)) for entry in entries]
+
+
+@pytest.fixture(params=["jsonl", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "jsonl":
+        yield JsonLinesLogStore(tmp_path / "logs.jsonl")
+    else:
+        store = SQLiteLogStore(tmp_path / "logs.db")
+        yield store
+        store.close()
+
+
+def test_get_recent_returns_newest_in_order(store):
+    assert store.is_empty()
+    store.append_many(records(make_entry(i) for i in range(10)))
+    assert not store.is_empty()
+    assert [e["timestamp"][-2:] for e in store.get_recent(3)] == ["07", "08", "09"]
+    assert len(store.get_recent(50)) == 10
+
+
+@pytest.mark.parametrize("count", [0, -1])
+def test_get_recent_non_positive_count_is_empty(store, count):
+    store.append_many(records([make_entry(1)]))
+    assert store.get_recent(count) == []
+
+
+def test_query_filters_by_role_and_pages_with_cursor(store):
+    store.append_many(records(make_entry(i, "Data Scientist" if i % 2 else "Web Developer") for i in range(10)))
+    page = store.query(target_role="data scientist", limit=3)
+    assert [e["timestamp"][-2:] for e in page["logs"]] == ["01", "03", "05"]
+    assert all(e["input"]["target_role"] == "Data Scientist" for e in page["logs"])
+    rest = store.query(target_role="data scientist", limit=10, cursor=page["next_cursor"])
+    assert len(page["logs"]) + len(rest["logs"]) == 5
+    assert rest["next_cursor"] is None
+
+
+def test_summary_stats(store):
+    assert store.get_summary_stats() == {"total_executions": 0}
+    store.append_many(records([make_entry(1), make_entry(2), make_entry(3, "Web Developer")]))
+    stats = store.get_summary_stats()
+    assert stats["total_executions"] == 3
+    assert stats["most_common_target_role"] == "Data Scientist"
+    assert stats["average_missing_skills"] == 1
+    assert stats["date_range"]["first_execution"].endswith("01")
+
+
+def test_jsonl_skips_corrupt_lines(tmp_path):
+    store = JsonLinesLogStore(tmp_path / "logs.jsonl")
+    store.append_many(records([make_entry(1), make_entry(2)]))
+    with open(store.log_file, "ab") as f:
+        f.write(b'{"timestamp": "half-writ\n')
+    store.append_many(records([make_entry(3)]))
+
+    assert [e["timestamp"][-2:] for e in store.get_recent(3)] == ["01", "02", "03"]
+    assert len(list(store.iter_logs())) == 3
+
+
+def test_jsonl_rotation_keeps_recent_entries_readable(tmp_path):
+    store = JsonLinesLogStore(tmp_path / "logs.jsonl", max_bytes=600, backup_count=2)
+    for i in range(12):
+        store.append_many(records([make_entry(i)]))
+    assert (tmp_path / "logs.jsonl.1").exists()
+    assert [e["timestamp"][-2:] for e in store.get_recent(4)] == ["08", "09", "10", "11"]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from agents.readiness_matrix import RoleRequirementMatrix
+from agents.role_readiness_agent import RequiredSkill, SkillImportance, UserSkill
+
+MUST, NICE = SkillImportance.MUST, SkillImportance.NICE
+
+CATALOG = {
+    "Backend": [RequiredSkill("python", 3, MUST), RequiredSkill("sql", 2, NICE)],
+    "Frontend": [RequiredSkill("javascript", 3, MUST), RequiredSkill("css", 2, MUST)],
+    "Fullstack": [RequiredSkill("python", 2, NICE), RequiredSkill("javascript", 2, NICE)],
+}
+
+
+def reference_score(requirements, user_skills):
+    levels = {s.skill: s.level for s in user_skills}
+    weights = {MUST: 1.2, NICE: 1.0}
+    total = sum(weights[r.importance] for r in requirements)
+    return sum(weights[r.importance] * min(levels.get(r.skill, 0) / r.target_level, 1)
+               for r in requirements) / total
+
+
+def test_score_matches_the_per_role_formula():
+    matrix = RoleRequirementMatrix(CATALOG)
+    user = [UserSkill("python", 2), UserSkill("sql", 3), UserSkill("rust", 3)]
+    expected = [reference_score(reqs, user) for reqs in CATALOG.values()]
+    assert matrix.score(user) == pytest.approx(expected)
+
+
+def test_skill_vector_drops_skills_no_role_requires():
+    matrix = RoleRequirementMatrix(CATALOG)
+    vector = matrix.skill_vector([UserSkill("rust", 3), UserSkill("css", 1)])
+    assert vector.sum() == 1 and vector[matrix.vocabulary["css"]] == 1
+
+
+def test_score_batch_rows_equal_single_scores():
+    matrix = RoleRequirementMatrix(CATALOG)
+    users = [[UserSkill("python", 3)], [UserSkill("javascript", 1), UserSkill("css", 2)], []]
+    batch = matrix.score_batch(np.stack([matrix.skill_vector(u) for u in users]))
+    assert batch.shape == (3, 3)
+    for row, user in zip(batch, users):
+        assert row == pytest.approx(matrix.score(user))
+
+
+def test_top_k_breaks_ties_by_catalog_order():
+    matrix = RoleRequirementMatrix(CATALOG)
+    assert matrix.top_k(np.array([0.5, 0.9, 0.5]), k=2) == [1, 0]
+    assert matrix.top_k(np.array([0.5004, 0.5001, 0.1]), k=1) == [0]
+    assert matrix.top_k(np.array([0.2, 0.2001, 0.1]), k=5) == [0, 1, 2]
+    assert matrix.top_k(np.array([0.2, 0.3, 0.1]), k=0) == []
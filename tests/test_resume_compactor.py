@@ -0,0 +1,88 @@
+import pytest
+
+from agents.local_skill_extractor import LocalSkillExtractor
+from agents.resume_compactor import (
+    ResumeCompactor, Section, estimate_tokens, normalize_whitespace, split_sections, strip_contact_details
+)
+from agents.skill_normalizer import SkillNormalizer
+
+RESUME = """Jane Doe | jane.doe@example.com | +91 98765 43210 | linkedin.com/in/janedoe
+GitHub: Repository
+
+SUMMARY
+Data engineer focused on pipelines.
+
+Technical Skills: Python, SQL, Apache Spark, Docker
+
+Experience
+Built ETL jobs in Python and SQL at Acme (2021 - 2024).
+Awards for excellence in data quality were received twice.
+
+Hobbies
+Chess, hiking and Python puzzles.
+
+References available upon request.
+"""
+
+
+@pytest.fixture
+def compactor():
+    normalizer = SkillNormalizer(aliases={})
+    normalizer.add_vocabulary(["Python", "SQL", "Apache Spark", "Docker"])
+    return ResumeCompactor(token_budget=1500, extractor=LocalSkillExtractor(normalizer))
+
+
+def test_normalize_whitespace_rejoins_hyphenated_words():
+    assert normalize_whitespace("data engi-\r\n  neering\n\n  pipelines") == "data engineering pipelines"
+
+
+def test_strip_contact_details_keeps_dates():
+    text = strip_contact_details("jane@example.com | +1 (555) 123-4567 | 2021 - 2024 | www.janedoe.dev")
+    assert "@" not in text and "555" not in text and "janedoe" not in text
+    assert "2021 - 2024" in text
+
+
+def test_strip_contact_details_keeps_dates_and_lines():
+    text = strip_contact_details("jane@example.com +1 (555) 123-4567\n2021 - 2024 www.janedoe.dev")
+    assert "@" not in text and "555" not in text and "janedoe" not in text
+    assert "2021 - 2024" in text and "\n" in text
+
+
+def test_split_sections_at_headings_only():
+    sections = split_sections(strip_contact_details(RESUME))
+    assert [s.heading for s in sections] == ["header", "summary", "technical skills", "experience", "hobbies"]
+    # "Awards for ..." is prose inside Experience, not a section of its own
+    assert "Awards for excellence" in dict(sections)["experience"]
+
+
+def test_split_sections_ignores_lowercase_and_mid_line_words():
+    text = "Profile\nI have strong skills in teamwork and professional experience with clients.\n"
+    assert split_sections(text) == [Section("profile", text.split("\n", 1)[1].strip())]
+
+
+def test_compact_drops_contact_details_and_dropped_sections(compactor):
+    result = compactor.compact(RESUME)
+    assert "jane.doe@example.com" not in result and "98765" not in result and "linkedin" not in result.lower()
+    assert "Chess" not in result and "References" not in result
+    assert result.startswith("Jane Doe")
+    assert "Technical Skills: Python, SQL, Apache Spark, Docker" in result
+    assert "Awards for excellence" in result
+
+
+def test_compact_keeps_prose_without_known_skills(compactor):
+    assert "Data engineer focused on pipelines." in compactor.compact(RESUME)
+
+
+def test_compact_prefers_skill_dense_sections_under_a_tight_budget(compactor):
+    result = compactor.compact(RESUME, token_budget=20)
+    assert estimate_tokens(result) <= 20
+    assert "Technical Skills" in result and "Summary" not in result
+
+
+def test_zero_budget_is_respected(compactor):
+    assert compactor.compact(RESUME, token_budget=0) == ""
+
+
+def test_text_without_headings_is_kept_whole(compactor):
+    text = "Python   developer\nwith SQL experience."
+    assert compactor.compact(text) == "Python developer with SQL experience."
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+from backend.resume_registry import ResumeRegistry, simhash, text_fingerprint
+
+RESUME = " ".join(f"word{i}" for i in range(120))
+
+
+def test_fingerprint_ignores_whitespace_and_case():
+    assert text_fingerprint("Python  Developer\n") == text_fingerprint("python developer")
+    assert text_fingerprint("python developer") != text_fingerprint("java developer")
+
+
+def test_simhash_is_close_for_small_edits():
+    edited = RESUME.replace("word60", "changed")
+    assert bin(simhash(RESUME) ^ simhash(edited)).count("1") <= 3
+    assert bin(simhash(RESUME) ^ simhash("completely different text " * 40)).count("1") > 3
+
+
+def test_exact_mode(tmp_path):
+    registry = ResumeRegistry(str(tmp_path / "documents.db"), mode="exact")
+    doc_id = registry.resolve(RESUME)
+    assert registry.resolve("  " + RESUME.upper()) == doc_id
+    assert registry.resolve(RESUME.replace("word60", "changed")) != doc_id
+    assert registry.get_stats()["exact_hits"] == 1
+    # Exact mode never computes SimHashes, so nothing is indexed for near lookups
+    assert registry._conn.execute("SELECT COUNT(*) FROM simhash_bands").fetchone()[0] == 0
+
+
+def test_near_mode_maps_edits_to_the_same_document(tmp_path):
+    registry = ResumeRegistry(str(tmp_path / "documents.db"), mode="near")
+    doc_id = registry.resolve(RESUME)
+    assert registry.resolve(RESUME.replace("word60", "changed")) == doc_id
+    assert registry.near_hits == 1
+    # Short texts are never near-matched
+    assert registry.resolve("word1 word2 word3 word4") != registry.resolve("word1 word2 word3 word5")
+
+
+def test_off_mode_and_invalid_settings(tmp_path):
+    assert ResumeRegistry(str(tmp_path / "a.db"), mode="off").resolve(RESUME) is None
+    with pytest.raises(ValueError):
+        ResumeRegistry(str(tmp_path / "b.db"), mode="fuzzy")
+    with pytest.raises(ValueError):
+        ResumeRegistry(str(tmp_path / "c.db"), max_distance=4)
+
+
+def test_artifacts_and_purge(tmp_path):
+    registry = ResumeRegistry(str(tmp_path / "documents.db"))
+    doc_id = registry.resolve(RESUME)
+    registry.set_artifact(doc_id, "skills", ["python"])
+    registry.set_artifact("unknown", "skills", ["ignored"])
+    assert registry.get_artifact(doc_id, "skills") == ["python"]
+    assert registry.get_artifacts("unknown") == {}
+
+    assert registry.purge_older_than(time.time() - 60) == 0
+    assert registry.purge_older_than(time.time() + 60) == 1
+    assert registry.get_artifacts(doc_id) == {}
+    assert registry.get_stats()["documents"] == 0
@@ -0,0 +1,95 @@
+import os
+import time
+
+import pytest
+
+from backend.resume_registry import ResumeRegistry
+from backend.session_store import DiskSessionBackend, SessionStore, SQLiteSessionBackend
+
+
+@pytest.fixture(params=["disk", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "disk":
+        return DiskSessionBackend(str(tmp_path / "sessions"), legacy_directory=str(tmp_path))
+    return SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+
+
+def test_create_load_and_artifacts(backend):
+    store = SessionStore(backend)
+    session_id = store.create("resume text")
+    assert store.is_valid_id(session_id)
+    assert store.get_text(session_id) == "resume text"
+    store.set_artifact(session_id, "skills", ["python"])
+
+    fresh = SessionStore(backend)  # bypasses the LRU, reads the backing tier
+    assert fresh.get_text(session_id) == "resume text"
+    assert fresh.get_artifact(session_id, "skills") == ["python"]
+    assert fresh.get_artifact(session_id, "roadmap", "none") == "none"
+
+
+def test_invalid_and_deleted_ids(backend):
+    store = SessionStore(backend)
+    assert not store.exists("../etc/passwd")
+    session_id = store.create("text")
+    store.delete(session_id)
+    assert store.get_text(session_id) is None
+
+
+def test_expired_sessions_are_not_served(backend):
+    store = SessionStore(backend, ttl=3600)
+    session_id = f"session_{'a' * 32}"
+    backend.save(session_id, "old", time.time() - 7200)
+    if isinstance(backend, DiskSessionBackend):
+        path = os.path.join(backend.directory, f"{session_id}.txt")
+        os.utime(path, (time.time() - 7200,) * 2)
+    assert store.get_text(session_id) is None
+
+
+def test_purge_removes_only_expired_sessions(backend):
+    old = time.time() - 7200
+    backend.save("session_expired", "gone", old)
+    if isinstance(backend, DiskSessionBackend):
+        os.utime(os.path.join(backend.directory, "session_expired.txt"), (old, old))
+    backend.save("session_fresh", "kept", time.time())
+
+    assert backend.purge_older_than(time.time() - 3600) == 1
+    assert backend.load("session_expired") is None
+    assert backend.load("session_fresh")["text"] == "kept"
+
+
+def test_artifacts_are_shared_across_uploads_of_the_same_resume(backend, tmp_path):
+    store = SessionStore(backend, documents=ResumeRegistry(str(tmp_path / "documents.db")))
+    first = store.create("Python developer")
+    store.set_artifact(first, "skills", ["python"])
+    second = store.create("  python   DEVELOPER ")
+    assert store.get_document_id(second) == store.get_document_id(first)
+    assert store.get_artifact(second, "skills") == ["python"]
+    assert store.get_artifact(store.create("Java developer"), "skills") is None
+
+
+def test_disk_purge_leaves_legacy_directory_alone(tmp_path):
+    backend = DiskSessionBackend(str(tmp_path / "sessions"), legacy_directory=str(tmp_path))
+    old = time.time() - 7200
+    legacy_session = tmp_path / "session_legacy.txt"
+    corpus_file = tmp_path / "corpus_resume.txt"
+    for path in (legacy_session, corpus_file):
+        path.write_text("kept")
+        os.utime(path, (old, old))
+    backend.save("session_expired", "gone", old)
+    os.utime(tmp_path / "sessions" / "session_expired.txt", (old, old))
+    backend.save("session_fresh", "kept", time.time())
+
+    assert backend.purge_older_than(time.time() - 3600) == 1
+    assert legacy_session.exists() and corpus_file.exists()
+    assert not (tmp_path / "sessions" / "session_expired.txt").exists()
+    assert (tmp_path / "sessions" / "session_fresh.txt").exists()
+
+
+def test_disk_reads_legacy_sessions_but_writes_its_own_directory(tmp_path):
+    (tmp_path / "session_legacy.txt").write_text("legacy text")
+    backend = DiskSessionBackend(str(tmp_path / "sessions"), legacy_directory=str(tmp_path))
+    store = SessionStore(backend)
+    assert store.get_text("session_legacy") == "legacy text"
+    store.set_artifact("session_legacy", "skills", ["sql"])
+    assert (tmp_path / "sessions" / "session_legacy.artifacts.json").exists()
+    assert not (tmp_path / "session_legacy.artifacts.json").exists()
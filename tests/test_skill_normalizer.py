@@ -0,0 +1,53 @@
+from agents.skill_normalizer import SkillNormalizer, _bounded_levenshtein, basic_key, compact_key
+
+
+def make_normalizer():
+    normalizer = SkillNormalizer(aliases={"sklearn": "Scikit-Learn", "js": "JavaScript"})
+    normalizer.add_vocabulary(["Scikit-Learn", "JavaScript", "Kubernetes", "Machine Learning", "SQL"])
+    return normalizer
+
+
+def test_keys():
+    assert basic_key("  Machine   Learning ") == "machine-learning"
+    assert compact_key("Scikit_Learn") == compact_key("scikit learn") == compact_key("ScikitLearn")
+
+
+def test_bounded_levenshtein_stops_past_the_limit():
+    assert _bounded_levenshtein("kubernetes", "kubernetse", 2) == 2
+    assert _bounded_levenshtein("python", "pandas", 1) == 2
+
+
+def test_alias_and_spelling_variants_share_a_canonical_name():
+    normalizer = make_normalizer()
+    assert normalizer.normalize("sklearn") == "scikit-learn"
+    assert normalizer.normalize("Scikit Learn") == "scikit-learn"
+    assert normalizer.normalize("JS") == "javascript"
+
+
+def test_fuzzy_match_only_for_long_enough_names():
+    normalizer = make_normalizer()
+    assert normalizer.normalize("Kubernetse") == "kubernetes"
+    assert normalizer.get_stats()["fuzzy_matches"] == 1
+    assert normalizer.normalize("SQK") == "sqk"  # below min_fuzzy_length
+
+
+def test_resolve_exact_never_guesses():
+    normalizer = make_normalizer()
+    assert normalizer.resolve_exact("machine learning") == "machine-learning"
+    assert normalizer.resolve_exact("Kubernetse") is None
+
+
+def test_unknown_skill_keeps_its_basic_key():
+    assert make_normalizer().normalize("  Quantum Basket Weaving ") == "quantum-basket-weaving"
+
+
+def test_normalize_many_dedupes_and_drops_blanks():
+    names = ["sklearn", "Scikit Learn", "", "   ", None, "SQL"]
+    assert make_normalizer().normalize_many(names) == ["scikit-learn", "sql"]
+
+
+def test_add_alias_invalidates_memo():
+    normalizer = make_normalizer()
+    assert normalizer.normalize("k8s") == "k8s"
+    normalizer.add_alias("k8s", "Kubernetes")
+    assert normalizer.normalize("k8s") == "kubernetes"
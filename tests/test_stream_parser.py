@@ -0,0 +1,37 @@
+import json
+
+from agents.stream_parser import RoadmapStreamParser
+
+PHASES = [
+    {"phase": 1, "title": "Basics {braces} and \"quotes\"", "skills": ["python"]},
+    {"phase": 2, "title": "Nested", "resources": [{"name": "Course \\ one"}]},
+]
+RESPONSE = json.dumps({"target_role": "Data Scientist", "roadmap": PHASES, "notes": "{not an item}"})
+
+
+def test_items_are_returned_as_soon_as_they_complete():
+    parser = RoadmapStreamParser()
+    first_end = RESPONSE.index('"skills": ["python"]}') + len('"skills": ["python"]}')
+    assert parser.feed(RESPONSE[:first_end - 1]) == []
+    assert parser.feed(RESPONSE[first_end - 1:first_end]) == [PHASES[0]]
+    assert parser.feed(RESPONSE[first_end:]) == [PHASES[1]]
+    assert parser.done
+    assert parser.items == PHASES
+
+
+def test_one_character_chunks():
+    parser = RoadmapStreamParser()
+    items = [item for ch in RESPONSE for item in parser.feed(ch)]
+    assert items == PHASES and parser.done
+
+
+def test_text_before_the_key_and_custom_key():
+    parser = RoadmapStreamParser(array_key="phases")
+    text = 'Sure, here it is: ```json\n{"phases": [{"a": 1}]}```'
+    assert parser.feed(text[:15]) == []
+    assert parser.feed(text[15:]) == [{"a": 1}]
+
+
+def test_malformed_item_is_skipped():
+    parser = RoadmapStreamParser()
+    assert parser.feed('{"roadmap": [{"a": 1,}, {"b": 2}]}') == [{"b": 2}]